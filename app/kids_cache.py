@@ -0,0 +1,139 @@
+"""儿童识物检测结果缓存
+
+- 键：图像内容哈希（含尺寸/类型）+ 模型与配置指纹
+- 内存层：LRU（OrderedDict），容量按条目数限制
+- 磁盘层（可选）：每条结果保存为一个 .npz（检测数组 + 标注图），未命中内存时回填
+- 缓存内的标注图为只读副本，get() 返回可写副本：调用方在图上绘制不会污染缓存
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from app.kids_core import Detection
+
+CacheValue = tuple[list["Detection"], np.ndarray]
+BOX_COLS = 4
+
+
+def frame_digest(frame: np.ndarray, fingerprint: str) -> str:
+    """计算图像内容与配置指纹的组合哈希"""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(fingerprint.encode("utf-8"))
+    h.update(f"{frame.shape}|{frame.dtype}".encode())
+    h.update(memoryview(np.ascontiguousarray(frame)).cast("B"))
+    return h.hexdigest()
+
+
+def _frozen(img: np.ndarray) -> np.ndarray:
+    """缓存内部保存的只读副本"""
+    out = np.array(img, copy=True)
+    out.setflags(write=False)
+    return out
+
+
+class DetectionCache:
+    """检测结果 LRU 缓存（内存 + 可选磁盘层）"""
+
+    def __init__(self, max_items: int = 32, cache_dir: str | Path | None = None) -> None:
+        self._max = max(1, int(max_items))
+        self._mem: OrderedDict[str, CacheValue] = OrderedDict()
+        self._lock = threading.Lock()
+        self._dir = Path(cache_dir) if cache_dir else None
+        if self._dir is not None:
+            self._dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._mem)
+
+    def get(self, key: str) -> CacheValue | None:
+        """查询缓存；磁盘命中时回填内存层"""
+        with self._lock:
+            val = self._mem.get(key)
+            if val is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return list(val[0]), val[1].copy()
+        val = self._read_disk(key)
+        with self._lock:
+            if val is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._put_mem(key, val)
+        return list(val[0]), val[1].copy()
+
+    def put(self, key: str, dets: list[Detection], annotated: np.ndarray) -> None:
+        """写入缓存（内存层，若配置了目录同时写磁盘层）；保存标注图的只读副本，调用方仍可修改自己的图"""
+        val: CacheValue = (list(dets), _frozen(annotated))
+        with self._lock:
+            self._put_mem(key, val)
+        self._write_disk(key, val)
+
+    def clear(self) -> None:
+        """清空内存层（磁盘层保留）"""
+        with self._lock:
+            self._mem.clear()
+
+    def _put_mem(self, key: str, val: CacheValue) -> None:
+        """写入内存层并按 LRU 淘汰（调用方持锁）"""
+        self._mem[key] = val
+        self._mem.move_to_end(key)
+        while len(self._mem) > self._max:
+            self._mem.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path | None:
+        return None if self._dir is None else self._dir / f"{key}.npz"
+
+    def _write_disk(self, key: str, val: CacheValue) -> None:
+        """以 npz 保存检测数组与标注图；失败时忽略"""
+        path = self._disk_path(key)
+        if path is None or path.exists():
+            return
+        dets, annotated = val
+        tmp = path.with_suffix(".tmp.npz")
+        try:
+            np.savez(
+                tmp,
+                cls_ids=np.array([d.cls_id for d in dets], dtype=np.int32),
+                labels=np.array([d.label_cn for d in dets], dtype=np.str_),
+                confs=np.array([d.conf for d in dets], dtype=np.float32),
+                boxes=np.array([d.box for d in dets], dtype=np.int32).reshape(-1, BOX_COLS),
+                annotated=annotated,
+            )
+            tmp.replace(path)
+        except OSError as e:
+            print(f"[警告] 写入检测缓存失败: {e}")
+            with contextlib.suppress(OSError):
+                tmp.unlink()
+
+    def _read_disk(self, key: str) -> CacheValue | None:
+        """从磁盘层读取；文件缺失或损坏返回 None"""
+        path = self._disk_path(key)
+        if path is None or not path.exists():
+            return None
+        from app.kids_core import Detection
+
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                dets = [
+                    Detection(int(c), str(lb), float(cf), (int(b[0]), int(b[1]), int(b[2]), int(b[3])))
+                    for c, lb, cf, b in zip(z["cls_ids"], z["labels"], z["confs"], z["boxes"])
+                ]
+                annotated = _frozen(z["annotated"])
+        except (OSError, KeyError, ValueError) as e:
+            print(f"[警告] 读取检测缓存失败，已忽略: {e}")
+            return None
+        return dets, annotated
+
+
+__all__ = ["DetectionCache", "frame_digest"]
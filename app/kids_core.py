@@ -5,10 +5,15 @@
 - 返回中文标签、置信度与边框
 - 选择“距画面中心最近”的目标作为“中央物体”
 - 绘制结果并高亮中央物体
+- 按“图像内容 + 模型/配置指纹”缓存检测结果（LRU，可选磁盘层）
 """
 from __future__ import annotations
 
+import hashlib
+import threading
+import time
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Iterable
 
 import cv2
@@ -22,7 +27,11 @@ except ImportError as e:
 else:
     _YOLO_IMPORT_ERR = None
 
+from app.kids_cache import DetectionCache, frame_digest
 from detection.coco_labels_cn import coco_labels_cn
+from detection.cpu import configure_torch_threads
+from detection.perf import PerfRecorder
+from detection.stream import size_groups
 
 
 def _select_device(requested: str | None) -> str:
@@ -47,6 +56,11 @@ class ChildConfig:
     conf: float = 0.6
     img_size: list[int] | None = None  # None -> 原始尺寸
     device: str = "auto"
+    cache_size: int = 32  # 检测结果缓存条目数；0 表示关闭
+    cache_dir: str | None = None  # 可选磁盘缓存目录
+    torch_threads: int = 0  # torch 算子内线程数；0 表示默认
+    torch_interop_threads: int = 0  # torch 算子间线程数；0 表示默认
+    cpu_affinity: str | None = None  # 推理线程绑定的核心，例如 "0-3"（由 DetectWorker 绑定）
 
 
 @dataclass
@@ -69,21 +83,74 @@ class ChildDetector:
             ) from _YOLO_IMPORT_ERR
         self.cfg = cfg or ChildConfig()
         self.device = _select_device(self.cfg.device)
+        configure_torch_threads(self.cfg.torch_threads, self.cfg.torch_interop_threads)
         self.model = YOLO(self.cfg.model_path)
+        # 推理互斥：GUI 后台线程与图片识别可能并发调用同一模型
+        self._lock = threading.Lock()
+        self._fingerprint = self._make_fingerprint()
+        self.cache: DetectionCache | None = (
+            DetectionCache(self.cfg.cache_size, self.cfg.cache_dir) if self.cfg.cache_size > 0 else None
+        )
+        # 可选的分阶段耗时记录器（由 GUI 设置）
+        self.perf: PerfRecorder | None = None
+
+    def _make_fingerprint(self) -> str:
+        """模型文件与推理配置的指纹（任一变化都会使缓存键失效）"""
+        p = Path(self.cfg.model_path)
+        try:
+            st = p.stat()
+            model_sig = f"{p.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+        except OSError:
+            model_sig = str(p)
+        raw = f"{model_sig}|{self.cfg.conf}|{self.cfg.img_size}|{self.device}"
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+
+    @property
+    def fingerprint(self) -> str:
+        """当前模型/配置指纹"""
+        return self._fingerprint
 
     # -------- 检测与结果整理 --------
+    @staticmethod
+    def _check_frame(frame: np.ndarray) -> None:
+        if frame is None or not isinstance(frame, np.ndarray):
+            msg = "frame 必须是 numpy 图像"
+            raise TypeError(msg)
+
     def detect_frame(self, frame: np.ndarray) -> tuple[list[Detection], np.ndarray]:
         """检测单帧图像"""
-        if frame is None or not isinstance(frame, np.ndarray):
-            raise TypeError("frame 必须是 numpy 图像")
+        self._check_frame(frame)
         imgsz = self.cfg.img_size
         if imgsz is None:
             h, w = frame.shape[:2]
             imgsz = [h, w]
-        results = self.model.predict(
-            frame, imgsz=imgsz, conf=self.cfg.conf, device=self.device, verbose=False
-        )
-        r = results[0]
+        t0 = time.perf_counter()
+        with self._lock:
+            results = self.model.predict(
+                frame, imgsz=imgsz, conf=self.cfg.conf, device=self.device, verbose=False
+            )
+        return self._collect(results[0], frame, t0)
+
+    def detect_frames(self, frames: list[np.ndarray]) -> list[tuple[list[Detection], np.ndarray]]:
+        """批量检测多帧：未设置 img_size 时按帧尺寸分组，同组合并为一次推理；结果顺序与输入一致"""
+        for frame in frames:
+            self._check_frame(frame)
+        out: list[tuple[list[Detection], np.ndarray]] = [([], frame) for frame in frames]
+        for imgsz, idx in size_groups(frames, self.cfg.img_size).items():
+            t0 = time.perf_counter()
+            with self._lock:
+                results = self.model.predict(
+                    [frames[i] for i in idx], imgsz=list(imgsz), conf=self.cfg.conf, device=self.device, verbose=False
+                )
+            for i, r in zip(idx, results, strict=True):
+                out[i] = self._collect(r, frames[i], t0)
+        return out
+
+    def _collect(self, r, frame: np.ndarray, t0: float) -> tuple[list[Detection], np.ndarray]:
+        """记录耗时，整理检测框（中文标签、裁剪到画面内）并绘制可视化图"""
+        perf = self.perf
+        if perf is not None and not perf.record_speed(r):
+            perf.record("inference", (time.perf_counter() - t0) * 1000.0)
         dets: list[Detection] = []
         h_img, w_img = frame.shape[:2]
         for box in getattr(r, "boxes", []) or []:
@@ -104,15 +171,32 @@ class ChildDetector:
             dets.append(Detection(cls_id, label, conf, (x1i, y1i, x2i, y2i)))
         # 生成一张可视化图：仅使用 YOLO 原生英文标签与配色
         # 使用 YOLO 自带的绘制方法，不传中文，避免 OpenCV 中文渲染为问号
+        t_plot = time.perf_counter()
         plotted = r.plot()
+        if perf is not None:
+            perf.record("plot", (time.perf_counter() - t_plot) * 1000.0)
         return dets, plotted
 
+    def detect_frame_cached(self, frame: np.ndarray) -> tuple[list[Detection], np.ndarray]:
+        """带缓存的单帧检测：相同内容与配置直接返回上次结果（适合静态图片）；返回的标注图可由调用方直接绘制"""
+        if self.cache is None:
+            return self.detect_frame(frame)
+        self._check_frame(frame)
+        key = frame_digest(frame, self._fingerprint)
+        hit = self.cache.get(key)
+        if hit is not None:
+            return hit
+        dets, plotted = self.detect_frame(frame)
+        self.cache.put(key, dets, plotted)
+        return list(dets), plotted
+
     def detect_image_file(self, path: str) -> tuple[list[Detection], np.ndarray]:
-        """检测图片文件"""
+        """检测图片文件（结果按内容缓存）"""
         img = cv2.imread(path)
         if img is None:
-            raise FileNotFoundError(f"无法读取图片: {path}")
-        return self.detect_frame(img)
+            msg = f"无法读取图片: {path}"
+            raise FileNotFoundError(msg)
+        return self.detect_frame_cached(img)
 
     # -------- 中央物体选择与可视化 --------
     @staticmethod
@@ -5,6 +5,10 @@
 - 本地视频识物：打开视频 -> 实时识别并高亮中心物体，可自动播报当前中心物体
 - 摄像头识物：选择摄像头 -> 开始 -> 实时识别并高亮中心物体，可自动播报当前中心物体
 
+线程
+- 采集与推理在后台线程（DetectWorker）中进行，UI 线程只负责显示最新结果与播报
+- 模型加载与摄像头探测在后台进行，窗口立即显示；相关按钮在就绪后启用
+
 设计
 - 大按钮与简洁布局，适合儿童与家长使用
 - 仅暴露必要选项（摄像头选择、自动播报开关）
@@ -12,6 +16,7 @@
 from __future__ import annotations
 
 import contextlib
+import os
 import pathlib
 import sys
 import time
@@ -20,7 +25,6 @@ from typing import Optional
 import cv2
 import numpy as np
 from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QImage, QPixmap
 from PySide6.QtWidgets import (
     QApplication,
     QCheckBox,
@@ -31,6 +35,7 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QMessageBox,
+    QProgressBar,
     QPushButton,
     QStatusBar,
     QVBoxLayout,
@@ -38,21 +43,19 @@ from PySide6.QtWidgets import (
 )
 
 from app.kids_core import ChildConfig, ChildDetector
+from app.kids_render import PreviewRenderer
+from app.kids_worker import BackgroundTask, DetectWorker
 from cor_io.camera_utils import get_directshow_device_names
+from cor_io.recording import META_NAME, ReplaySource, is_recording
 from detection.api import enumerate_cameras
 from detection.coco_intros_cn import get_intro_by_id
-from voice.tts_queue import TTSManager
-
+from detection.perf import DEFAULT_DUMP_INTERVAL_SEC, PerfRecorder
+from detection.tracing import Tracer, activate
+from voice.tts_queue import PRIORITY_INTRO, PRIORITY_URGENT, TTSManager
 
-def _bgr_to_qpix(img_bgr: np.ndarray) -> QPixmap:
-    """将 BGR 图像转换为 QPixmap"""
-    if img_bgr is None:
-        return QPixmap()
-    rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
-    h, w = rgb.shape[:2]
-    bytes_per_line = 3 * w
-    qim = QImage(rgb.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-    return QPixmap.fromImage(qim)
+# 播报合并键：同键的待播报项只保留最新一条
+SPEECH_KEY_LABEL = "label"
+SPEECH_KEY_INTRO = "intro"
 
 
 class KidsWindow(QWidget):
@@ -62,38 +65,84 @@ class KidsWindow(QWidget):
         self.setWindowTitle("视界")
         self.resize(730, 510)
 
-        # 检测器：固定图片尺寸为 640 以确保实时性
+        # 检测器：固定图片尺寸为 640 以确保实时性；在后台加载，就绪前为 None
         model_path = str(pathlib.Path(__file__).resolve().parents[1] / "models" / "yolo" / "yolo11n.pt")
-        self._cfg = ChildConfig(model_path=model_path, conf=0.6, img_size=[640, 640], device="auto")
-        try:
-            self._det = ChildDetector(self._cfg)
-        except Exception as e:
-            QMessageBox.critical(self, "模型加载失败", f"请检查模型文件是否存在：\n{model_path}\n\n错误：{e}")
-            raise
+        self._cfg = ChildConfig(
+            model_path=model_path,
+            conf=0.6,
+            img_size=[640, 640],
+            device="auto",
+            cache_dir=os.getenv("COR_KIDS_CACHE_DIR") or None,
+            # 推理线程数与绑核（与检测 CLI 共用 COR_TORCH_THREADS / COR_TORCH_INTEROP_THREADS / COR_CPU_AFFINITY）
+            torch_threads=int(os.getenv("COR_TORCH_THREADS") or 0),
+            torch_interop_threads=int(os.getenv("COR_TORCH_INTEROP_THREADS") or 0),
+            cpu_affinity=os.getenv("COR_CPU_AFFINITY") or None,
+        )
+        self._det: Optional[ChildDetector] = None
+        # 启动期后台任务（模型加载 / 摄像头探测）
+        self._model_task: Optional[BackgroundTask] = None
+        self._cam_task: Optional[BackgroundTask] = None
+        # 尚未结束的后台任务线程（done 之后线程仍可能在收尾）；finished 后移出并 deleteLater
+        self._tasks: list[BackgroundTask] = []
+        self._cams_found: bool = False
 
         # 摄像头 / 本地视频
         self._cap: Optional[cv2.VideoCapture] = None
         self._cap_is_file: bool = False  # True 表示当前 _cap 来自本地视频文件
-        self._timer = QTimer(self)
-        self._timer.timeout.connect(self._on_timer)
+        self._worker: Optional[DetectWorker] = None
+        # 停止时未能在超时内退出的线程：关闭窗口时限时结束；线程 finished 后移出并 deleteLater
+        self._retired_workers: list[DetectWorker] = []
+        # 预览渲染（先缩放再转换，复用缓冲区）
+        self._renderer = PreviewRenderer()
+        # 分阶段耗时（退出时打印；设置 COR_PERF_JSON 时按间隔写出 JSON）
+        self._perf = PerfRecorder(
+            os.getenv("COR_PERF_JSON") or None,
+            float(os.getenv("COR_PERF_INTERVAL") or DEFAULT_DUMP_INTERVAL_SEC),
+        )
+        # 逐帧追踪：采集->显示/播报延迟；设置 COR_TRACE_JSON 时退出写出 Chrome trace
+        self._trace_json = os.getenv("COR_TRACE_JSON") or None
+        self._tracer = Tracer(self._perf, export=bool(self._trace_json))
         self._last_center_label: Optional[str] = None
         self._last_speak_t: float = 0.0
         # 最近一次检测结果缓存
         self._last_dets: list = []
         self._last_center_idx: Optional[int] = None
 
-        # TTS
+        # TTS（后端由 COR_TTS_BACKEND 选择：pyttsx3 / null / wav）
         from voice import tts as _tts_mod
-        self._tts = TTSManager(tts_module=_tts_mod, dup_window=1.2)
+        from voice.backends import BACKEND_PYTTSX3, NullBackend, make_backend
+
+        try:
+            backend = make_backend(
+                os.getenv("COR_TTS_BACKEND", BACKEND_PYTTSX3),
+                wav_dir=os.getenv("COR_TTS_WAV_DIR") or None,
+            )
+        except ValueError as e:
+            print(f"[警告] {e}，已关闭语音播报")
+            backend = NullBackend()
+        self._tts = TTSManager(tts_module=backend, dup_window=1.2)
         self._tts.start()
+        # 固定短语（这是X / 物体介绍）预合成音频缓存；空闲时后台预渲染，实时播报到来时渲染立即让出引擎
+        if backend.name == BACKEND_PYTTSX3:
+            tts_cache_dir = os.getenv("COR_TTS_CACHE_DIR") or str(
+                pathlib.Path(__file__).resolve().parents[1] / "results" / "tts_cache"
+            )
+            try:
+                _tts_mod.enable_audio_cache(tts_cache_dir)
+                if os.getenv("COR_TTS_WARMUP", "1").strip().lower() not in {"0", "false", "off", "no"}:
+                    _tts_mod.warm_up()
+            except OSError as e:
+                print(f"[警告] 启用语音缓存失败: {e}")
 
         # 播报介绍期间禁用“播报介绍”按钮的轮询守护
         self._intro_btn_guard = QTimer(self)
         self._intro_btn_guard.setInterval(120)
         self._intro_btn_guard.timeout.connect(self._poll_intro_busy)
 
-        # UI
+        # UI：先构建界面再启动后台任务，使窗口立即显示
         self._build_ui()
+        self._update_buttons()
+        self._load_model_async()
         self._refresh_cameras()
 
     # ---------- UI ----------
@@ -102,6 +151,14 @@ class KidsWindow(QWidget):
         root = QVBoxLayout(self)
         self._status = QStatusBar()
         self._status.setSizeGripEnabled(False)
+        self._fps_label = QLabel("")
+        self._status.addPermanentWidget(self._fps_label)
+        # 启动期后台任务进行中时显示忙碌进度条
+        self._busy_bar = QProgressBar()
+        self._busy_bar.setRange(0, 0)
+        self._busy_bar.setMaximumWidth(120)
+        self._busy_bar.setVisible(False)
+        self._status.addPermanentWidget(self._busy_bar)
         root.addWidget(self._status)
 
         # 预览区
@@ -160,6 +217,64 @@ class KidsWindow(QWidget):
         row.addWidget(announce_group, 1)
         root.addLayout(row)
 
+    def _update_buttons(self) -> None:
+        """根据模型/摄像头就绪状态启用或禁用按钮"""
+        model_ready = self._det is not None
+        running = self._cap is not None
+        probing = self._cam_task is not None
+        self._btn_open.setEnabled(model_ready)
+        self._btn_recognize.setEnabled(model_ready)
+        self._btn_cam_start.setEnabled(model_ready and self._cams_found and not running)
+        self._btn_cam_refresh.setEnabled(not probing and not running)
+        self._cam_combo.setEnabled(self._cams_found and not probing and not running)
+        self._busy_bar.setVisible(self._model_task is not None or probing)
+
+    def _load_model_async(self) -> None:
+        """在后台加载检测模型"""
+        cfg = self._cfg
+        task = self._new_task(lambda: ChildDetector(cfg))
+        task.done.connect(self._on_model_loaded)
+        task.failed.connect(self._on_model_failed)
+        self._model_task = task
+        self._status.showMessage("正在加载识别模型…")
+        task.start()
+
+    def _new_task(self, fn) -> BackgroundTask:
+        """创建后台任务（调用方连接 done/failed 后 start）；线程结束后回收"""
+        task = BackgroundTask(fn, parent=self)
+        task.finished.connect(self._on_task_finished)
+        self._tasks.append(task)
+        return task
+
+    def _on_task_finished(self) -> None:
+        """后台任务线程已结束：移出列表并 deleteLater"""
+        task = self.sender()
+        if not isinstance(task, BackgroundTask):
+            return
+        with contextlib.suppress(ValueError):
+            self._tasks.remove(task)
+        task.deleteLater()
+
+    def _on_model_loaded(self, det: ChildDetector) -> None:
+        """模型加载完成"""
+        self._det = det
+        det.perf = self._perf
+        self._model_task = None
+        self._status.showMessage("识别模型已就绪", 3000)
+        self._update_buttons()
+
+    def _on_model_failed(self, err: str) -> None:
+        """模型加载失败：提示并保持识别相关按钮禁用"""
+        self._model_task = None
+        self._status.showMessage("识别模型加载失败")
+        self._update_buttons()
+        QMessageBox.critical(self, "模型加载失败", f"请检查模型文件是否存在：\n{self._cfg.model_path}\n\n错误：{err}")
+
+    def _show_bgr(self, img_bgr: np.ndarray) -> None:
+        """按预览区尺寸渲染并显示 BGR 图像"""
+        with self._perf.stage("display"):
+            self._preview.setPixmap(self._renderer.render(img_bgr, self._preview.width(), self._preview.height()))
+
     # ---------- 事件 ----------
     def _start_intro_guard(self) -> None:
         """在即将播报“介绍”时禁用按钮，直到播报结束再自动恢复"""
@@ -170,49 +285,77 @@ class KidsWindow(QWidget):
 
     def _poll_intro_busy(self) -> None:
         """轮询检查 TTS 播报状态以恢复“播报介绍”按钮"""
-        # 只要 TTS 仍在播报，就保持按钮禁用；结束后恢复并停止轮询
+        # 只要 TTS 仍在播报（含分句播报尚未播出的分片），就保持按钮禁用；结束后恢复并停止轮询
         busy = False
         try:
-            busy = bool(self._tts and self._tts.is_busy())
+            busy = bool(self._tts and (self._tts.is_busy() or self._tts.pending_count() > 0))
         except Exception:
             busy = False
         if not busy:
             if hasattr(self, "_btn_speak_intro") and self._btn_speak_intro is not None:
                 self._btn_speak_intro.setEnabled(True)
             self._intro_btn_guard.stop()
-    def _refresh_cameras(self) -> None:
-        """刷新摄像头列表"""
-        # 若摄像头正在使用，避免刷新以免底层枚举触发驱动错误
-        if self._cap is not None:
-            return
-        self._cam_combo.clear()
+    @staticmethod
+    def _probe_cameras() -> list[tuple[int, str]]:
+        """探测可用摄像头并匹配友好名称（在后台线程执行）"""
         try:
             cams = enumerate_cameras(8)
         except Exception:
             cams = []
         if not cams:
-            self._cam_combo.addItem("无可用摄像头")
-            self._cam_combo.setEnabled(False)
-            return
-        self._cam_combo.setEnabled(True)
+            return []
         # 使用 DirectShow 设备名称（Windows）
         names: list[str] = []
         try:
             names = get_directshow_device_names()
         except Exception:
             names = []
+        items: list[tuple[int, str]] = []
         for i, cam_idx in enumerate(cams):
             label = f"Camera {cam_idx}"
             if i < len(names) and names[i].strip():
                 label = f"{names[i].strip()} (# {cam_idx})"
+            items.append((cam_idx, label))
+        return items
+
+    def _refresh_cameras(self) -> None:
+        """刷新摄像头列表（后台探测，完成后填充下拉框）"""
+        # 若摄像头正在使用，避免刷新以免底层枚举触发驱动错误
+        if self._cap is not None or self._cam_task is not None:
+            return
+        self._cam_combo.clear()
+        self._cam_combo.addItem("正在查找摄像头…")
+        self._cams_found = False
+        task = self._new_task(self._probe_cameras)
+        task.done.connect(self._on_cameras_probed)
+        task.failed.connect(self._on_cameras_probe_failed)
+        self._cam_task = task
+        self._update_buttons()
+        task.start()
+
+    def _on_cameras_probe_failed(self, _err: str) -> None:
+        """摄像头探测异常：按未找到处理"""
+        self._on_cameras_probed([])
+
+    def _on_cameras_probed(self, items: list[tuple[int, str]]) -> None:
+        """摄像头探测完成：填充下拉框"""
+        self._cam_task = None
+        self._cam_combo.clear()
+        if not items:
+            self._cam_combo.addItem("无可用摄像头")
+        for cam_idx, label in items:
             self._cam_combo.addItem(label, userData=cam_idx)
+        self._cams_found = bool(items)
+        if self._model_task is None:
+            self._status.showMessage(f"找到 {len(items)} 个摄像头" if items else "未找到可用摄像头", 3000)
+        self._update_buttons()
 
     def _on_open_image(self) -> None:
         """打开图片或本地视频文件
 
         需求变化：将“本地视频识别”和“本地图片识别”合并到该入口；
         若选择图片则仅加载并显示，点击“识别并播报”处理该图片；
-        若选择视频则直接以定时器方式开启逐帧检测，复用“停止”按钮结束。
+        若选择视频则直接由后台线程开启逐帧检测，复用“停止”按钮结束。
         """
         # 若已有摄像头/视频在运行，先停止
         if self._cap is not None:
@@ -224,8 +367,12 @@ class KidsWindow(QWidget):
             "图片/视频 (*.jpg *.jpeg *.png *.bmp *.mp4 *.avi *.mkv *.mov *.wmv *.flv *.webm);;"
             "图片 (*.jpg *.jpeg *.png *.bmp);;"
             "视频 (*.mp4 *.avi *.mkv *.mov *.wmv *.flv *.webm);;"
+            f"录制回放 ({META_NAME});;"
             "所有文件 (*.*)"
         )
+        if self._det is None:
+            QMessageBox.information(self, "提示", "识别模型尚未就绪，请稍候")
+            return
         path, _ = QFileDialog.getOpenFileName(self, "选择图片或视频", filter=file_filter)
         if not path:
             return
@@ -236,59 +383,53 @@ class KidsWindow(QWidget):
         if img is not None:
             # 打开的是图片
             self._last_image_bgr = img
-            self._preview.setPixmap(
-                _bgr_to_qpix(img).scaled(
-                    self._preview.width(),
-                    self._preview.height(),
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation,
-                )
-            )
+            self._show_bgr(img)
             self._status.showMessage(f"已打开图片: {path}")
             return
 
-        # 尝试作为视频文件打开
-        cap = cv2.VideoCapture(path)
+        # 录制目录（选择其中的 meta.json）按原始节奏回放，否则尝试作为视频文件打开
+        rec_dir = pathlib.Path(path).parent
+        if pathlib.Path(path).name == META_NAME and is_recording(rec_dir):
+            # 节奏由后台线程按录制帧率控制，这里不再额外等待
+            cap = ReplaySource(rec_dir, speed="max")
+        else:
+            cap = cv2.VideoCapture(path)
         if not cap.isOpened():
             QMessageBox.warning(self, "打开失败", "无法读取该文件（既不是图片也不是可打开的视频）")
             return
-        # 作为视频启动定时器循环
+        # 作为视频交给后台线程逐帧识别
         self._cap = cap
         self._cap_is_file = True
         self._last_center_label = None
         self._last_speak_t = 0.0
-        # 使用 ~30fps 的tick；实际取决于 read() 成功率与模型速度
-        self._timer.start(33)
+        self._start_worker()
+        self._update_buttons()
         self._status.showMessage(f"已打开视频: {path}，点击‘停止’结束")
 
     def _on_recognize_image(self) -> None:
         """识别当前打开的图片并播报结果"""
         img = getattr(self, "_last_image_bgr", None)
+        if self._det is None:
+            return
         if img is None:
             QMessageBox.information(self, "提示", "请先打开一张图片")
             return
-        dets, plotted = self._det.detect_frame(img)
+        # 同一图片（内容相同）重复识别时直接命中缓存
+        dets, plotted = self._det.detect_frame_cached(img)
         # 选择中心并高亮
         idx = self._det.pick_center_object(dets, plotted.shape)
         self._last_dets = dets
         self._last_center_idx = idx
         annotated = self._det.annotate_with_center(plotted, dets, idx)
-        self._preview.setPixmap(
-            _bgr_to_qpix(annotated).scaled(
-                self._preview.width(),
-                self._preview.height(),
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
-            )
-        )
+        self._show_bgr(annotated)
         # 播报：若有中心物体就播报该物体，否则播报前几类
         if idx is not None:
             label = dets[idx].label_cn
-            self._tts.speak(f"这是{label}")
+            self._tts.speak(f"这是{label}", priority=PRIORITY_URGENT, key=SPEECH_KEY_LABEL)
             if self._auto_intro_chk.isChecked():
                 intro = get_intro_by_id(dets[idx].cls_id)
                 if intro:
-                    self._tts.speak(intro)
+                    self._tts.speak(intro, priority=PRIORITY_INTRO, key=SPEECH_KEY_INTRO)
                     self._start_intro_guard()
         else:
             if dets:
@@ -299,7 +440,7 @@ class KidsWindow(QWidget):
 
     def _on_cam_start(self) -> None:
         """启动摄像头识物"""
-        if self._cap is not None:
+        if self._cap is not None or self._det is None:
             return
         idx = self._cam_combo.currentData()
         if idx is None:
@@ -313,32 +454,77 @@ class KidsWindow(QWidget):
         if not cap.isOpened():
             QMessageBox.critical(self, "错误", f"无法打开摄像头 {idx}")
             return
+        # 尽量只缓存 1 帧，避免推理较慢时读到积压的旧画面
+        with contextlib.suppress(Exception):
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         self._cap = cap
         self._cap_is_file = False
         self._last_center_label = None
         self._last_speak_t = 0.0
-        self._timer.start(33)
+        self._start_worker()
         self._status.showMessage("摄像头已启动，按‘停止’结束")
         # 摄像头开启时禁用刷新与设备选择
-        with contextlib.suppress(Exception):
-            self._btn_cam_refresh.setEnabled(False)
-            self._cam_combo.setEnabled(False)
+        self._update_buttons()
+
+    def _start_worker(self) -> None:
+        """为当前 _cap 启动后台采集/推理线程"""
+        if self._det is None:
+            return
+        worker = DetectWorker(self._det, self._cap, is_file=self._cap_is_file, tracer=self._tracer, parent=self)
+        worker.result_ready.connect(self._on_worker_result)
+        worker.source_finished.connect(self._on_worker_finished)
+        worker.failed.connect(self._on_worker_failed)
+        worker.stats_updated.connect(self._on_worker_stats)
+        # finished 排队到界面线程执行（绑定方法槽），线程结束后回收对象
+        worker.finished.connect(self._on_worker_thread_finished)
+        self._worker = worker
+        worker.start()
+
+    def _stop_worker(self) -> bool:
+        """停止后台线程并丢弃未取走的结果；返回是否存在线程（线程退出时自行释放视频源）"""
+        worker = self._worker
+        self._worker = None
+        if worker is None:
+            return False
+        # 断开信号，避免已排队的旧信号影响之后启动的新视频源
+        for sig, slot in (
+            (worker.result_ready, self._on_worker_result),
+            (worker.source_finished, self._on_worker_finished),
+            (worker.failed, self._on_worker_failed),
+            (worker.stats_updated, self._on_worker_stats),
+        ):
+            with contextlib.suppress(Exception):
+                sig.disconnect(slot)
+        if not worker.stop():
+            # 推理超过等待时限：线程仍持有视频源，结束后自行释放并回收
+            print("[警告] 检测线程未能及时退出，将在当前推理结束后释放视频源")
+            self._retired_workers.append(worker)
+        self._fps_label.setText("")
+        return True
+
+    def _on_worker_thread_finished(self) -> None:
+        """检测线程已结束：移出待回收列表并 deleteLater"""
+        worker = self.sender()
+        if not isinstance(worker, DetectWorker):
+            return
+        with contextlib.suppress(ValueError):
+            self._retired_workers.remove(worker)
+        worker.deleteLater()
 
     def _on_cam_stop(self) -> None:
         """停止摄像头识物"""
         if self._cap is not None:
             try:
-                self._timer.stop()
-                self._cap.release()
+                # 有检测线程时由线程在退出后释放视频源，避免释放与读取并发
+                if not self._stop_worker():
+                    self._cap.release()
             except Exception:
                 pass
             self._cap = None
             self._cap_is_file = False
             self._status.showMessage("已停止摄像头")
             # 恢复刷新与设备选择
-            with contextlib.suppress(Exception):
-                self._btn_cam_refresh.setEnabled(True)
-                self._cam_combo.setEnabled(True)
+            self._update_buttons()
 
     def _on_speak_intro(self) -> None:
         """手动播报当前中心物体的简介"""
@@ -352,52 +538,63 @@ class KidsWindow(QWidget):
             idx = 0
         intro = get_intro_by_id(dets[idx].cls_id)
         if intro:
-            self._tts.speak(intro)
+            self._tts.speak(intro, priority=PRIORITY_INTRO, key=SPEECH_KEY_INTRO)
             self._start_intro_guard()
         else:
             QMessageBox.information(self, "提示", "该物体暂无简介")
 
-    def _on_timer(self) -> None:
-        """摄像头定时器回调：抓取一帧并处理显示与播报"""
-        cap = self._cap
-        if cap is None:
+    def _on_worker_finished(self) -> None:
+        """后台线程报告视频源结束"""
+        was_file = self._cap_is_file
+        with contextlib.suppress(Exception):
+            self._on_cam_stop()
+        self._status.showMessage("视频播放结束" if was_file else "摄像头读取失败，已停止")
+
+    def _on_worker_failed(self, err: str) -> None:
+        """后台线程推理异常"""
+        with contextlib.suppress(Exception):
+            self._on_cam_stop()
+        QMessageBox.warning(self, "识别失败", f"识别过程中出现错误：\n{err}")
+
+    def _on_worker_stats(self, achieved: float, source: float, skipped: int) -> None:
+        """在状态栏显示实际处理帧率与源帧率"""
+        if source > 0:
+            self._fps_label.setText(f"实际 {achieved:.1f} / 源 {source:.1f} FPS，跳过 {skipped} 帧")
+        else:
+            self._fps_label.setText(f"{achieved:.1f} FPS")
+
+    def _on_worker_result(self) -> None:
+        """取走后台线程的最新结果并显示与播报"""
+        worker = self._worker
+        if worker is None:
             return
-        ok, frame = cap.read()
-        if not ok or frame is None:
-            # 本地视频文件在读到结尾时主动停止；摄像头则忽略一次失败
-            if self._cap_is_file:
-                with contextlib.suppress(Exception):
-                    self._on_cam_stop()
-                self._status.showMessage("视频播放结束")
+        res = worker.take_latest()
+        if res is None:
             return
-        # 推理
-        dets, plotted = self._det.detect_frame(frame)
-        idx = self._det.pick_center_object(dets, plotted.shape)
-        self._last_dets = dets
-        self._last_center_idx = idx
-        annotated = self._det.annotate_with_center(plotted, dets, idx)
-        self._preview.setPixmap(
-            _bgr_to_qpix(annotated).scaled(
-                self._preview.width(),
-                self._preview.height(),
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
-            )
-        )
-
-        # 自动播报（中心物体变化时 + 冷却 1.2s）
-        if self._auto_speak_chk.isChecked() and idx is not None and 0 <= idx < len(dets):
-            label = dets[idx].label_cn
-            now = time.time()
-            if label != self._last_center_label and (now - self._last_speak_t) > 1.2:
-                self._tts.speak(f"这是{label}")
-                if self._auto_intro_chk.isChecked():
-                    intro = get_intro_by_id(dets[idx].cls_id)
-                    if intro:
-                        self._tts.speak(intro)
-                        self._start_intro_guard()
-                self._last_center_label = label
-                self._last_speak_t = now
+        # 在该帧的追踪上下文中显示与播报（播报入队会关联到此帧）
+        with activate(res.trace):
+            dets, idx = res.dets, res.center_idx
+            self._last_dets = dets
+            self._last_center_idx = idx
+            self._show_bgr(res.annotated)
+            self._tracer.latency(res.trace, "capture_to_display")
+
+            # 自动播报（中心物体变化时 + 冷却 1.2s）
+            with self._perf.stage("announce"):
+                if self._auto_speak_chk.isChecked() and idx is not None and 0 <= idx < len(dets):
+                    label = dets[idx].label_cn
+                    now = time.time()
+                    if label != self._last_center_label and (now - self._last_speak_t) > 1.2:
+                        # 中心物体已变化：旧物体的介绍不再有意义，取消并由新标签抢占
+                        self._tts.cancel_key(SPEECH_KEY_INTRO)
+                        self._tts.speak(f"这是{label}", priority=PRIORITY_URGENT, key=SPEECH_KEY_LABEL)
+                        if self._auto_intro_chk.isChecked():
+                            intro = get_intro_by_id(dets[idx].cls_id)
+                            if intro:
+                                self._tts.speak(intro, priority=PRIORITY_INTRO, key=SPEECH_KEY_INTRO)
+                                self._start_intro_guard()
+                        self._last_center_label = label
+                        self._last_speak_t = now
 
     def closeEvent(self, event) -> None:
         """窗口关闭事件处理：确保释放摄像头与停止 TTS"""
@@ -408,6 +605,16 @@ class KidsWindow(QWidget):
                 self._tts.stop()
             except Exception:
                 pass
+            # 未及时退出的检测线程限时结束（可能阻塞在 read()），避免关闭窗口时卡住
+            for worker in list(self._retired_workers):
+                worker.shutdown()
+            # 等待仍在运行的启动期任务线程（限时），避免线程对象随窗口销毁时仍在运行
+            for task in list(self._tasks):
+                task.join()
+            print(self._perf.format_table())
+            self._perf.dump()
+            if self._trace_json:
+                self._tracer.dump(self._trace_json)
         return super().closeEvent(event)
 
 
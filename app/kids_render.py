@@ -0,0 +1,116 @@
+"""预览渲染
+
+旧路径：整幅 cvtColor(BGR->RGB) -> QImage -> QPixmap -> QPixmap.scaled(SmoothTransformation)
+新路径：先用 OpenCV 缩放到预览区尺寸（写入复用的缓冲区）-> 以 Format_BGR888 直接包装为 QImage -> QPixmap
+
+说明
+- QImage 直接引用缓冲区内存，不做颜色转换与额外拷贝
+- QPixmap.fromImage 会转换为平台原生格式并拷贝数据，因此缓冲区可以在下一帧安全复用
+
+性能对比：python -m app.kids_render [宽x高]
+"""
+from __future__ import annotations
+
+import sys
+import time
+
+import cv2
+import numpy as np
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QGuiApplication, QImage, QPixmap
+
+EMA_ALPHA = 0.1
+BENCH_REPEAT = 200
+BENCH_FRAME_SIZE = (1280, 720)
+BENCH_TARGET_SIZE = (700, 420)
+
+
+def legacy_bgr_to_qpix(img_bgr: np.ndarray, target_w: int, target_h: int) -> QPixmap:
+    """旧渲染路径（仅用于性能对比）"""
+    rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
+    h, w = rgb.shape[:2]
+    qim = QImage(rgb.data, w, h, 3 * w, QImage.Format.Format_RGB888)
+    return QPixmap.fromImage(qim).scaled(
+        target_w,
+        target_h,
+        Qt.AspectRatioMode.KeepAspectRatio,
+        Qt.TransformationMode.SmoothTransformation,
+    )
+
+
+class PreviewRenderer:
+    """将 BGR 帧按预览区尺寸（保持比例）渲染为 QPixmap，复用缩放缓冲区"""
+
+    def __init__(self) -> None:
+        self._buf: np.ndarray | None = None
+        self.last_ms: float = 0.0
+        self.avg_ms: float = 0.0
+
+    def _target_size(self, w: int, h: int, target_w: int, target_h: int) -> tuple[int, int]:
+        """计算保持宽高比的目标尺寸"""
+        scale = min(target_w / w, target_h / h)
+        return max(1, round(w * scale)), max(1, round(h * scale))
+
+    def render(self, img_bgr: np.ndarray | None, target_w: int, target_h: int) -> QPixmap:
+        """渲染一帧；记录本帧耗时与滑动平均耗时（毫秒）"""
+        if img_bgr is None or img_bgr.size == 0 or target_w <= 0 or target_h <= 0:
+            return QPixmap()
+        t0 = time.perf_counter()
+        h, w = img_bgr.shape[:2]
+        nw, nh = self._target_size(w, h, target_w, target_h)
+        if (nw, nh) == (w, h) and img_bgr.flags["C_CONTIGUOUS"]:
+            out = img_bgr
+        else:
+            if self._buf is None or self._buf.shape[:2] != (nh, nw):
+                self._buf = np.empty((nh, nw, 3), dtype=np.uint8)
+            interp = cv2.INTER_AREA if nw < w else cv2.INTER_LINEAR
+            out = cv2.resize(img_bgr, (nw, nh), dst=self._buf, interpolation=interp)
+        qim = QImage(out.data, nw, nh, out.strides[0], QImage.Format.Format_BGR888)
+        pix = QPixmap.fromImage(qim)
+        self.last_ms = (time.perf_counter() - t0) * 1000.0
+        self.avg_ms = self.last_ms if self.avg_ms <= 0 else (1 - EMA_ALPHA) * self.avg_ms + EMA_ALPHA * self.last_ms
+        return pix
+
+
+def measure_render(
+    img_bgr: np.ndarray,
+    target_w: int,
+    target_h: int,
+    repeat: int = BENCH_REPEAT,
+) -> dict[str, float]:
+    """测量新旧渲染路径的单帧平均耗时（毫秒），需已创建 QGuiApplication"""
+    renderer = PreviewRenderer()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        legacy_bgr_to_qpix(img_bgr, target_w, target_h)
+    legacy_ms = (time.perf_counter() - t0) * 1000.0 / repeat
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        renderer.render(img_bgr, target_w, target_h)
+    fast_ms = (time.perf_counter() - t0) * 1000.0 / repeat
+    return {"legacy_ms": legacy_ms, "fast_ms": fast_ms, "speedup": legacy_ms / fast_ms if fast_ms > 0 else 0.0}
+
+
+def _parse_size(raw: str) -> tuple[int, int]:
+    """解析 宽x高 字符串"""
+    w, _, h = raw.lower().partition("x")
+    return int(w), int(h)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """用合成帧对比新旧渲染路径"""
+    args = sys.argv[1:] if argv is None else argv
+    fw, fh = _parse_size(args[0]) if args else BENCH_FRAME_SIZE
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, size=(fh, fw, 3), dtype=np.uint8)
+    res = measure_render(img, *BENCH_TARGET_SIZE)
+    print(
+        f"帧 {fw}x{fh} -> 预览 {BENCH_TARGET_SIZE[0]}x{BENCH_TARGET_SIZE[1]}: "
+        f"旧路径 {res['legacy_ms']:.2f} ms/帧，新路径 {res['fast_ms']:.2f} ms/帧，加速 {res['speedup']:.1f}x"
+    )
+    del app
+
+
+if __name__ == "__main__":
+    main()
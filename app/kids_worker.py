@@ -0,0 +1,273 @@
+"""儿童识物后台采集/推理线程
+
+将 cap.read() 与 ChildDetector 推理移出 Qt 事件循环：
+- 工作线程循环读取帧并推理，只保留“最新一帧”结果
+- 通过信号通知 UI 取走结果；UI 来不及取走的旧结果直接覆盖丢弃
+- UI 的响应速度因此与模型速度无关
+- 本地视频按文件原生 FPS 以时间戳节奏播放：早到则等待，迟到则 grab() 跳过（不解码）
+- 启动期的耗时操作（模型加载、摄像头探测）由 BackgroundTask 在后台执行
+"""
+from __future__ import annotations
+
+import contextlib
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import cv2
+import numpy as np
+from PySide6.QtCore import QThread, Signal
+
+from app.kids_core import ChildDetector, Detection
+from detection.cpu import describe_threads, format_info, parse_cpu_list, pin_current_thread
+from detection.tracing import TraceCtx, Tracer, set_current
+
+CAM_READ_FAIL_LIMIT = 30
+CAM_RETRY_MS = 10
+DEFAULT_FILE_FPS = 25.0
+MIN_VALID_FPS = 1.0
+STATS_INTERVAL_SEC = 1.0
+# 停止线程时的等待时限：正常停止 / 关闭窗口时每一步
+STOP_TIMEOUT_MS = 3000
+CLOSE_TIMEOUT_MS = 1000
+# 关闭窗口时等待启动期任务（模型加载可能较慢）的时限
+TASK_CLOSE_TIMEOUT_MS = 5000
+
+
+@dataclass
+class FrameResult:
+    frame_id: int
+    annotated: np.ndarray
+    dets: list[Detection] = field(default_factory=list)
+    center_idx: int | None = None
+    trace: TraceCtx | None = None
+
+
+class PlaybackPacer:
+    """基于时间戳的播放节奏：第 k 帧的到期时刻为 t0 + k / fps"""
+
+    def __init__(self, fps: float) -> None:
+        self.fps = fps if fps and fps > MIN_VALID_FPS else DEFAULT_FILE_FPS
+        self._period = 1.0 / self.fps
+        self._t0: float | None = None
+        self._pos = 0
+
+    def frames_late(self, now: float) -> int:
+        """当前帧之后已过期的帧数（这些帧应跳过，直接处理最新到期的一帧）"""
+        if self._t0 is None:
+            self._t0 = now
+            return 0
+        due_idx = math.floor((now - self._t0) / self._period)
+        return max(0, due_idx - self._pos)
+
+    def delay(self, now: float) -> float:
+        """距当前帧到期还需等待的秒数（<=0 表示已到期）"""
+        if self._t0 is None:
+            return 0.0
+        return self._t0 + self._pos * self._period - now
+
+    def advance(self, n: int = 1) -> None:
+        """前进 n 帧"""
+        self._pos += n
+
+
+class DetectWorker(QThread):
+    """摄像头/视频的采集与推理线程
+
+    信号
+    - result_ready: 有新结果可取（调用 take_latest 获取）
+    - source_finished: 视频文件读到结尾或摄像头持续读取失败
+    - failed: 推理过程中出现异常（参数为错误信息）
+    - stats_updated: 约每秒一次 (实际处理 FPS, 源 FPS, 累计跳过帧数)；摄像头的源 FPS 为 0
+    """
+
+    result_ready = Signal()
+    source_finished = Signal()
+    failed = Signal(str)
+    stats_updated = Signal(float, float, int)
+
+    def __init__(
+        self,
+        det: ChildDetector,
+        cap: Any,
+        *,
+        is_file: bool,
+        tracer: Tracer | None = None,
+        parent: Any = None,
+    ) -> None:
+        super().__init__(parent)
+        self._det = det
+        self._cap = cap
+        self._is_file = is_file
+        self._lock = threading.Lock()
+        self._latest: FrameResult | None = None
+        self.frames_done = 0
+        self.frames_dropped = 0
+        self.frames_skipped = 0
+        self._pacer: PlaybackPacer | None = None
+        # 分阶段耗时记录（推理与绘制由 ChildDetector.perf 记录）
+        self._perf = det.perf
+        self._tracer = tracer
+        try:
+            self._cpus = parse_cpu_list(det.cfg.cpu_affinity)
+        except ValueError as e:
+            print(f"[警告] {e}，推理线程不绑定 CPU")
+            self._cpus = None
+        if is_file:
+            fps_val = 0.0
+            try:
+                fps_val = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+            except Exception:
+                fps_val = 0.0
+            self._pacer = PlaybackPacer(fps_val)
+
+    def take_latest(self) -> FrameResult | None:
+        """取走最新结果（取走后槽位清空）"""
+        with self._lock:
+            res, self._latest = self._latest, None
+        return res
+
+    def _publish(self, res: FrameResult) -> None:
+        """写入最新结果槽；若上一结果尚未被取走则覆盖并计为丢弃"""
+        with self._lock:
+            stale = self._latest is not None
+            self._latest = res
+        if stale:
+            self.frames_dropped += 1
+        else:
+            self.result_ready.emit()
+
+    def _pace(self) -> bool:
+        """本地视频节奏控制：跳过已迟到的帧并等待当前帧到期；源结束返回 False"""
+        pacer = self._pacer
+        if pacer is None:
+            return True
+        late = pacer.frames_late(time.perf_counter())
+        for _ in range(late):
+            if not self._cap.grab():
+                return False
+            pacer.advance()
+            self.frames_skipped += 1
+        delay = pacer.delay(time.perf_counter())
+        if delay > 0:
+            self.msleep(int(delay * 1000))
+        pacer.advance()
+        return True
+
+    def run(self) -> None:
+        """线程入口：运行主循环，退出时释放视频源（保证 release 不会与本线程的读取并发）"""
+        try:
+            self._loop()
+        finally:
+            try:
+                self._cap.release()
+            except Exception as e:
+                print(f"[警告] 释放视频源失败: {e}")
+
+    def _loop(self) -> None:
+        """主循环：(节奏控制) -> 读取 -> 推理 -> 发布最新结果"""
+        fail = 0
+        frame_id = 0
+        src_fps = self._pacer.fps if self._pacer is not None else 0.0
+        win_t0 = time.perf_counter()
+        win_frames = 0
+        # 在本线程首次推理前绑核，torch 随后创建的工作线程随之继承
+        pin_current_thread(self._cpus)
+        print(f"[配置] 推理线程: {format_info(describe_threads())}")
+        while not self.isInterruptionRequested():
+            if not self._pace():
+                self.source_finished.emit()
+                return
+            t_read = time.perf_counter()
+            ok, frame = self._cap.read()
+            t_capture = time.perf_counter()
+            trace = self._tracer.begin(t_capture) if self._tracer is not None and ok else None
+            # 本线程后续的计时段都关联到该帧的追踪
+            set_current(trace)
+            if self._perf is not None:
+                self._perf.record_span("capture", t_read, t_capture)
+            if not ok or frame is None:
+                # 本地视频读到结尾即结束；摄像头允许短暂失败
+                fail += 1
+                if self._is_file or fail >= CAM_READ_FAIL_LIMIT:
+                    self.source_finished.emit()
+                    return
+                self.msleep(CAM_RETRY_MS)
+                continue
+            fail = 0
+            try:
+                dets, plotted = self._det.detect_frame(frame)
+                t_ann = time.perf_counter()
+                idx = self._det.pick_center_object(dets, plotted.shape)
+                annotated = self._det.annotate_with_center(plotted, dets, idx)
+                if self._perf is not None:
+                    self._perf.record("annotate", (time.perf_counter() - t_ann) * 1000.0)
+                    self._perf.maybe_dump()
+            except Exception as e:
+                self.failed.emit(str(e))
+                return
+            self._publish(FrameResult(frame_id, annotated, dets, idx, trace))
+            self.frames_done += 1
+            frame_id += 1
+            win_frames += 1
+            now = time.perf_counter()
+            if now - win_t0 >= STATS_INTERVAL_SEC:
+                self.stats_updated.emit(win_frames / (now - win_t0), src_fps, self.frames_skipped)
+                win_t0 = now
+                win_frames = 0
+
+    def stop(self, timeout_ms: int = STOP_TIMEOUT_MS) -> bool:
+        """请求停止并等待线程退出；返回是否已退出（视频源由线程退出时自行释放）"""
+        self.requestInterruption()
+        return self.wait(timeout_ms)
+
+    def shutdown(self, timeout_ms: int = CLOSE_TIMEOUT_MS) -> bool:
+        """关闭窗口时使用：每一步限时等待，保证界面不会卡住
+
+        依次：请求停止 -> 仍阻塞在 read() 时从调用线程释放视频源以打断读取 -> 仍未退出则强制结束
+        """
+        if self.stop(timeout_ms):
+            return True
+        print("[警告] 检测线程未响应停止请求，释放视频源以打断读取")
+        with contextlib.suppress(Exception):
+            self._cap.release()
+        if self.wait(timeout_ms):
+            return True
+        print("[警告] 检测线程仍未退出，强制结束")
+        self.terminate()
+        return self.wait(timeout_ms)
+
+
+class BackgroundTask(QThread):
+    """在后台线程执行一次性耗时任务（如模型加载、摄像头探测）
+
+    信号
+    - done: 任务完成（参数为返回值）
+    - failed: 任务抛出异常（参数为错误信息）
+    """
+
+    done = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, fn: Callable[[], Any], parent: Any = None) -> None:
+        super().__init__(parent)
+        self._fn = fn
+
+    def join(self, timeout_ms: int = TASK_CLOSE_TIMEOUT_MS) -> bool:
+        """关闭窗口时使用：限时等待任务结束，超时则强制结束（任务本身不可中断）"""
+        if self.wait(timeout_ms):
+            return True
+        print("[警告] 后台任务未能在时限内结束，强制结束")
+        self.terminate()
+        return self.wait(timeout_ms)
+
+    def run(self) -> None:
+        """执行任务并通过信号回传结果"""
+        try:
+            res = self._fn()
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.done.emit(res)
@@ -4,8 +4,13 @@
 from __future__ import annotations
 
 from .camera_utils import get_directshow_device_names, map_indices_to_names
+from .recording import REPLAY_SPEEDS, FrameRecorder, ReplaySource, is_recording
 
 __all__ = [
+    "REPLAY_SPEEDS",
+    "FrameRecorder",
+    "ReplaySource",
     "get_directshow_device_names",
+    "is_recording",
     "map_indices_to_names",
 ]
@@ -0,0 +1,246 @@
+"""摄像头会话录制与确定性回放
+
+录制格式（目录）：
+- meta.json    帧尺寸/通道/数据类型等元信息
+- frames.bin   按顺序拼接的原始 BGR 帧字节（uint8，HxWxC），可直接 numpy.memmap
+- stamps.bin   每帧采集时间戳（float64，相对首帧的秒数）
+
+回放源 ReplaySource 提供与 cv2.VideoCapture 相近的接口（isOpened/read/grab/get/release），
+可直接替换检测循环中的视频源；支持按原始节奏（original）或最快速度（max）回放
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import cv2
+import numpy as np
+
+META_NAME = "meta.json"
+FRAMES_NAME = "frames.bin"
+STAMPS_NAME = "stamps.bin"
+FORMAT_VERSION = 1
+REPLAY_SPEEDS = ("original", "max")
+DEFAULT_FPS = 25.0
+_GRAY_NDIM = 2
+
+
+def is_recording(path: str | Path) -> bool:
+    """判断路径是否为录制目录（目录内存在 meta.json）"""
+    p = Path(path)
+    return p.is_dir() and (p / META_NAME).is_file()
+
+
+class FrameRecorder:
+    """将采集到的原始帧与采集时间戳顺序写入录制目录"""
+
+    def __init__(self, out_dir: str | Path, *, source: Any = None) -> None:
+        self._dir = Path(out_dir)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._source = source
+        self._frames_f: BinaryIO | None = None
+        self._stamps_f: BinaryIO | None = None
+        self._shape: tuple[int, ...] | None = None
+        self._t0: float | None = None
+        self._count = 0
+        self._skipped = 0
+
+    @property
+    def count(self) -> int:
+        """已写入帧数"""
+        return self._count
+
+    def _open(self, frame: np.ndarray) -> None:
+        """根据首帧确定尺寸并创建数据文件"""
+        self._shape = tuple(int(s) for s in frame.shape)
+        self._frames_f = (self._dir / FRAMES_NAME).open("wb")
+        self._stamps_f = (self._dir / STAMPS_NAME).open("wb")
+        self._write_meta()
+
+    def _write_meta(self) -> None:
+        """写出元信息；帧数以数据文件大小为准，meta 中的 count 仅供参考"""
+        if self._shape is None:
+            return
+        h, w = self._shape[:2]
+        channels = self._shape[2] if len(self._shape) > _GRAY_NDIM else 1
+        meta = {
+            "version": FORMAT_VERSION,
+            "width": w,
+            "height": h,
+            "channels": channels,
+            "dtype": "uint8",
+            "count": self._count,
+            "source": None if self._source is None else str(self._source),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with (self._dir / META_NAME).open("w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    def write(self, frame: np.ndarray, ts: float | None = None) -> None:
+        """写入一帧；ts 为采集时刻（time.perf_counter 时基），缺省取当前时刻"""
+        if frame is None:
+            return
+        t = time.perf_counter() if ts is None else float(ts)
+        if self._shape is None:
+            if frame.dtype != np.uint8:
+                msg = f"仅支持 uint8 帧，收到 {frame.dtype}"
+                raise ValueError(msg)
+            self._open(frame)
+            self._t0 = t
+        if tuple(frame.shape) != self._shape:
+            # 帧尺寸中途变化（例如切换分辨率）时跳过，避免破坏定长布局
+            if self._skipped == 0:
+                print(f"[警告] 录制帧尺寸变化 {self._shape} -> {tuple(frame.shape)}，已跳过")
+            self._skipped += 1
+            return
+        if self._frames_f is None or self._stamps_f is None:
+            return
+        self._frames_f.write(memoryview(np.ascontiguousarray(frame)).cast("B"))
+        self._stamps_f.write(np.float64(t - (self._t0 or t)).tobytes())
+        self._count += 1
+
+    def close(self) -> None:
+        """关闭数据文件并更新元信息"""
+        for f in (self._frames_f, self._stamps_f):
+            if f is not None:
+                f.close()
+        self._frames_f = None
+        self._stamps_f = None
+        self._write_meta()
+
+    def __enter__(self) -> FrameRecorder:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class ReplaySource:
+    """录制目录回放源，接口与 cv2.VideoCapture 保持一致
+
+    - speed="original"：按录制时的采集间隔节奏输出帧
+    - speed="max"：不等待，尽可能快地输出帧（用于吞吐/延迟对比）
+    read() 返回可写的帧副本，与摄像头读取语义一致
+    """
+
+    def __init__(self, path: str | Path, *, speed: str = "original", loop: bool = False) -> None:
+        if speed not in REPLAY_SPEEDS:
+            msg = f"未知回放速度: {speed}（可选: {', '.join(REPLAY_SPEEDS)}）"
+            raise ValueError(msg)
+        self._dir = Path(path)
+        with (self._dir / META_NAME).open(encoding="utf-8") as f:
+            meta = json.load(f)
+        self.meta: dict[str, Any] = meta
+        shape = (int(meta["height"]), int(meta["width"]), int(meta["channels"]))
+        frame_bytes = shape[0] * shape[1] * shape[2]
+        frames_path = self._dir / FRAMES_NAME
+        n = frames_path.stat().st_size // frame_bytes if frame_bytes else 0
+        stamps = np.fromfile(self._dir / STAMPS_NAME, dtype=np.float64)
+        n = min(n, int(stamps.shape[0]))
+        self._frames: np.ndarray | None = (
+            np.memmap(frames_path, dtype=np.uint8, mode="r", shape=(n, *shape)) if n else None
+        )
+        self._stamps = stamps[:n]
+        self._n = n
+        self._speed = speed
+        self._loop = loop
+        self._pos = 0
+        self._t_start: float | None = None
+        self._pending: int | None = None
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """各帧相对首帧的采集时间（秒）"""
+        return self._stamps
+
+    @property
+    def fps(self) -> float:
+        """按录制时间戳估算的平均帧率"""
+        if self._n > 1 and self._stamps[-1] > 0:
+            return float((self._n - 1) / self._stamps[-1])
+        return DEFAULT_FPS
+
+    def isOpened(self) -> bool:
+        """是否仍有可用帧"""
+        return self._frames is not None
+
+    def _wait_due(self, idx: int) -> None:
+        """按原始节奏等待第 idx 帧的到期时刻"""
+        now = time.perf_counter()
+        if self._t_start is None:
+            self._t_start = now - float(self._stamps[idx])
+            return
+        if self._speed != "original":
+            return
+        delay = self._t_start + float(self._stamps[idx]) - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def grab(self) -> bool:
+        """前进到下一帧（不拷贝像素数据）"""
+        if self._frames is None:
+            return False
+        if self._pos >= self._n:
+            if not self._loop:
+                return False
+            self._pos = 0
+            self._t_start = None
+        self._wait_due(self._pos)
+        self._pending = self._pos
+        self._pos += 1
+        return True
+
+    def retrieve(self) -> tuple[bool, np.ndarray | None]:
+        """取出最近一次 grab 的帧"""
+        if self._frames is None or self._pending is None:
+            return False, None
+        frame = np.array(self._frames[self._pending])
+        self._pending = None
+        return True, frame
+
+    def read(self) -> tuple[bool, np.ndarray | None]:
+        """读取下一帧"""
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def get(self, prop_id: int) -> float:
+        """查询属性（仅支持常用的 FPS/尺寸/帧数/位置）"""
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self._n)
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.meta["width"])
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.meta["height"])
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return float(self._pos)
+        return 0.0
+
+    def set(self, prop_id: int, value: float) -> bool:
+        """设置属性（仅支持 CAP_PROP_POS_FRAMES 跳转）"""
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            self._pos = max(0, min(self._n, int(value)))
+            self._t_start = None
+            return True
+        return False
+
+    def release(self) -> None:
+        """释放内存映射"""
+        self._frames = None
+        self._pending = None
+
+
+__all__ = [
+    "REPLAY_SPEEDS",
+    "FrameRecorder",
+    "ReplaySource",
+    "is_recording",
+]
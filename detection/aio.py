@@ -0,0 +1,241 @@
+"""asyncio 检测接口
+
+AsyncDetector 包装 YOLODetector 或 ChildDetector，推理不阻塞事件循环：
+- await detect(frame)：提交一帧，返回 StreamFrame（YOLODetector）或 (dets, plotted)（ChildDetector）
+- async for res in stream(source)：逐帧读取视频源并检测（每路一个读帧线程，推理在专用线程）
+- 微批：推理线程空闲时请求立即下发（不额外等待）；推理进行中到达的请求在队列中累积，
+  上一批完成后合并为一次推理（最多 max_batch 帧）
+- 超时与取消：timeout（或 detect(timeout=...)）超时抛出 asyncio.TimeoutError；已取消/超时的请求在成批前移除，
+  已开始的推理无法中断，其结果被丢弃
+- 背压：待处理请求超过 max_pending（至少 1）时 detect() 等待
+
+推理在单线程专用执行器中串行执行（模型非线程安全），按检测器配置的 cpu_affinity 绑核
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from detection.cpu import describe_threads, format_info, parse_cpu_list, pin_current_thread
+from detection.stream import from_result
+
+DEFAULT_MAX_BATCH = 8
+DEFAULT_MAX_PENDING = 64
+READ_FAIL_LIMIT = 10
+
+
+@dataclass(slots=True, eq=False)
+class _Request:
+    frame: Any
+    future: asyncio.Future[Any]
+    frame_id: int
+    timestamp: float
+    t_capture: float
+
+
+def _fail_all(queue: asyncio.Queue[_Request], err: BaseException) -> None:
+    while not queue.empty():
+        fut = queue.get_nowait().future
+        if not fut.done():
+            fut.set_exception(err)
+
+
+def _init_worker(cpus: list[int] | None) -> None:
+    pin_current_thread(cpus)
+    print(f"[配置] 异步推理线程: {format_info(describe_threads())}")
+
+
+class AsyncDetector:
+    """在专用线程中执行推理、合并并发请求的异步检测器"""
+
+    def __init__(
+        self,
+        detector: Any,
+        *,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        timeout: float | None = None,
+    ) -> None:
+        self.detector = detector
+        self.max_batch = max(1, int(max_batch))
+        if int(max_pending) < 1:
+            msg = f"max_pending 必须 >= 1（当前 {max_pending}）"
+            raise ValueError(msg)
+        self.max_pending = int(max_pending)
+        self.timeout = timeout
+        cpus = getattr(detector, "_cpus", None)
+        if cpus is None:
+            try:
+                cpus = parse_cpu_list(getattr(detector.cfg, "cpu_affinity", None))
+            except ValueError as e:
+                print(f"[警告] {e}，推理线程不绑定 CPU")
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="COR-AsyncInfer", initializer=_init_worker, initargs=(cpus,)
+        )
+        self._ids = itertools.count()
+        self._queue: asyncio.Queue[_Request] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._closed = False
+        # 统计
+        self.requests = 0
+        self.batches = 0
+        self.batched_frames = 0
+        self.dropped = 0  # 成批前已取消/超时的请求
+
+    async def __aenter__(self) -> AsyncDetector:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+    # -------- 单帧检测 --------
+    async def detect(self, frame: Any, *, timeout: float | None = None) -> Any:
+        """检测一帧；timeout 为 None 时使用构造时的默认值（仍为 None 则不限时）"""
+        return await self._detect(frame, timeout, time.time(), time.perf_counter())
+
+    async def _detect(self, frame: Any, timeout: float | None, timestamp: float, t_capture: float) -> Any:
+        limit = self.timeout if timeout is None else timeout
+        if limit is None or limit <= 0:
+            return await self._submit(frame, timestamp, t_capture)
+        return await asyncio.wait_for(self._submit(frame, timestamp, t_capture), limit)
+
+    async def _submit(self, frame: Any, timestamp: float, t_capture: float) -> Any:
+        if frame is None or not hasattr(frame, "shape"):
+            msg = "frame 必须是 numpy 图像"
+            raise TypeError(msg)
+        queue = self._ensure_started()
+        fut: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self.requests += 1
+        await queue.put(_Request(frame, fut, next(self._ids), timestamp, t_capture))
+        # 调用方被取消（或超时）时该 future 随之取消，成批前会被跳过
+        return await fut
+
+    def _ensure_started(self) -> asyncio.Queue[_Request]:
+        if self._closed:
+            msg = "AsyncDetector 已关闭"
+            raise RuntimeError(msg)
+        if self._queue is None or self._task is None or self._task.done():
+            if self._queue is not None:
+                # 合批任务已结束：旧队列中的请求不会再被处理，先让它们失败
+                _fail_all(self._queue, RuntimeError("合批任务已结束，请求未执行"))
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._task = asyncio.get_running_loop().create_task(self._batch_loop(self._queue))
+        return self._queue
+
+    # -------- 微批与执行 --------
+    async def _batch_loop(self, queue: asyncio.Queue[_Request]) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            try:
+                # 执行器空闲：让出一次事件循环，同一轮提交的并发请求一并成批，随即下发；
+                # 执行器忙碌期间（下方 await）到达的请求留在队列中，下一轮合并
+                await asyncio.sleep(0)
+                while len(batch) < self.max_batch and not queue.empty():
+                    batch.append(queue.get_nowait())
+                live = [r for r in batch if not r.future.done()]
+                self.dropped += len(batch) - len(live)
+                if not live:
+                    continue
+                self.batches += 1
+                self.batched_frames += len(live)
+                outs = await loop.run_in_executor(self._executor, self._run_batch, live)
+                for r, out in zip(live, outs, strict=True):
+                    if not r.future.done():
+                        r.future.set_result(out)
+            except asyncio.CancelledError:
+                # aclose()：已取出（含正在推理）的请求一并取消，避免调用方永久等待
+                for r in batch:
+                    r.future.cancel()
+                raise
+            except Exception as e:
+                for r in batch:
+                    if not r.future.done():
+                        r.future.set_exception(e)
+
+    def _run_batch(self, batch: list[_Request]) -> list[Any]:
+        """在推理线程中执行一批（ChildDetector 返回 (dets, plotted)，YOLODetector 返回 StreamFrame）"""
+        det = self.detector
+        frames = [r.frame for r in batch]
+        if hasattr(det, "detect_frames"):
+            return det.detect_frames(frames)
+        results = det._infer_batch(frames)
+        return [
+            from_result(r.frame_id, r.timestamp, r.t_capture, r.frame, res, _perf=det.perf)
+            for r, res in zip(batch, results, strict=True)
+        ]
+
+    # -------- 视频源 --------
+    def _open(self, source: int | str) -> Any:
+        opener = getattr(self.detector, "_open_capture", None)
+        if opener is not None:
+            return opener(source)
+        import cv2
+
+        from cor_io.recording import ReplaySource, is_recording
+
+        if isinstance(source, str) and is_recording(source):
+            return ReplaySource(source, speed="max")
+        return cv2.VideoCapture(source)
+
+    async def stream(self, source: int | str, *, timeout: float | None = None) -> AsyncIterator[Any]:
+        """逐帧读取视频源并检测；多路 stream 并发时各路的帧会合并成批。文件/录制读完即结束，
+        摄像头连续 READ_FAIL_LIMIT 次读取失败后结束。提前退出时用 contextlib.aclosing 及时释放视频源"""
+        loop = asyncio.get_running_loop()
+        # 每路一个读帧线程：取消时正在进行的 read 跑完后才 release，避免并发访问同一个 cap
+        reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="COR-AsyncRead")
+        cap: Any = None
+        try:
+            cap = await loop.run_in_executor(reader, self._open, source)
+            if not cap.isOpened():
+                msg = f"无法打开视频源： {source}"
+                raise RuntimeError(msg)
+            fails = 0
+            while True:
+                ok, frame = await loop.run_in_executor(reader, cap.read)
+                t_capture = time.perf_counter()
+                if not ok or frame is None:
+                    fails += 1
+                    if not isinstance(source, int) or fails >= READ_FAIL_LIMIT:
+                        break
+                    continue
+                fails = 0
+                yield await self._detect(frame, timeout, time.time(), t_capture)
+        finally:
+            if cap is not None:
+                reader.submit(cap.release)
+            reader.shutdown(wait=False)
+
+    # -------- 关闭与统计 --------
+    async def aclose(self) -> None:
+        """停止合批任务，取消未开始的请求并关闭推理线程（正在执行的一批会跑完）"""
+        self._closed = True
+        task, queue = self._task, self._queue
+        self._task = self._queue = None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if queue is not None:
+            while not queue.empty():
+                queue.get_nowait().future.cancel()
+        await asyncio.to_thread(self._executor.shutdown, wait=True, cancel_futures=True)
+
+    def summary(self) -> str:
+        """一行统计：请求数、批次数与平均批大小"""
+        avg = self.batched_frames / self.batches if self.batches else 0.0
+        return (
+            f"[异步] 请求 {self.requests} 个，推理 {self.batches} 批（平均 {avg:.2f} 帧/批），"
+            f"成批前取消/超时 {self.dropped} 个"
+        )
+
+
+__all__ = ["DEFAULT_MAX_BATCH", "DEFAULT_MAX_PENDING", "AsyncDetector"]
@@ -2,7 +2,9 @@
 
 统一导出核心类型与函数，供 GUI 与 CLI 调用：
 - YOLOConfig: 参数配置
-- YOLODetector: 核心检测器
+- YOLODetector: 核心检测器（stream() 逐帧产出 StreamFrame）
+- StreamFrame: 流式检测的单帧结果
+- AsyncDetector: asyncio 接口（专用推理线程 + 并发请求微批）
 - enumerate_cameras: 摄像头探测
 - load_config_from_args: 从命令行参数构建配置
 - main: 命令行入口
@@ -10,10 +12,14 @@
 
 from __future__ import annotations
 
+from .aio import AsyncDetector
 from .core import (YOLOConfig, YOLODetector, enumerate_cameras,
                    load_config_from_args, main)
+from .stream import StreamFrame
 
 __all__ = [
+    "AsyncDetector",
+    "StreamFrame",
     "YOLOConfig",
     "YOLODetector",
     "enumerate_cameras",
@@ -0,0 +1,221 @@
+"""自动调优：python main.py detect --autotune --target-ms 50 [--tuned-profile 路径]
+
+在当前视频源的一小段本地样本上扫描 设备 × 推理尺寸 × torch 线程数：
+- 延迟：逐帧 predict 耗时（含前/后处理）的 p50/p95
+- 一致度：与参考配置（最大尺寸、默认线程）的检测结果对比，按类别 + IoU>=0.5 匹配，逐帧 F1 取平均
+选择 p95 不超过目标且一致度达标的最快组合，写出调优配置 JSON；
+之后运行时用 --tuned-profile（或 COR_TUNED_PROFILE）加载，环境变量与命令行仍可覆盖其中的值
+
+批大小不参与扫描：实时检测逐帧处理，批量推理只会增加单帧延迟（离线吞吐比较见 main.py bench）
+推理后端只扫描 torch 设备（CUDA/MPS 与 CPU）：检测器只通过 ultralytics 加载 .pt 权重，
+ONNX/TensorRT 等导出后端需要额外依赖与导出步骤，运行时也无法加载，故不参与扫描
+调优不修改调用方的配置：样本读取与推理使用配置副本（静音、按最快速度回放录制）
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import replace
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from detection.core import YOLOConfig, YOLODetector
+from detection.perf import LatencyHistogram
+from voice.backends import BACKEND_NULL
+
+DEFAULT_PROFILE = "results/tuned_profile.json"
+DEFAULT_TARGET_MS = 50.0
+DEFAULT_FRAMES = 30
+DEFAULT_MIN_AGREEMENT = 0.9
+DEFAULT_IMG_SIZES = (320, 416, 512, 640)
+WARMUP_FRAMES = 2
+MATCH_IOU = 0.5
+# 调优配置可写入的字段
+TUNED_FIELDS = ("device", "img_size", "torch_threads")
+
+
+def load_tuned_values(cfg: YOLOConfig, path: str | Path) -> dict[str, Any]:
+    """读取调优配置中可应用的字段值（由 detection.core.resolve_config 按优先级写入）"""
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        print(f"[警告] 读取调优配置失败: {e}")
+        return {}
+    if data.get("model_path") and data["model_path"] != cfg.model_path:
+        print(f"[警告] 调优配置针对模型 {data['model_path']}，当前模型为 {cfg.model_path}")
+    tuned = data.get("config", {})
+    return {name: tuned[name] for name in TUNED_FIELDS if name in tuned}
+
+
+def _thread_candidates() -> list[int]:
+    """torch 线程数候选：1、2、4、半数核心、全部核心（去重且不超过核心数）"""
+    n = os.cpu_count() or 1
+    return sorted({t for t in (1, 2, 4, max(1, n // 2), n) if t <= n})
+
+
+def _read_sample(det: YOLODetector, n: int) -> list[Any]:
+    """从配置的视频源读取 n 帧样本"""
+    cap = det._open_capture()
+    if not cap.isOpened():
+        msg = f"无法打开视频源： {det.cfg.source}"
+        raise RuntimeError(msg)
+    frames: list[Any] = []
+    try:
+        while len(frames) < n:
+            ok, frame = cap.read()
+            if not ok or frame is None:
+                break
+            frames.append(frame)
+    finally:
+        cap.release()
+    if not frames:
+        msg = f"视频源中没有可读取的帧： {det.cfg.source}"
+        raise RuntimeError(msg)
+    return frames
+
+
+def _boxes(result: Any) -> list[tuple[int, list[float]]]:
+    """提取 (类别, xyxy) 列表"""
+    boxes = getattr(result, "boxes", None)
+    if boxes is None or len(boxes) == 0:
+        return []
+    return list(zip(boxes.cls.int().tolist(), boxes.xyxy.tolist(), strict=True))
+
+
+def _iou(a: list[float], b: list[float]) -> float:
+    """两个 xyxy 框的交并比"""
+    iw = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    ih = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = iw * ih
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def agreement(ref: list[tuple[int, list[float]]], cand: list[tuple[int, list[float]]]) -> float:
+    """单帧一致度（F1）：同类别且 IoU 达标的框贪心一对一匹配；两者都为空记为 1"""
+    if not ref and not cand:
+        return 1.0
+    if not ref or not cand:
+        return 0.0
+    pairs = sorted(
+        ((_iou(rb, cb), i, j) for i, (rc, rb) in enumerate(ref) for j, (cc, cb) in enumerate(cand) if rc == cc),
+        reverse=True,
+    )
+    used_r: set[int] = set()
+    used_c: set[int] = set()
+    for iou, i, j in pairs:
+        if iou < MATCH_IOU:
+            break
+        if i in used_r or j in used_c:
+            continue
+        used_r.add(i)
+        used_c.add(j)
+    return 2.0 * len(used_r) / (len(ref) + len(cand))
+
+
+def _run(det: YOLODetector, frames: list[Any], *, device: str, img_size: int, threads: int) -> dict[str, Any]:
+    """以指定组合推理全部样本，返回延迟统计与逐帧检测框"""
+    import torch
+
+    torch.set_num_threads(threads)
+    hist = LatencyHistogram()
+    kwargs = {"imgsz": [img_size, img_size], "conf": det.cfg.conf, "device": device, "verbose": False}
+    for frame in frames[:WARMUP_FRAMES]:
+        det.model.predict(frame, **kwargs)
+    boxes = []
+    for frame in frames:
+        t0 = time.perf_counter()
+        result = det.model.predict(frame, **kwargs)[0]
+        hist.record((time.perf_counter() - t0) * 1000.0)
+        boxes.append(_boxes(result))
+    st = hist.summary()
+    return {"p50_ms": st["p50_ms"], "p95_ms": st["p95_ms"], "mean_ms": st["mean_ms"], "boxes": boxes}
+
+
+def autotune(
+    cfg: YOLOConfig,
+    *,
+    target_ms: float = DEFAULT_TARGET_MS,
+    frames: int | None = None,
+    min_agreement: float | None = None,
+    img_sizes: tuple[int, ...] = DEFAULT_IMG_SIZES,
+    out: str | Path | None = None,
+) -> dict[str, Any]:
+    """扫描候选组合并写出调优配置，返回配置内容"""
+    import torch
+
+    n_frames = frames or DEFAULT_FRAMES
+    min_agree = DEFAULT_MIN_AGREEMENT if min_agreement is None else min_agreement
+    target = Path(out or cfg.tuned_profile or DEFAULT_PROFILE)
+    # 副本：调优不发声、录制目录按最快速度读取，且不改动调用方的 cfg
+    det = YOLODetector(replace(cfg, tts_backend=BACKEND_NULL, replay_speed="max"))
+    sample = _read_sample(det, n_frames)
+    default_threads = torch.get_num_threads()
+    devices = [det.device] + (["cpu"] if det.device != "cpu" else [])
+    sizes = sorted(set(img_sizes) | set(cfg.img_size or []))
+    print(f"[调优] 样本 {len(sample)} 帧，目标 p95 <= {target_ms:.1f}ms，一致度 >= {min_agree:.2f}")
+
+    try:
+        ref = _run(det, sample, device=det.device, img_size=sizes[-1], threads=default_threads)
+        candidates: list[dict[str, Any]] = []
+        for device in devices:
+            # 线程数只影响 CPU 推理；GPU 上保持默认值
+            for threads in _thread_candidates() if device == "cpu" else [default_threads]:
+                for size in sizes:
+                    res = _run(det, sample, device=device, img_size=size, threads=threads)
+                    agree = sum(agreement(r, c) for r, c in zip(ref["boxes"], res["boxes"], strict=True)) / len(sample)
+                    row = {
+                        "device": device,
+                        "img_size": size,
+                        "torch_threads": threads,
+                        "p50_ms": res["p50_ms"],
+                        "p95_ms": res["p95_ms"],
+                        "agreement": agree,
+                    }
+                    candidates.append(row)
+                    print(
+                        f"  {device:<6} size={size:<4} threads={threads:<3} "
+                        f"p50={row['p50_ms']:7.2f}ms p95={row['p95_ms']:7.2f}ms agree={agree:.3f}"
+                    )
+    finally:
+        torch.set_num_threads(default_threads)
+
+    fits = [c for c in candidates if c["p95_ms"] <= target_ms]
+    good = [c for c in fits if c["agreement"] >= min_agree]
+    if good:
+        chosen = min(good, key=lambda c: c["p50_ms"])
+    elif fits:
+        chosen = max(fits, key=lambda c: (c["agreement"], -c["p50_ms"]))
+        print(f"[警告] 满足延迟目标的组合一致度均低于 {min_agree:.2f}，选择一致度最高者")
+    else:
+        chosen = min(candidates, key=lambda c: c["p95_ms"])
+        print(f"[警告] 没有组合满足 p95 <= {target_ms:.1f}ms，选择最快者")
+
+    profile = {
+        "created": datetime.now(UTC).isoformat(timespec="seconds"),
+        "model_path": cfg.model_path,
+        "source": str(cfg.source),
+        "target_ms": target_ms,
+        "min_agreement": min_agree,
+        "config": {
+            "device": chosen["device"],
+            "img_size": [chosen["img_size"], chosen["img_size"]],
+            "torch_threads": chosen["torch_threads"] if chosen["device"] == "cpu" else 0,
+        },
+        "chosen": chosen,
+        "candidates": candidates,
+    }
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(json.dumps(profile, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(
+        f"[调优] 选择 device={chosen['device']} img_size={chosen['img_size']} "
+        f"torch_threads={chosen['torch_threads']}（p95 {chosen['p95_ms']:.2f}ms，一致度 {chosen['agreement']:.3f}）"
+    )
+    print(f"[调优] 已写出: {target}（运行时使用 --tuned-profile {target} 加载）")
+    return profile
+
+
+__all__ = ["DEFAULT_PROFILE", "agreement", "autotune", "load_tuned_values"]
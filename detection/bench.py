@@ -0,0 +1,373 @@
+"""基准测试：python main.py bench [参数] 或 python -m detection.bench [参数]
+
+不需要摄像头与显示器：在合成帧或录制目录/视频文件的帧上运行 YOLODetector / ChildDetector，
+按参数矩阵（目标 × 设备 × 线程数 × 算子间线程数 × 绑核 × 推理尺寸 × 批大小 × headless）逐一测量，输出 JSON 报告：
+- 吞吐（帧/秒，不含预热）
+- 分阶段耗时分位数（preprocess/inference/postprocess 取自 ultralytics，另有 plot/frame/batch）
+- 峰值 RSS（MB）与启动耗时（进程启动 -> 模型加载完成 -> 首帧推理完成）
+- 实际生效的线程设置（intra/inter-op 线程数、绑定核心）
+
+每个组合默认在独立子进程中运行，启动耗时与峰值内存互不影响；--in-process 可关闭隔离
+headless=off 表示额外执行绘制/标注（显示前的渲染工作），但始终不打开窗口
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from detection.cpu import describe_threads, parse_cpu_list, pinned_thread
+
+DEFAULT_MODEL = "models/yolo/yolo11n.pt"
+DEFAULT_OUT_DIR = "results/bench"
+DEFAULT_SIZE = "640x480"
+TARGETS = ("yolo", "child")
+HEADLESS_CHOICES = ("on", "off")
+NATIVE_IMG_SIZE = "native"
+_MB = 1024 * 1024
+_WORKER_FLAG = "--_case"
+
+
+def _split(raw: str) -> list[str]:
+    """逗号分隔列表"""
+    return [x.strip() for x in raw.split(",") if x.strip()]
+
+
+def _parse_size(raw: str) -> tuple[int, int]:
+    """解析 宽x高"""
+    w, _, h = raw.lower().partition("x")
+    return int(w), int(h)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建 bench 参数解析器"""
+    p = argparse.ArgumentParser(prog="main.py bench", description="检测基准测试（无摄像头/无显示）")
+    p.add_argument("--model", default=DEFAULT_MODEL, help="模型权重路径")
+    p.add_argument("--source", default="", help="录制目录或视频文件；留空使用合成帧")
+    p.add_argument("--size", default=DEFAULT_SIZE, help="合成帧尺寸 宽x高（默认 640x480）")
+    p.add_argument("--frames", type=int, default=100, help="每个组合测量的帧数")
+    p.add_argument("--warmup", type=int, default=5, help="预热帧数（不计入统计）")
+    p.add_argument("--target", default="yolo", help="逗号分隔：yolo,child")
+    p.add_argument("--device", default="cpu", help="逗号分隔：cpu,cuda,mps,auto")
+    p.add_argument("--threads", default="0", help="逗号分隔的 torch 算子内线程数（0 表示默认）")
+    p.add_argument("--interop-threads", dest="interop_threads", default="0", help="逗号分隔的 torch 算子间线程数（0 表示默认）")
+    p.add_argument("--affinity", default="", help="分号分隔的绑核方案，例如 '0-3;0-1'（留空表示不绑定）")
+    p.add_argument("--img-size", dest="img_size", default="640", help="逗号分隔的推理尺寸（native 表示原始尺寸）")
+    p.add_argument("--batch", default="1", help="逗号分隔的批大小")
+    p.add_argument("--headless", default="on", help="逗号分隔：on（只推理）/ off（含绘制标注）")
+    p.add_argument("--conf", type=float, default=0.25, help="置信度阈值")
+    p.add_argument("--out", default="", help="报告 JSON 路径（默认 results/bench/bench_时间戳.json）")
+    p.add_argument("--in-process", dest="in_process", action="store_true", help="在当前进程内依次运行（不隔离）")
+    return p
+
+
+def expand_matrix(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """展开参数矩阵"""
+    targets = _split(args.target)
+    for t in targets:
+        if t not in TARGETS:
+            msg = f"未知目标: {t}（可选: {', '.join(TARGETS)}）"
+            raise SystemExit(msg)
+    headless = _split(args.headless)
+    for h in headless:
+        if h not in HEADLESS_CHOICES:
+            msg = f"--headless 只能为 on/off: {h}"
+            raise SystemExit(msg)
+    cases = []
+    affinities = [a.strip() for a in args.affinity.split(";") if a.strip()] or [None]
+    for aff in affinities:
+        try:
+            parse_cpu_list(aff)
+        except ValueError as e:
+            raise SystemExit(str(e)) from None
+    for target, device, threads, interop, aff, img_size, batch, hl in itertools.product(
+        targets,
+        _split(args.device),
+        [int(x) for x in _split(args.threads)],
+        [int(x) for x in _split(args.interop_threads)],
+        affinities,
+        _split(args.img_size),
+        [max(1, int(x)) for x in _split(args.batch)],
+        headless,
+    ):
+        cases.append(
+            {
+                "target": target,
+                "device": device,
+                "threads": threads,
+                "interop_threads": interop,
+                "affinity": aff,
+                "img_size": None if img_size == NATIVE_IMG_SIZE else int(img_size),
+                "batch": batch,
+                "headless": hl == "on",
+            }
+        )
+    return cases
+
+
+def load_frames(source: str, size: str, n: int) -> list[Any]:
+    """读取测试帧：录制目录/视频文件（不足时循环使用），否则生成确定性的合成帧"""
+    import cv2
+    import numpy as np
+
+    frames: list[Any] = []
+    if source:
+        from cor_io.recording import ReplaySource, is_recording
+
+        cap: Any = ReplaySource(source, speed="max") if is_recording(source) else cv2.VideoCapture(source)
+        if not cap.isOpened():
+            msg = f"无法打开测试源: {source}"
+            raise SystemExit(msg)
+        while len(frames) < n:
+            ok, frame = cap.read()
+            if not ok or frame is None:
+                break
+            frames.append(frame)
+        cap.release()
+        if not frames:
+            msg = f"测试源中没有可读取的帧: {source}"
+            raise SystemExit(msg)
+        base = list(frames)
+        while len(frames) < n:
+            frames.extend(base[: n - len(frames)])
+        return frames
+    w, h = _parse_size(size)
+    rng = np.random.default_rng(0)
+    # 噪声背景上叠加随机色块，避免纯噪声导致后处理几乎无事可做
+    for _ in range(n):
+        img = rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8)
+        for _ in range(4):
+            x, y = int(rng.integers(0, w - w // 4)), int(rng.integers(0, h - h // 4))
+            color = tuple(int(c) for c in rng.integers(0, 256, size=3))
+            cv2.rectangle(img, (x, y), (x + w // 4, y + h // 4), color, -1)
+        frames.append(img)
+    return frames
+
+
+def peak_rss_mb() -> float | None:
+    """当前进程峰值常驻内存（MB）；无法获取时返回 None"""
+    try:
+        import resource
+    except ImportError:  # Windows：psutil 的 peak_wset 即峰值工作集
+        try:
+            import psutil  # pyright: ignore[reportMissingModuleSource]
+        except ImportError:
+            return None
+        peak = getattr(psutil.Process().memory_info(), "peak_wset", None)
+        return peak / _MB if peak else None
+    ru = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return ru / _MB if sys.platform == "darwin" else ru / 1024.0
+
+
+def run_case(case: dict[str, Any], common: dict[str, Any], t_spawn: float | None = None) -> dict[str, Any]:
+    """运行单个组合并返回结果（在子进程或当前进程中调用）"""
+    t_start = time.time() if t_spawn is None else t_spawn
+    from detection.perf import PerfRecorder
+
+    # 绑核须在模型加载与首次推理前完成（退出时恢复，--in-process 的后续组合不受影响）；线程数由检测器按配置设置
+    with pinned_thread(parse_cpu_list(case["affinity"])):
+        frames = load_frames(common["source"], common["size"], common["frames"] + common["warmup"])
+        t_load0 = time.perf_counter()
+        runner = _make_runner(case, common)
+        model_load_ms = (time.perf_counter() - t_load0) * 1000.0
+
+        perf = PerfRecorder()
+        warm, timed = frames[: common["warmup"]], frames[common["warmup"] :]
+        startup_ms: float | None = None
+        for batch in _batches(warm or timed[:1], case["batch"]):
+            runner(batch, None)
+            if startup_ms is None:
+                startup_ms = (time.time() - t_start) * 1000.0
+        t0 = time.perf_counter()
+        n = 0
+        for batch in _batches(timed, case["batch"]):
+            tb = time.perf_counter()
+            runner(batch, perf)
+            dt_ms = (time.perf_counter() - tb) * 1000.0
+            perf.record("batch", dt_ms)
+            for _ in batch:
+                perf.record("frame", dt_ms / len(batch))
+            n += len(batch)
+        wall = time.perf_counter() - t0
+        threads_info = describe_threads()
+    return {
+        "params": case,
+        "frames": n,
+        "fps": n / wall if wall > 0 else 0.0,
+        "startup_ms": startup_ms,
+        "model_load_ms": model_load_ms,
+        "peak_rss_mb": peak_rss_mb(),
+        "threads_info": threads_info,
+        "stages": perf.summary(),
+    }
+
+
+def _batches(frames: list[Any], size: int) -> list[list[Any]]:
+    """按批大小切分"""
+    return [frames[i : i + size] for i in range(0, len(frames), size)]
+
+
+def _make_runner(case: dict[str, Any], common: dict[str, Any]):
+    """按目标创建推理函数 runner(batch, perf)"""
+    img_size = case["img_size"]
+    if case["target"] == "child":
+        from app.kids_core import ChildConfig, ChildDetector
+
+        det = ChildDetector(
+            ChildConfig(
+                model_path=common["model"],
+                conf=common["conf"],
+                img_size=None if img_size is None else [img_size, img_size],
+                device=case["device"],
+                cache_size=0,
+                torch_threads=case["threads"],
+                torch_interop_threads=case["interop_threads"],
+            )
+        )
+
+        def run_child(batch: list[Any], perf: Any) -> None:
+            det.perf = perf
+            if len(batch) > 1 and hasattr(det, "detect_frames"):
+                outs = det.detect_frames(batch)
+            else:
+                outs = [det.detect_frame(f) for f in batch]
+            if not case["headless"]:
+                for dets, plotted in outs:
+                    idx = det.pick_center_object(dets, plotted.shape)
+                    det.annotate_with_center(plotted, dets, idx)
+
+        return run_child
+
+    from detection.core import YOLOConfig, YOLODetector
+    from detection.stream import from_result
+
+    cfg = YOLOConfig()
+    cfg.model_path = common["model"]
+    cfg.device = case["device"]
+    cfg.conf = common["conf"]
+    cfg.img_size = None if img_size is None else [img_size, img_size]
+    cfg.tts_backend = "null"
+    cfg.torch_threads = case["threads"]
+    cfg.torch_interop_threads = case["interop_threads"]
+    cfg.cpu_affinity = None
+    det = YOLODetector(cfg)
+
+    def run_yolo(batch: list[Any], perf: Any) -> None:
+        # 与 stream() 相同的路径：推理尺寸解析、批量分组与结果转换；预热记入检测器自带的记录器
+        if perf is not None:
+            det.perf = perf
+        results = det._infer_batch(batch) if len(batch) > 1 else [det._infer(batch[0])]
+        now = time.time()
+        for i, (frame, result) in enumerate(zip(batch, results, strict=True)):
+            sf = from_result(i, now, time.perf_counter(), frame, result, _perf=det.perf)
+            if not case["headless"]:
+                _ = sf.annotated  # 触发绘制，计入 plot 阶段
+
+    return run_yolo
+
+
+def _run_isolated(case: dict[str, Any], common: dict[str, Any]) -> dict[str, Any]:
+    """在子进程中运行单个组合"""
+    payload = json.dumps({"case": case, "common": common, "t_spawn": time.time()})
+    proc = subprocess.run(
+        [sys.executable, "-m", "detection.bench", _WORKER_FLAG, payload],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        check=False,
+        cwd=os.getcwd(),
+    )
+    lines = [ln for ln in proc.stdout.splitlines() if ln.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        err = (proc.stderr or proc.stdout).strip().splitlines()
+        return {"params": case, "error": err[-1] if err else f"退出码 {proc.returncode}"}
+    return json.loads(lines[-1])
+
+
+def _meta(common: dict[str, Any]) -> dict[str, Any]:
+    """运行环境信息"""
+    meta: dict[str, Any] = {
+        "created": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        **common,
+    }
+    try:
+        import torch
+
+        meta["torch"] = torch.__version__
+        meta["cuda"] = torch.cuda.is_available()
+    except ImportError:
+        pass
+    return meta
+
+
+def _print_table(results: list[dict[str, Any]]) -> None:
+    """打印简要结果表"""
+    print(f"{'target':<7}{'device':<7}{'thr':>4}{'iop':>4}{'cpus':>8}{'imgsz':>7}{'batch':>6}{'hl':>4}{'fps':>9}{'p50':>9}{'p95':>9}{'rss':>8}{'start':>9}")
+    for r in results:
+        p = r["params"]
+        hl = "on" if p["headless"] else "off"
+        head = (
+            f"{p['target']:<7}{p['device']:<7}{p['threads']:>4}{p['interop_threads']:>4}{p['affinity'] or '-':>8}"
+            f"{p['img_size'] or 'nat':>7}{p['batch']:>6}{hl:>4}"
+        )
+        if "error" in r:
+            print(f"{head}  失败: {r['error']}")
+            continue
+        frame = r["stages"].get("frame", {})
+        rss = r.get("peak_rss_mb")
+        print(
+            f"{head}{r['fps']:>9.2f}{frame.get('p50_ms', 0.0):>9.2f}{frame.get('p95_ms', 0.0):>9.2f}"
+            f"{(f'{rss:.0f}' if rss is not None else '-'):>8}{(r.get('startup_ms') or 0.0):>9.0f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """bench 入口"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == [_WORKER_FLAG]:
+        job = json.loads(argv[1])
+        print(json.dumps(run_case(job["case"], job["common"], job["t_spawn"]), ensure_ascii=False))
+        return
+    args = build_parser().parse_args(argv)
+    common = {
+        "model": args.model,
+        "source": args.source,
+        "size": args.size,
+        "frames": max(1, args.frames),
+        "warmup": max(0, args.warmup),
+        "conf": args.conf,
+    }
+    cases = expand_matrix(args)
+    results: list[dict[str, Any]] = []
+    for i, case in enumerate(cases, 1):
+        print(f"[{i}/{len(cases)}] {case}")
+        if args.in_process:
+            try:
+                res = run_case(case, common)
+            except Exception as e:
+                res = {"params": case, "error": str(e)}
+        else:
+            res = _run_isolated(case, common)
+        results.append(res)
+    out = Path(args.out) if args.out else Path(DEFAULT_OUT_DIR) / f"bench_{datetime.now(UTC):%Y%m%d_%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"meta": _meta(common), "results": results}, ensure_ascii=False, indent=2), encoding="utf-8")
+    _print_table(results)
+    print(f"[信息] 报告已写出: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,10 @@ from __future__ import annotations
 
 import argparse
 import os
-from contextlib import contextmanager
-from dataclasses import asdict, dataclass, field
+import time
+from collections.abc import Iterator
+from contextlib import ExitStack, closing, contextmanager
+from dataclasses import asdict, dataclass, field, fields
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
@@ -14,7 +16,22 @@ import cv2
 import torch
 from ultralytics import YOLO  # pyright: ignore[reportPrivateImportUsage]
 
-from voice import Announcer
+from cor_io.recording import REPLAY_SPEEDS, FrameRecorder, ReplaySource, is_recording
+from detection.cpu import (
+    configure_torch_threads,
+    describe_threads,
+    format_info,
+    parse_cpu_list,
+    pinned_thread,
+)
+from detection.metrics import MetricsRegistry, MetricsServer
+from detection.perf import DEFAULT_DUMP_INTERVAL_SEC, PerfRecorder
+from detection.shedding import DEFAULT_MAX_QUEUE, LoadShedder
+from detection.stream import FramePrefetcher, StreamFrame, from_result, size_groups
+from detection.tracing import Tracer, current_trace, set_current
+from voice import Announcer, SpeechWorker
+from voice.announce import DEFAULT_MAX_PENDING
+from voice.backends import BACKEND_NULL, BACKEND_PYTTSX3, BACKENDS, DEFAULT_WAV_DIR, SpeechBackend, make_backend
 
 # 环境变量前缀
 ENV_PREFIX = "COR_"  # 例如 COR_MODEL_PATH
@@ -68,6 +85,10 @@ class YOLOConfig:
     save_txt: bool = field(default_factory=lambda: _as_bool(_env("SAVE_TXT", default=False)))
     # 可选：保存叠加结果为视频文件（mp4/avi），为空表示不保存
     save_video: str | None = field(default_factory=lambda: (_env("SAVE_VIDEO", "") or None))
+    # 可选：录制原始采集帧与采集时间戳到目录（供离线回放复现），为空表示不录制
+    record_dir: str | None = field(default_factory=lambda: (_env("RECORD_DIR", "") or None))
+    # 录制目录作为视频源时的回放速度：original 按原始节奏 / max 尽可能快
+    replay_speed: str = field(default_factory=lambda: _env("REPLAY_SPEED", "original"))
 
     # 摄像头选择（仅启动时）
     select_camera: bool = field(default_factory=lambda: _as_bool(_env("SELECT_CAMERA", default=False)))
@@ -77,6 +98,13 @@ class YOLOConfig:
     conf: float = field(default_factory=lambda: float(_env("CONF", 0.6)))
     # 输入尺寸；为空(None) 时表示使用原始帧尺寸而不是模型的默认缩放尺寸
     img_size: list[int] | None = field(default_factory=lambda: _as_optional_int_list(_env("IMG_SIZE", "")))
+    # torch 算子内/算子间线程数（0 表示使用 torch 默认值）
+    torch_threads: int = field(default_factory=lambda: int(_env("TORCH_THREADS", 0)))
+    torch_interop_threads: int = field(default_factory=lambda: int(_env("TORCH_INTEROP_THREADS", 0)))
+    # 推理线程绑定的 CPU 核心，例如 "0-3" 或 "2,3"；空表示不绑定
+    cpu_affinity: str | None = field(default_factory=lambda: (_env("CPU_AFFINITY", "") or None))
+    # 自动调优生成的配置文件（见 detection.autotune）；其中的设备/尺寸/线程数优先于默认值，低于环境变量与命令行
+    tuned_profile: str | None = field(default_factory=lambda: (_env("TUNED_PROFILE", "") or None))
 
     # 界面与输出细节
     window_name: str = field(default_factory=lambda: _env("WINDOW_NAME", "COR"))
@@ -92,6 +120,23 @@ class YOLOConfig:
 
     # 播报/节流参数
     ann_min_interval: float = field(default_factory=lambda: float(_env("ANN_MIN_INTERVAL", 1.5)))
+    # 数量播报平滑：同一数量组合连续稳定的帧数（1 表示不平滑）
+    ann_stable_frames: int = field(default_factory=lambda: int(_env("ANN_STABLE_FRAMES", 3)))
+    # 语音后端：pyttsx3 朗读 / null 不发声（不创建播报器） / wav 渲染到目录
+    tts_backend: str = field(default_factory=lambda: _env("TTS_BACKEND", "pyttsx3"))
+    tts_wav_dir: str = field(default_factory=lambda: _env("TTS_WAV_DIR", DEFAULT_WAV_DIR))
+    # 分阶段耗时：退出时打印；指定路径时按间隔写出 JSON 快照
+    perf_json: str | None = field(default_factory=lambda: (_env("PERF_JSON", "") or None))
+    perf_interval: float = field(
+        default_factory=lambda: float(_env("PERF_INTERVAL", DEFAULT_DUMP_INTERVAL_SEC))
+    )
+    # Prometheus 指标端点（host:port，空表示不开启），例如 127.0.0.1:9108
+    metrics_addr: str | None = field(default_factory=lambda: (_env("METRICS_ADDR", "") or None))
+    # 逐帧追踪导出（Chrome trace-event JSON 路径，空表示只统计端到端延迟不导出）
+    trace_json: str | None = field(default_factory=lambda: (_env("TRACE_JSON", "") or None))
+    # 过载降级：采集->显示延迟预算（毫秒，0 表示关闭）与播报队列积压上限（见 detection.shedding）
+    shed_budget_ms: float = field(default_factory=lambda: float(_env("SHED_BUDGET_MS", 0)))
+    shed_max_queue: int = field(default_factory=lambda: int(_env("SHED_MAX_QUEUE", DEFAULT_MAX_QUEUE)))
 
     def to_dict(self):  # 便于调试打印
         """将配置转换为字典形式"""
@@ -114,49 +159,167 @@ def build_arg_parser() -> argparse.ArgumentParser:
     parser.add_argument("--source", dest="source", help="视频源: 摄像头索引或视频文件路径")
     parser.add_argument("--save-dir", dest="save_dir", help="结果保存目录")
     parser.add_argument("--save-video", dest="save_video", help="输出叠加结果的视频文件路径 (mp4/avi)")
-    parser.add_argument("--save-txt", dest="save_txt", action="store_true", help="保存 YOLO txt 标注文件")
+    parser.add_argument("--save-txt", dest="save_txt", action="store_true", default=None, help="保存 YOLO txt 标注文件")
+    # 录制与回放（--source 指向录制目录时自动回放）
+    parser.add_argument("--record", dest="record_dir", help="录制原始采集帧到目录（可作为 --source 回放）")
+    parser.add_argument(
+        "--replay-speed",
+        dest="replay_speed",
+        choices=REPLAY_SPEEDS,
+        help="回放录制目录的速度: original 按原始节奏 / max 尽可能快",
+    )
     # 摄像头相关（仅启动选择，不再支持运行时切换）
-    parser.add_argument("--select-camera", dest="select_camera", action="store_true", help="启动时列出并交互选择可用摄像头")
+    parser.add_argument("--select-camera", dest="select_camera", action="store_true", default=None, help="启动时列出并交互选择可用摄像头")
     parser.add_argument("--max-cam", dest="max_cam_index", type=int, help="枚举最大摄像头索引 (默认 8)")
     parser.add_argument("--conf", dest="conf", type=float, help="置信度阈值 (0~1)")
     parser.add_argument("--img-size", dest="img_size", help="输入尺寸: 例如 640 或 640,640")
+    parser.add_argument("--torch-threads", dest="torch_threads", type=int, help="torch 算子内线程数 (0 为默认)")
+    parser.add_argument("--torch-interop-threads", dest="torch_interop_threads", type=int, help="torch 算子间线程数 (0 为默认)")
+    parser.add_argument("--cpu-affinity", dest="cpu_affinity", help="推理线程绑定的 CPU 核心，例如 0-3 或 2,3")
+    parser.add_argument("--tuned-profile", dest="tuned_profile", help="加载（--autotune 时写出）自动调优配置 JSON")
+    # 自动调优：在本地短样本上扫描设备/尺寸/线程数，写出调优配置后退出
+    parser.add_argument("--autotune", dest="autotune", action="store_true", help="自动调优并写出配置文件后退出")
+    parser.add_argument("--target-ms", dest="target_ms", type=float, help="自动调优的单帧延迟目标(毫秒，按 p95)")
+    parser.add_argument("--autotune-frames", dest="autotune_frames", type=int, help="自动调优使用的样本帧数")
+    parser.add_argument("--min-agreement", dest="min_agreement", type=float, help="与参考配置的最低检测一致度 (0~1)")
     parser.add_argument("--window-name", dest="window_name", help="窗口标题")
     parser.add_argument("--timestamp-fmt", dest="timestamp_fmt", help="时间戳格式 strftime")
     parser.add_argument("--exit-key", dest="exit_key", help="退出按键 (默认 q)")
-    parser.add_argument("--no-fps", dest="show_fps", action="store_false", help="关闭 FPS 显示")
-    parser.add_argument("--quiet-cv", dest="quiet_cv", action="store_true", help="抑制 OpenCV 摄像头错误日志")
+    parser.add_argument("--no-fps", dest="show_fps", action="store_false", default=None, help="关闭 FPS 显示")
+    parser.add_argument("--quiet-cv", dest="quiet_cv", action="store_true", default=None, help="抑制 OpenCV 摄像头错误日志")
     parser.add_argument("--cam-fail-limit", dest="cam_fail_limit", type=int, help="摄像头枚举连续失败上限 (默认 3)")
     # 播报/节流参数
     parser.add_argument("--ann-min-interval", dest="ann_min_interval", type=float, help="同句最小播报间隔(秒)")
+    parser.add_argument(
+        "--ann-stable-frames",
+        dest="ann_stable_frames",
+        type=int,
+        help="数量稳定多少帧后才播报（1 表示不平滑）",
+    )
+    parser.add_argument("--tts-backend", dest="tts_backend", choices=BACKENDS, help="语音后端: pyttsx3 / null / wav")
+    parser.add_argument("--tts-wav-dir", dest="tts_wav_dir", help="wav 后端的输出目录")
+    parser.add_argument("--perf-json", dest="perf_json", help="周期性写出分阶段耗时统计的 JSON 路径")
+    parser.add_argument("--perf-interval", dest="perf_interval", type=float, help="耗时统计 JSON 写出间隔(秒)")
+    parser.add_argument("--metrics-addr", dest="metrics_addr", help="开启 Prometheus 指标端点 host:port（GET /metrics）")
+    parser.add_argument("--trace-json", dest="trace_json", help="退出时写出逐帧追踪（Chrome trace-event JSON）")
+    parser.add_argument("--shed-budget-ms", dest="shed_budget_ms", type=float, help="过载降级的延迟预算(毫秒，0 关闭)")
+    parser.add_argument("--shed-max-queue", dest="shed_max_queue", type=int, help="过载降级的播报队列积压上限")
+    # 配置文件与命名配置
+    parser.add_argument("--config", dest="config", help="TOML 配置文件 (默认: 当前目录存在 cor.toml 时使用)")
+    parser.add_argument("--profile", dest="profile", help="配置文件中的命名配置，例如 realtime / low-power")
+    parser.add_argument("--print-config", dest="print_config", action="store_true", help="打印生效配置及来源后退出")
     return parser
 
 
-def load_config_from_args(argv: list[str] | None = None) -> YOLOConfig:
-    """从命令行参数加载配置，覆盖环境变量与默认值"""
-    parser = build_arg_parser()
-    args = parser.parse_args(argv)
-    cfg = YOLOConfig()  # 先加载默认+环境
-
-    # 仅覆盖用户传入的非 None 值
-    for field_name in [
-        "model_path",
-        "device",
-        "source",
-        "save_dir",
-        "save_txt",
-        "save_video",
-        "select_camera",
-        "max_cam_index",
-        "conf",
-        "img_size",
-        "window_name",
-        "timestamp_fmt",
-        "exit_key",
-        "show_fps",
-        "quiet_cv",
-        "cam_fail_limit",
-        "ann_min_interval",
-    ]:
+# 命令行可覆盖的字段（仅覆盖用户传入的非 None 值）
+_CLI_FIELDS = (
+    "model_path",
+    "device",
+    "source",
+    "save_dir",
+    "save_txt",
+    "save_video",
+    "record_dir",
+    "replay_speed",
+    "select_camera",
+    "max_cam_index",
+    "conf",
+    "img_size",
+    "torch_threads",
+    "torch_interop_threads",
+    "cpu_affinity",
+    "window_name",
+    "timestamp_fmt",
+    "exit_key",
+    "show_fps",
+    "quiet_cv",
+    "cam_fail_limit",
+    "ann_min_interval",
+    "ann_stable_frames",
+    "tts_backend",
+    "tts_wav_dir",
+    "perf_json",
+    "perf_interval",
+    "metrics_addr",
+    "trace_json",
+    "shed_budget_ms",
+    "shed_max_queue",
+)
+# 配置文件/调优配置不可设置的字段
+_NON_PROFILE_FIELDS = ("tuned_profile",)
+
+
+def _env_is_set(field_name: str) -> bool:
+    """字段是否已由 COR_ 环境变量设置（环境变量名为字段名大写）"""
+    return os.getenv(f"{ENV_PREFIX}{field_name.upper()}") is not None
+
+
+def _coerce_field(name: str, val: Any) -> Any:
+    """将配置文件中的值转换为字段类型；未知字段抛出 ValueError"""
+    types = {f.name: str(f.type) for f in fields(YOLOConfig)}
+    if name not in types:
+        msg = f"未知的配置项: {name}"
+        raise ValueError(msg)
+    kind = types[name]
+    if kind == "bool":
+        return _as_bool(val)
+    if kind == "int":
+        return int(val)
+    if kind == "float":
+        return float(val)
+    if name == "source":
+        return _parse_source(str(val))
+    if name == "img_size":
+        if isinstance(val, int):
+            return [val]
+        if isinstance(val, list):
+            return [int(v) for v in val]
+        return _as_optional_int_list(str(val))
+    return str(val) if val is not None else None
+
+
+def _apply_values(cfg: YOLOConfig, values: dict[str, Any], origins: dict[str, str], origin: str) -> None:
+    """将一组值写入 cfg，跳过已由环境变量设置的字段"""
+    for name, raw in values.items():
+        val = _coerce_field(name, raw)
+        if name in _NON_PROFILE_FIELDS or _env_is_set(name):
+            continue
+        setattr(cfg, name, val)
+        origins[name] = origin
+
+
+def resolve_config(args: argparse.Namespace) -> tuple[YOLOConfig, dict[str, str]]:
+    """按 默认值 < 配置文件 [defaults] < 命名配置 < 调优配置 < 环境变量 < 命令行 合成配置，返回 (配置, 各字段来源)"""
+    from detection import profiles
+
+    cfg = YOLOConfig()  # 默认值 + 环境变量
+    origins = {f.name: ("env" if _env_is_set(f.name) else "default") for f in fields(YOLOConfig)}
+
+    config_file = args.config or _env("CONFIG", "")
+    profile = args.profile or _env("PROFILE", "")
+    if not config_file and (profile or Path(profiles.DEFAULT_CONFIG_FILE).exists()):
+        config_file = profiles.DEFAULT_CONFIG_FILE
+    if config_file:
+        if not Path(config_file).exists():
+            msg = f"配置文件不存在: {config_file}"
+            raise FileNotFoundError(msg)
+        data = profiles.load_file(config_file)
+        _apply_values(cfg, data.get(profiles.DEFAULTS_SECTION, {}), origins, f"file:{config_file}")
+        if profile:
+            _apply_values(cfg, profiles.resolve_profile(data, profile), origins, f"profile:{profile}")
+
+    if args.tuned_profile is not None:
+        cfg.tuned_profile = args.tuned_profile
+    # --autotune 时由调优结果重新生成，不加载旧文件
+    if cfg.tuned_profile and not args.autotune:
+        if Path(cfg.tuned_profile).exists():
+            from detection.autotune import load_tuned_values
+
+            _apply_values(cfg, load_tuned_values(cfg, cfg.tuned_profile), origins, "tuned")
+        else:
+            print(f"[警告] 调优配置不存在，已忽略: {cfg.tuned_profile}")
+
+    for field_name in _CLI_FIELDS:
         val = getattr(args, field_name, None)
         if val is not None:
             if field_name == "source":
@@ -164,7 +327,65 @@ def load_config_from_args(argv: list[str] | None = None) -> YOLOConfig:
             elif field_name == "img_size" and isinstance(val, str):
                 val = _as_optional_int_list(val)
             setattr(cfg, field_name, val)
-    return cfg
+            origins[field_name] = "cli"
+    if args.tuned_profile is not None:
+        origins["tuned_profile"] = "cli"
+    _validate_config(cfg, origins)
+    return cfg, origins
+
+
+def _validate_config(cfg: YOLOConfig, origins: dict[str, str]) -> None:
+    """检查合成后的取值，错误信息标明来源（配置文件/命名配置/环境变量/命令行）"""
+    try:
+        parse_cpu_list(cfg.cpu_affinity)
+    except ValueError as e:
+        msg = f"cpu_affinity 取值无效（来源: {_origin_label('cpu_affinity', origins)}）: {e}"
+        raise ValueError(msg) from None
+    if cfg.replay_speed not in REPLAY_SPEEDS:
+        msg = (
+            f"replay_speed 取值无效（来源: {_origin_label('replay_speed', origins)}）: "
+            f"{cfg.replay_speed}（可选: {', '.join(REPLAY_SPEEDS)}）"
+        )
+        raise ValueError(msg)
+    if (cfg.tts_backend or BACKEND_PYTTSX3).strip().lower() not in BACKENDS:
+        msg = (
+            f"tts_backend 取值无效（来源: {_origin_label('tts_backend', origins)}）: "
+            f"{cfg.tts_backend}（可选: {', '.join(BACKENDS)}）"
+        )
+        raise ValueError(msg)
+    # 积压取自播报队列长度，上限不小于队列容量时永远不会触发
+    if not 0 <= cfg.shed_max_queue < DEFAULT_MAX_PENDING:
+        msg = (
+            f"shed_max_queue 取值无效（来源: {_origin_label('shed_max_queue', origins)}）: "
+            f"{cfg.shed_max_queue}（播报队列最多 {DEFAULT_MAX_PENDING} 条，须在 0~{DEFAULT_MAX_PENDING - 1} 之间）"
+        )
+        raise ValueError(msg)
+
+
+def _origin_label(name: str, origins: dict[str, str]) -> str:
+    """字段来源的可读说明（环境变量给出变量名）"""
+    origin = origins.get(name, "default")
+    if origin == "env":
+        return f"{ENV_PREFIX}{name.upper()}"
+    if origin == "cli":
+        return f"--{name.replace('_', '-')}"
+    return origin
+
+
+def _parse_config(argv: list[str] | None) -> tuple[argparse.Namespace, YOLOConfig, dict[str, str]]:
+    """解析命令行并合成配置；配置文件错误时按参数错误退出"""
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    try:
+        cfg, origins = resolve_config(args)
+    except (OSError, RuntimeError, ValueError) as e:
+        parser.error(str(e))
+    return args, cfg, origins
+
+
+def load_config_from_args(argv: list[str] | None = None) -> YOLOConfig:
+    """从命令行参数加载配置，覆盖配置文件、环境变量与默认值"""
+    return _parse_config(argv)[1]
 
 
 def _select_device(requested: str | None = None) -> str:
@@ -183,14 +404,43 @@ class YOLODetector:
         """初始化检测器"""
         self.cfg = cfg
         self.device = _select_device(cfg.device)
+        # 线程数须在首次推理前设置；绑核在实际执行推理的线程（detect_and_save）中进行
+        try:
+            self._cpus = parse_cpu_list(cfg.cpu_affinity)
+        except ValueError as e:
+            print(f"[警告] {e}，推理线程不绑定 CPU")
+            self._cpus = None
+        self._threads_logged = False
+        configure_torch_threads(cfg.torch_threads, cfg.torch_interop_threads)
         self.model: YOLO = YOLO(cfg.model_path)
         # FPS 相关状态
         self._last_time = datetime.now(UTC)
         self._fps = 0.0
-        # TTS 播报器（可配置：去重/限流/黄闪参数）
-        self._ann = Announcer(
-            min_interval_sec=self.cfg.ann_min_interval,
+        # 分阶段耗时直方图
+        self.perf = PerfRecorder(cfg.perf_json, cfg.perf_interval)
+        # 逐帧追踪：端到端延迟写入 perf；配置 trace_json 时记录 span 并在退出时导出
+        self.tracer = Tracer(self.perf, export=bool(cfg.trace_json))
+        # TTS 播报器（可配置：去重/限流/平滑参数）；null 后端时不创建，检测循环跳过播报
+        self._tts_backend: SpeechBackend | None = None
+        self._speech: SpeechWorker | None = None
+        self._ann: Announcer | None = None
+        backend = make_backend(cfg.tts_backend, wav_dir=cfg.tts_wav_dir)
+        if backend.name != BACKEND_NULL:
+            self._tts_backend = backend
+            self._speech = SpeechWorker(backend.speak)
+            self._ann = Announcer(
+                min_interval_sec=self.cfg.ann_min_interval,
+                stable_frames=self.cfg.ann_stable_frames,
+                speaker=self._speech.submit,
+            )
+        # 过载降级（未配置预算时为 None，检测循环保持全质量）
+        self.shedder: LoadShedder | None = (
+            LoadShedder(cfg.shed_budget_ms, max_queue=cfg.shed_max_queue) if cfg.shed_budget_ms > 0 else None
         )
+        self._last_saved_counts: tuple[tuple[int, int], ...] | None = None
+        # 指标（检测循环只做计数/赋值；端点按需在 detect_and_save 中启动）
+        self.metrics = MetricsRegistry()
+        self._init_metrics()
 
     @staticmethod
     def _should_stop(stop_event: Any | None) -> bool:
@@ -211,27 +461,83 @@ class YOLODetector:
         if hasattr(self, "_read_fail_count"):
             self._read_fail_count = 0
 
-    def _say_counts(self, result) -> None:
-        """根据本帧检测结果统计类别数量并播报"""
-        counts: dict[int, int] = {}
-        for b in getattr(result, "boxes", []) or []:
-            try:
-                cid = int(b.cls.item())
-            except (AttributeError, ValueError, TypeError):
-                continue
-            counts[cid] = counts.get(cid, 0) + 1
-        if counts:
-            self._ann.say_non_tl(counts)
-
-    def _process_frame(self, frame, frame_id: int):
-        """处理单帧图像 包括推理 显示 播报 保存等"""
-        result, annotated_frame = self._predict(frame)
+    def _say_counts(self, counts: tuple[tuple[int, int], ...]) -> None:
+        """根据本帧类别数量，经平滑后播报"""
+        if self._ann is None:
+            return
+        with self.perf.stage("announce"):
+            self._ann.observe_counts(counts)
+
+    def _init_metrics(self) -> None:
+        """登记检测循环的计数器/瞬时值与各阶段耗时"""
+        m = self.metrics
+        self._m_frames = m.counter("cor_frames_total", "已处理帧数")
+        self._m_read_fail = m.counter("cor_capture_failures_total", "读取失败（丢弃）的帧数")
+        self._m_saved = m.counter("cor_frames_saved_total", "已保存的结果帧数")
+        self._m_save_err = m.counter("cor_save_errors_total", "视频写出失败次数")
+        self._m_fps = m.gauge("cor_fps", "处理帧率（滑动平均）")
+        self._m_shed_skipped = m.counter("cor_shed_skipped_frames_total", "降级（加大步长）跳过推理的帧数")
+        self._m_shed_unsaved = m.counter("cor_shed_unsaved_frames_total", "降级时未保存的无变化帧数")
+        m.attach_perf(self.perf)
+        shedder = self.shedder
+        if shedder is not None:
+            m.gauge_fn("cor_shed_level", "当前降级级别（0 为全质量）", lambda: shedder.level)
+            m.counter_fn("cor_shed_transitions_total", "降级/恢复切换次数", lambda: shedder.transitions)
+        speech = self._speech
+        if speech is not None:
+            m.gauge_fn("cor_tts_pending", "播报队列积压条数", speech.pending)
+            for key in ("submitted", "spoken", "dropped", "stale", "failed"):
+                m.counter_fn(f"cor_tts_{key}_total", f"播报 {key} 计数", lambda k=key: speech.get_stats()[k])
+
+    def _start_metrics_server(self) -> MetricsServer | None:
+        """按配置启动指标端点；端口占用等错误只打印警告"""
+        addr = self.cfg.metrics_addr
+        if not addr:
+            return None
+        try:
+            server = MetricsServer(addr, self.metrics)
+        except (OSError, ValueError) as e:
+            print(f"[警告] 无法启动指标端点 {addr}: {e}")
+            return None
+        server.start()
+        host, port = server.address
+        print(f"[信息] 指标端点: http://{host}:{port}/metrics")
+        return server
+
+    def _report_speech(self) -> None:
+        """打印播报队列与语音后端的统计"""
+        if self._speech is None or self._tts_backend is None:
+            return
+        st = self._speech.get_stats()
+        if not st["submitted"]:
+            return
+        bs = self._tts_backend.get_stats()
+        print(
+            f"[信息] 播报统计: 提交 {st['submitted']}，播出 {st['spoken']}，"
+            f"丢弃 {st['dropped']}，过期 {st['stale']}，失败 {st['failed']}；"
+            f"后端 {self._tts_backend.name}: 平均 {bs['avg_ms']:.0f} ms/句，最长 {bs['max_ms']:.0f} ms，"
+            f"{bs['per_sec']:.2f} 句/秒"
+        )
+
+    def _handle_frame(self, res: StreamFrame):
+        """单帧后处理：数量播报、FPS 叠加与保存；返回用于显示/写出的图像（按降级级别省略部分工作）"""
+        if res.skipped:
+            return res.frame
+        shed = self.shedder
+        image = res.annotated if shed is None or shed.annotate else res.frame
+        counts = res.counts()
         # 通用检测与数量播报
-        self._say_counts(result)
-        self._update_and_draw_fps(annotated_frame)
-        cv2.imshow(self.cfg.window_name, annotated_frame)
-        self._save_result(frame_id, annotated_frame, result)
-        return annotated_frame
+        if shed is None or not shed.speech_paused:
+            self._say_counts(counts)
+        self._update_and_draw_fps(image)
+        if shed is not None and shed.skip_unchanged_saves and counts == self._last_saved_counts:
+            self._m_shed_unsaved.inc()
+            return image
+        with self.perf.stage("save"):
+            self._save_result(res, image)
+        self._last_saved_counts = counts
+        self._m_saved.inc()
+        return image
 
     def _quiet_opencv_logs(self) -> None:
         """按需抑制 OpenCV 日志"""
@@ -248,29 +554,37 @@ class YOLODetector:
                 print(f"[警告] 设置 OpenCV 日志等级失败: {err}")
     # 仅在可用时尝试设置为静默，无需显式返回
 
-    def _predict(self, frame) -> tuple[Any, Any]:
-        """执行模型推理 返回 (result, annotated_frame)"""
-        cfg = self.cfg
-        if cfg.img_size is not None:
-            results = self.model.predict(
-                frame,
-                imgsz=cfg.img_size,
-                conf=cfg.conf,
-                device=self.device,
-                verbose=False,
-            )
-        else:
+    def _infer(self, frame, img_size: list[int] | None = None) -> Any:
+        """执行模型推理 返回 ultralytics 结果（绘制由 StreamFrame.annotated 按需完成）"""
+        imgsz = img_size if img_size is not None else self.cfg.img_size
+        if imgsz is None:
             h, w = frame.shape[:2]
+            imgsz = [h, w]
+        t0 = time.perf_counter()
+        results = self.model.predict(frame, imgsz=imgsz, conf=self.cfg.conf, device=self.device, verbose=False)
+        result = results[0]
+        self._record_infer_time(result, t0)
+        return result
+
+    def _infer_batch(self, frames: list[Any]) -> list[Any]:
+        """批量推理：未设置 img_size 时按帧尺寸分组，同组合并为一次 predict；结果顺序与输入一致"""
+        out: list[Any] = [None] * len(frames)
+        for imgsz, idx in size_groups(frames, self.cfg.img_size).items():
+            t0 = time.perf_counter()
             results = self.model.predict(
-                frame,
-                imgsz=[h, w],
-                conf=cfg.conf,
-                device=self.device,
-                verbose=False,
+                [frames[i] for i in idx], imgsz=list(imgsz), conf=self.cfg.conf, device=self.device, verbose=False
             )
-        result = results[0]
-        annotated_frame = result.plot()
-        return result, annotated_frame
+            for i, result in zip(idx, results, strict=True):
+                self._record_infer_time(result, t0)
+                out[i] = result
+        return out
+
+    def _record_infer_time(self, result: Any, t0: float) -> None:
+        """记录推理各阶段耗时；结果无 speed 字段时整体计入 inference"""
+        t1 = time.perf_counter()
+        if not self.perf.record_speed(result):
+            self.perf.record("inference", (t1 - t0) * 1000.0)
+        self.tracer.span(current_trace(), "predict", t0, t1)
 
     def _update_and_draw_fps(self, annotated_frame) -> None:
         """更新并绘制 FPS"""
@@ -291,71 +605,189 @@ class YOLODetector:
             2,
         )
 
-    def _save_result(self, frame_id: int, annotated_frame, result) -> None:
+    def _save_result(self, res: StreamFrame, annotated_frame) -> None:
         """保存结果图像与 txt"""
         ts = datetime.now(UTC).strftime(self.cfg.timestamp_fmt)
-        base_name = f"frame_{frame_id}_{ts}"
+        base_name = f"frame_{res.frame_id}_{ts}"
         cv2.imwrite(str(Path(self.cfg.save_dir) / f"{base_name}.jpg"), annotated_frame)
         if self.cfg.save_txt:
             txt_path = Path(self.cfg.save_dir) / f"{base_name}.txt"
             with txt_path.open("w", encoding="utf-8") as f:
-                for line in _format_boxes_yolo(result):
-                    f.write(line)
-
-    def detect_and_save(self, stop_event: Any | None = None):
-        """主检测与保存循环"""
+                f.writelines(res.yolo_lines())
+
+    def _open_capture(self, source: int | str | None = None) -> Any:
+        """打开视频源（默认 cfg.source）：录制目录使用回放源，其余交给 OpenCV"""
+        src = self.cfg.source if source is None else source
+        if isinstance(src, str) and is_recording(src):
+            return ReplaySource(src, speed=self.cfg.replay_speed)
+        if isinstance(src, int) and os.name == "nt":
+            return cv2.VideoCapture(src, cv2.CAP_DSHOW)
+        return cv2.VideoCapture(src)
+
+    def stream(
+        self,
+        source: int | str | None = None,
+        *,
+        stop_event: Any | None = None,
+        prefetch: int = 0,
+        drop_oldest: bool | None = None,
+        pin: bool = False,
+    ) -> Iterator[StreamFrame]:
+        """逐帧读取并推理，产出 StreamFrame（生成器，不显示、不保存、不播报）
+
+        - 背压：默认拉取式，调用方取下一帧时才读取并推理；prefetch>0 时后台预读 prefetch 帧，
+          队列满时摄像头丢弃最旧帧、文件/录制回放阻塞等待（drop_oldest 可显式指定）
+        - 配置了 record_dir 时录制原始帧；配置了降级控制器时按其步长/尺寸推理（observe 由调用方负责）
+        - 每帧设为当前追踪，调用方在处理该帧期间的计时与播报会关联到它
+        - 默认不改变调用线程的 CPU 亲和性；pin=True 时在打开视频源、启动预读线程之后按 cpu_affinity 绑核，
+          关闭生成器时恢复（detect_and_save 使用；AsyncDetector 在自己的推理线程中绑核）
+        - 关闭生成器（break 后 close() / with contextlib.closing）时释放视频源
+        """
         cfg = self.cfg
-        Path(cfg.save_dir).mkdir(parents=True, exist_ok=True)
-        self._quiet_opencv_logs()
-        if isinstance(cfg.source, int) and os.name == "nt":
-            cap = cv2.VideoCapture(cfg.source, cv2.CAP_DSHOW)
-        else:
-            cap = cv2.VideoCapture(cfg.source)
+        src = cfg.source if source is None else source
+        cap = self._open_capture(src)
         if not cap.isOpened():
-            msg = f"无法打开视频源： {cfg.source}"
+            msg = f"无法打开视频源： {src}"
             raise RuntimeError(msg)
-
-        # 可选视频写出（在拿到第一帧的尺寸后再初始化）
-        writer = None
+        is_replay = isinstance(cap, ReplaySource)
         fps_val = cap.get(cv2.CAP_PROP_FPS)
         try:
             fps = float(fps_val) if fps_val and fps_val > 1.0 else 25.0
         except Exception:
             fps = 25.0
+        recorder = FrameRecorder(cfg.record_dir, source=src) if cfg.record_dir else None
+        prefetcher: FramePrefetcher | None = None
+        if prefetch > 0:
+            drop = isinstance(src, int) if drop_oldest is None else drop_oldest
+            prefetcher = FramePrefetcher(cap, depth=prefetch, drop_oldest=drop, stop_on_fail=is_replay)
 
         frame_id = 0
-        while True:
-            if self._should_stop(stop_event):
-                break
-            ret, frame = cap.read()
-            if not ret:
-                if self._inc_read_fail_and_should_break():
+        t_prev: float | None = None
+        pin_scope = ExitStack()
+        try:
+            if pin:
+                self._pin_inference_thread(pin_scope)
+            while not self._should_stop(stop_event):
+                if prefetcher is None:
+                    t_read = time.perf_counter()
+                    ret, frame = cap.read()
+                    t_capture = time.perf_counter()
+                    ts = time.time()
+                else:
+                    ret, frame, t_read, t_capture, ts = prefetcher.read()
+                if not ret:
+                    self.perf.record("capture", (t_capture - t_read) * 1000.0)
+                    self._m_read_fail.inc()
+                    if is_replay or self._inc_read_fail_and_should_break():
+                        break
+                    continue
+                self._reset_read_fail()
+                # 本帧的追踪上下文：之后各阶段计时与播报入队都会关联到它
+                trace = self.tracer.begin(t_capture)
+                set_current(trace)
+                self.perf.record_span("capture", t_read, t_capture)
+                if recorder is not None:
+                    recorder.write(frame, t_capture)
+                shed = self.shedder
+                extra = {"source_fps": fps, "trace": trace, "_perf": self.perf}
+                if shed is not None and shed.stride > 1 and frame_id % shed.stride != 0:
+                    # 降级（加大步长）：本帧不推理
+                    self._m_shed_skipped.inc()
+                    res = StreamFrame(frame_id, ts, t_capture, frame, skipped=True, **extra)
+                else:
+                    imgsz = shed.img_size(cfg.img_size) if shed is not None else None
+                    res = from_result(frame_id, ts, t_capture, frame, self._infer(frame, imgsz), **extra)
+                frame_id += 1
+                self._m_frames.inc()
+                if t_prev is not None and t_capture > t_prev:
+                    inst = 1.0 / (t_capture - t_prev)
+                    fps_now = self._m_fps.value
+                    self._m_fps.set(inst if fps_now <= 0 else 0.9 * fps_now + 0.1 * inst)
+                t_prev = t_capture
+                yield res
+        finally:
+            pin_scope.close()
+            set_current(None)
+            if prefetcher is not None:
+                prefetcher.close()
+                if prefetcher.dropped:
+                    print(f"[信息] 预读队列已满，丢弃 {prefetcher.dropped} 帧旧画面")
+            cap.release()
+            if recorder is not None:
+                recorder.close()
+                print(f"[信息] 已录制 {recorder.count} 帧到 {cfg.record_dir}")
+
+    def _pin_inference_thread(self, scope: ExitStack) -> None:
+        """将当前线程绑核（scope 关闭时恢复原亲和性）；首次调用时打印线程配置"""
+        scope.enter_context(pinned_thread(self._cpus))
+        if not self._threads_logged:
+            self._threads_logged = True
+            print(f"[配置] 推理线程: {format_info(describe_threads())}")
+
+    def detect_and_save(self, stop_event: Any | None = None):
+        """主检测与保存循环：基于 stream()，负责播报、保存、视频写出、显示与按键退出"""
+        cfg = self.cfg
+        Path(cfg.save_dir).mkdir(parents=True, exist_ok=True)
+        self._quiet_opencv_logs()
+        is_replay = isinstance(cfg.source, str) and is_recording(cfg.source)
+        # 可选视频写出（在拿到第一帧的尺寸后再初始化）
+        writer = None
+        # 辅助线程在推理线程绑核之前启动（Linux 上新线程继承创建者的亲和性）；TTS 引擎线程由播报线程创建
+        metrics_server = self._start_metrics_server()
+        if self._speech is not None:
+            self._speech.start()
+        n_frames = 0
+        t_begin = time.perf_counter()
+        with closing(self.stream(stop_event=stop_event, pin=True)) as frames:
+            for res in frames:
+                n_frames += 1
+                annotated = self._handle_frame(res)
+
+                # 初始化视频写出器并写帧（如需）
+                if writer is None and cfg.save_video:
+                    out_path = Path(cfg.save_video)
+                    out_path.parent.mkdir(parents=True, exist_ok=True)
+                    h, w = annotated.shape[:2]
+                    ext = out_path.suffix.lower()
+                    fourcc = cv2.VideoWriter.fourcc(*("XVID" if ext == ".avi" else "mp4v"))
+                    writer = cv2.VideoWriter(str(out_path), fourcc, res.source_fps, (w, h))
+                    if not writer.isOpened():
+                        print(f"[警告] 无法打开视频写出器: {out_path}")
+                        writer = None
+                if writer is not None:
+                    try:
+                        with self.perf.stage("save_video"):
+                            writer.write(annotated)
+                    except Exception as err:
+                        self._m_save_err.inc()
+                        print(f"[警告] 写出视频帧失败: {err}")
+                with self.perf.stage("display"):
+                    cv2.imshow(cfg.window_name, annotated)
+                    key = cv2.waitKey(1)
+                self.tracer.latency(res.trace, "capture_to_display")
+                shed = self.shedder
+                if shed is not None and not res.skipped:
+                    queue = self._speech.pending() if self._speech is not None else 0
+                    shed.observe((time.perf_counter() - res.t_capture) * 1000.0, queue)
+                self.perf.maybe_dump()
+                if key & 0xFF == ord(cfg.exit_key):
                     break
-                continue
-            self._reset_read_fail()
-            annotated = self._process_frame(frame, frame_id)
-
-            # 初始化视频写出器并写帧（如需）
-            if writer is None and cfg.save_video:
-                out_path = Path(cfg.save_video)
-                out_path.parent.mkdir(parents=True, exist_ok=True)
-                h, w = annotated.shape[:2]
-                ext = out_path.suffix.lower()
-                fourcc = cv2.VideoWriter.fourcc(*("XVID" if ext == ".avi" else "mp4v"))
-                writer = cv2.VideoWriter(str(out_path), fourcc, fps, (w, h))
-                if not writer.isOpened():
-                    print(f"[警告] 无法打开视频写出器: {out_path}")
-                    writer = None
-            if writer is not None:
-                try:
-                    writer.write(annotated)
-                except Exception as err:
-                    print(f"[警告] 写出视频帧失败: {err}")
-            frame_id += 1
-            if cv2.waitKey(1) & 0xFF == ord(cfg.exit_key):
-                break
 
-        cap.release()
+        elapsed = time.perf_counter() - t_begin
+        self._report_speech()
+        if self.shedder is not None:
+            print(self.shedder.summary())
+        print(self.perf.format_table())
+        self.perf.dump()
+        if cfg.trace_json and self.tracer.dump(cfg.trace_json) is not None:
+            print(f"[信息] 已写出逐帧追踪: {cfg.trace_json}")
+        if metrics_server is not None:
+            metrics_server.stop()
+        if is_replay and n_frames > 0:
+            print(
+                f"[信息] 回放完成: {n_frames} 帧，用时 {elapsed:.2f}s，"
+                f"平均 {elapsed * 1000.0 / n_frames:.1f} ms/帧（速度: {cfg.replay_speed}）"
+            )
         if writer is not None:
             try:
                 writer.release()
@@ -363,20 +795,6 @@ class YOLODetector:
                 pass
         cv2.destroyAllWindows()
 
-def _format_boxes_yolo(result) -> list[str]:
-    """将检测框转换为 YOLO txt 行文本列表"""
-    lines: list[str] = []
-    h, w = result.orig_shape
-    for box in result.boxes:
-        cls_id = int(box.cls.item())
-        x1, y1, x2, y2 = box.xyxy[0].tolist()
-        x_c = (x1 + x2) / 2 / w
-        y_c = (y1 + y2) / 2 / h
-        bw = (x2 - x1) / w
-        bh = (y2 - y1) / h
-        lines.append(f"{cls_id} {x_c:.6f} {y_c:.6f} {bw:.6f} {bh:.6f}\n")
-    return lines
-
 
 @contextmanager
 def _opencv_enum_log_suppressed(*, enable: bool):
@@ -469,7 +887,22 @@ def interactive_select_camera(max_index: int) -> int:
 
 def main(argv: list[str] | None = None):
     """供外部脚本调用的主入口"""
-    cfg = load_config_from_args(argv)
+    args, cfg, origins = _parse_config(argv)
+    if args.print_config:
+        from detection.profiles import format_config
+
+        print(format_config(cfg.to_dict(), origins))
+        return
+    if args.autotune:
+        from detection.autotune import DEFAULT_TARGET_MS, autotune
+
+        autotune(
+            cfg,
+            target_ms=args.target_ms or DEFAULT_TARGET_MS,
+            frames=args.autotune_frames,
+            min_agreement=args.min_agreement,
+        )
+        return
     if cfg.select_camera:
         try:
             cfg.source = interactive_select_camera(cfg.max_cam_index)
@@ -489,4 +922,5 @@ __all__ = [
     "enumerate_cameras",
     "load_config_from_args",
     "main",
+    "resolve_config",
 ]
@@ -0,0 +1,164 @@
+"""推理线程数与 CPU 亲和性
+
+torch 默认用满全部核心做算子内并行，会与采集、编码、界面线程争抢 CPU：
+- configure_torch_threads：设置算子内（intra-op）/算子间（inter-op）线程数（0 表示保持默认）
+- pin_current_thread：把调用线程绑定到指定核心（在推理线程首次推理前调用，
+  torch/OpenMP 随后创建的工作线程会继承该亲和性）；pinned_thread 为退出时恢复原亲和性的 with 版本
+- parse_cpu_list："0-3,6" -> [0, 1, 2, 3, 6]
+
+亲和性在 Linux 上用 os.sched_setaffinity（作用于调用线程，随后创建的线程继承）；Windows 上用
+SetThreadAffinityMask（仅作用于调用线程本身）；其他平台（如 macOS）不支持绑核，记录警告后忽略
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+
+def parse_cpu_list(raw: str | None) -> list[int] | None:
+    """解析核心列表："0-3,6"；空值返回 None"""
+    if raw is None or not str(raw).strip():
+        return None
+    cpus: set[int] = set()
+    for part in str(raw).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, sep, hi = part.partition("-")
+        if not lo.isdigit() or (sep and not hi.isdigit()):
+            msg = f"无效的 CPU 列表: {raw}（格式如 0-3,6）"
+            raise ValueError(msg)
+        start, end = int(lo), int(hi) if sep else int(lo)
+        if end < start:
+            msg = f"无效的 CPU 范围: {part}"
+            raise ValueError(msg)
+        cpus.update(range(start, end + 1))
+    return sorted(cpus)
+
+
+def configure_torch_threads(intra: int = 0, inter: int = 0) -> None:
+    """设置 torch 线程数；inter-op 只能在首次并行计算前设置，过晚时记录警告"""
+    import torch
+
+    if intra > 0:
+        torch.set_num_threads(intra)
+    if inter > 0 and torch.get_num_interop_threads() != inter:
+        try:
+            torch.set_num_interop_threads(inter)
+        except RuntimeError as e:
+            print(f"[警告] 无法设置 inter-op 线程数（需在首次推理前设置）: {e}")
+
+
+def _set_affinity(cpus: list[int]) -> Any | None:
+    """绑定调用线程，返回恢复用的原亲和性（Linux 为核心集合，Windows 为线程掩码）；失败或不支持时返回 None"""
+    try:
+        if hasattr(os, "sched_setaffinity"):
+            prev = os.sched_getaffinity(0)
+            os.sched_setaffinity(0, cpus)
+            return prev
+        if sys.platform == "win32":
+            mask = 0
+            for c in cpus:
+                mask |= 1 << c
+            prev = _win_set_thread_mask(mask)
+            if prev:
+                return prev
+            print(f"[警告] 绑定 CPU 失败: {cpus}")
+            return None
+    except (OSError, ValueError) as e:
+        print(f"[警告] 绑定 CPU 失败 {cpus}: {e}")
+        return None
+    print("[警告] 当前平台不支持绑定 CPU，已忽略 cpu_affinity")
+    return None
+
+
+def _restore_affinity(prev: Any) -> None:
+    """恢复 _set_affinity 返回的原亲和性"""
+    try:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, prev)
+        elif sys.platform == "win32":
+            _win_set_thread_mask(prev)
+    except (OSError, ValueError) as e:
+        print(f"[警告] 恢复 CPU 亲和性失败: {e}")
+
+
+def _win_set_thread_mask(mask: int) -> int:
+    """SetThreadAffinityMask：返回原掩码，失败返回 0"""
+    import ctypes
+
+    kernel32 = ctypes.windll.kernel32
+    kernel32.GetCurrentThread.restype = ctypes.c_void_p
+    kernel32.SetThreadAffinityMask.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+    kernel32.SetThreadAffinityMask.restype = ctypes.c_size_t
+    return int(kernel32.SetThreadAffinityMask(kernel32.GetCurrentThread(), mask))
+
+
+def pin_current_thread(cpus: list[int] | None) -> bool:
+    """将调用线程绑定到 cpus；cpus 为空或平台不支持时返回 False"""
+    if not cpus:
+        return False
+    return _set_affinity(cpus) is not None
+
+
+@contextmanager
+def pinned_thread(cpus: list[int] | None) -> Iterator[bool]:
+    """with 块内将调用线程绑定到 cpus，退出时恢复原亲和性；产出是否已绑定
+
+    Linux 上块内新建的线程会继承绑核，辅助线程（采集、播报、指标端点）应在进入前启动
+    """
+    prev = _set_affinity(cpus) if cpus else None
+    try:
+        yield prev is not None
+    finally:
+        if prev is not None:
+            _restore_affinity(prev)
+
+
+def current_affinity() -> list[int] | None:
+    """调用线程当前可运行的核心（平台不支持时返回 None）"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return None
+
+
+def describe_threads() -> dict[str, Any]:
+    """当前线程设置摘要（启动日志与基准报告使用）"""
+    info: dict[str, Any] = {
+        "cpu_count": os.cpu_count(),
+        "thread": threading.current_thread().name,
+        "affinity": current_affinity(),
+    }
+    try:
+        import torch
+
+        info["torch_threads"] = torch.get_num_threads()
+        info["torch_interop_threads"] = torch.get_num_interop_threads()
+    except ImportError:
+        pass
+    return info
+
+
+def format_info(info: dict[str, Any]) -> str:
+    """一行文本：intra/inter 线程数与亲和性"""
+    aff = info.get("affinity")
+    return (
+        f"intra-op={info.get('torch_threads', '-')} inter-op={info.get('torch_interop_threads', '-')} "
+        f"affinity={'全部' if aff is None else ','.join(map(str, aff))} (共 {info.get('cpu_count')} 核)"
+    )
+
+
+__all__ = [
+    "configure_torch_threads",
+    "current_affinity",
+    "describe_threads",
+    "format_info",
+    "parse_cpu_list",
+    "pin_current_thread",
+    "pinned_thread",
+]
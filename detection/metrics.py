@@ -0,0 +1,186 @@
+"""本地 Prometheus 文本格式指标端点（仅标准库）
+
+- Counter / Gauge：检测循环只做属性赋值（单写者，不加锁）
+- gauge_fn / counter_fn：抓取时才调用的回调（如播报队列长度），热路径零开销
+- attach_perf：把 PerfRecorder 的各阶段直方图导出为 summary（quantile 0.5/0.95/0.99）
+- MetricsServer：后台线程中的 HTTP 服务，GET /metrics 返回指标文本
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from detection.perf import PERCENTILES, PerfRecorder
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_PATH = "/metrics"
+DEFAULT_HOST = "127.0.0.1"
+HTTP_OK = 200
+HTTP_NOT_FOUND = 404
+
+
+class Counter:
+    """单调递增计数器"""
+
+    __slots__ = ("help", "name", "value")
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help = help_text
+        self.value = 0.0
+
+    def inc(self, n: float = 1.0) -> None:
+        """增加计数"""
+        self.value += n
+
+
+class Gauge:
+    """可任意设置的瞬时值"""
+
+    __slots__ = ("help", "name", "value")
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help = help_text
+        self.value = 0.0
+
+    def set(self, v: float) -> None:
+        """设置当前值"""
+        self.value = float(v)
+
+
+def _fmt(v: float) -> str:
+    """Prometheus 数值格式"""
+    if math.isnan(v):
+        return "NaN"
+    return repr(float(v))
+
+
+class MetricsRegistry:
+    """指标注册表；render() 在抓取线程中读取快照"""
+
+    def __init__(self) -> None:
+        self._counters: dict[str, Counter] = {}
+        self._gauges: dict[str, Gauge] = {}
+        self._fns: dict[str, tuple[str, str, Callable[[], float]]] = {}
+        self._perf: list[tuple[str, PerfRecorder]] = []
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        """获取或创建计数器"""
+        c = self._counters.get(name)
+        if c is None:
+            c = self._counters[name] = Counter(name, help_text)
+        return c
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        """获取或创建瞬时值"""
+        g = self._gauges.get(name)
+        if g is None:
+            g = self._gauges[name] = Gauge(name, help_text)
+        return g
+
+    def gauge_fn(self, name: str, help_text: str, fn: Callable[[], float]) -> None:
+        """登记抓取时求值的瞬时值"""
+        self._fns[name] = ("gauge", help_text, fn)
+
+    def counter_fn(self, name: str, help_text: str, fn: Callable[[], float]) -> None:
+        """登记抓取时读取的计数（计数本身由其他组件维护）"""
+        self._fns[name] = ("counter", help_text, fn)
+
+    def attach_perf(self, perf: PerfRecorder, name: str = "cor_stage_latency_ms") -> None:
+        """将分阶段耗时直方图导出为 summary"""
+        self._perf.append((name, perf))
+
+    def render(self) -> str:
+        """生成 Prometheus 文本格式"""
+        lines: list[str] = []
+        for c in list(self._counters.values()):
+            lines += [f"# HELP {c.name} {c.help}", f"# TYPE {c.name} counter", f"{c.name} {_fmt(c.value)}"]
+        for g in list(self._gauges.values()):
+            lines += [f"# HELP {g.name} {g.help}", f"# TYPE {g.name} gauge", f"{g.name} {_fmt(g.value)}"]
+        for name, (kind, help_text, fn) in list(self._fns.items()):
+            try:
+                val = float(fn())
+            except Exception:
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {_fmt(val)}"]
+        for name, perf in self._perf:
+            stages = perf.summary()
+            if not stages:
+                continue
+            lines += [f"# HELP {name} 分阶段耗时（毫秒）", f"# TYPE {name} summary"]
+            for stage, st in stages.items():
+                for q in PERCENTILES:
+                    lines.append(f'{name}{{stage="{stage}",quantile="{q / 100:g}"}} {_fmt(st[f"p{q}_ms"])}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {_fmt(st["mean_ms"] * st["count"])}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {_fmt(st["count"])}')
+        return "\n".join(lines) + "\n"
+
+
+def parse_addr(addr: str) -> tuple[str, int]:
+    """解析 host:port（省略 host 时绑定 127.0.0.1）"""
+    host, sep, port = addr.strip().rpartition(":")
+    if not sep:
+        host, port = "", addr.strip()
+    try:
+        return host.strip("[]") or DEFAULT_HOST, int(port)
+    except ValueError:
+        msg = f"无效的指标地址: {addr}（格式 host:port）"
+        raise ValueError(msg) from None
+
+
+class MetricsServer:
+    """在后台线程提供 GET /metrics"""
+
+    def __init__(self, addr: str, registry: MetricsRegistry) -> None:
+        self.registry = registry
+        host, port = parse_addr(addr)
+        reg = registry
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] != METRICS_PATH:
+                    self.send_error(HTTP_NOT_FOUND)
+                    return
+                body = reg.render().encode("utf-8")
+                self.send_response(HTTP_OK)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt: str, *args: object) -> None:
+                # 不向 stderr 打印访问日志
+                return None
+
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """实际绑定的 (host, port)（port=0 时为系统分配的端口）"""
+        host, port = self._httpd.server_address[:2]
+        return str(host), int(port)
+
+    def start(self) -> None:
+        """启动服务线程"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="COR-Metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止服务并释放端口"""
+        if self._thread is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join(timeout=2)
+        self._thread = None
+
+
+__all__ = ["Counter", "Gauge", "MetricsRegistry", "MetricsServer", "parse_addr"]
@@ -0,0 +1,204 @@
+"""分阶段耗时统计
+
+- LatencyHistogram：对数分桶直方图（每倍频 16 桶，相对误差约 4%），记录 O(1)、内存固定，估算 p50/p95/p99
+- PerfRecorder：按阶段名汇总直方图；stage() 上下文计时，退出时打印汇总，可按间隔写出 JSON
+
+阶段约定：capture / preprocess / inference / postprocess / plot / display / save / announce
+（preprocess/inference/postprocess 取自 ultralytics 结果的 speed 字段）；
+端到端延迟：capture_to_display / capture_to_speech（见 detection.tracing）
+存在当前帧追踪（detection.tracing.activate）时，stage()/record_span() 同时记录追踪 span
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import math
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from detection.tracing import current_trace
+
+STAGES = (
+    "capture",
+    "preprocess",
+    "inference",
+    "postprocess",
+    "plot",
+    "display",
+    "save",
+    "announce",
+    "capture_to_display",
+    "capture_to_speech",
+)
+PERCENTILES = (50, 95, 99)
+DEFAULT_DUMP_INTERVAL_SEC = 10.0
+_MIN_MS = 0.001
+_MAX_MS = 600_000.0
+_BUCKETS_PER_OCTAVE = 16
+_N_BUCKETS = math.ceil(math.log2(_MAX_MS / _MIN_MS) * _BUCKETS_PER_OCTAVE) + 2
+_SPEED_STAGES = ("preprocess", "inference", "postprocess")
+
+
+class LatencyHistogram:
+    """毫秒耗时的对数分桶直方图"""
+
+    __slots__ = ("count", "counts", "max_ms", "min_ms", "total_ms")
+
+    def __init__(self) -> None:
+        self.counts = [0] * _N_BUCKETS
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+
+    @staticmethod
+    def _index(ms: float) -> int:
+        """耗时对应的桶序号（0 号桶收纳不超过下限的值）"""
+        if ms <= _MIN_MS:
+            return 0
+        return min(_N_BUCKETS - 1, int(math.log2(ms / _MIN_MS) * _BUCKETS_PER_OCTAVE) + 1)
+
+    @staticmethod
+    def _upper(idx: int) -> float:
+        """桶的上界（毫秒）"""
+        return _MIN_MS * 2.0 ** (idx / _BUCKETS_PER_OCTAVE)
+
+    def record(self, ms: float) -> None:
+        """记录一次耗时（毫秒）"""
+        self.counts[self._index(ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.min_ms = min(self.min_ms, ms)
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        """估算第 q 百分位（毫秒），结果夹在实际最小/最大值之间"""
+        if self.count == 0:
+            return 0.0
+        target = max(1, math.ceil(self.count * q / 100.0))
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(self.max_ms, max(self.min_ms, self._upper(idx)))
+        return self.max_ms
+
+    def summary(self) -> dict[str, float]:
+        """次数、平均值与各百分位"""
+        out: dict[str, float] = {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+        }
+        for q in PERCENTILES:
+            out[f"p{q}_ms"] = self.percentile(q)
+        return out
+
+
+class PerfRecorder:
+    """分阶段耗时记录器（线程安全，可由采集线程与 UI 线程共同写入）"""
+
+    def __init__(
+        self,
+        json_path: str | Path | None = None,
+        interval_sec: float = DEFAULT_DUMP_INTERVAL_SEC,
+    ) -> None:
+        self._hists: dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self.json_path = Path(json_path) if json_path else None
+        self.interval_sec = float(interval_sec)
+        self._t_start = time.perf_counter()
+        self._last_dump = self._t_start
+
+    def record(self, stage: str, ms: float) -> None:
+        """记录某阶段一次耗时（毫秒）"""
+        with self._lock:
+            hist = self._hists.get(stage)
+            if hist is None:
+                hist = self._hists[stage] = LatencyHistogram()
+            hist.record(ms)
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """上下文计时：with perf.stage("inference"): ..."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_span(name, t0, time.perf_counter())
+
+    def record_span(self, stage: str, t0: float, t1: float) -> None:
+        """记录 [t0, t1] 时间段（perf_counter 秒）；有当前帧追踪时同时记录 span"""
+        self.record(stage, (t1 - t0) * 1000.0)
+        ctx = current_trace()
+        if ctx is not None:
+            ctx.tracer.span(ctx, stage, t0, t1)
+
+    def record_speed(self, result: Any) -> bool:
+        """记录 ultralytics 结果自带的 preprocess/inference/postprocess 耗时；无该字段返回 False"""
+        speed = getattr(result, "speed", None)
+        if not isinstance(speed, dict):
+            return False
+        for name in _SPEED_STAGES:
+            val = speed.get(name)
+            if val is not None:
+                self.record(name, float(val))
+        return True
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """各阶段统计（约定阶段在前，其余按名称排序）"""
+        with self._lock:
+            names = [s for s in STAGES if s in self._hists]
+            names += sorted(n for n in self._hists if n not in STAGES)
+            return {n: self._hists[n].summary() for n in names}
+
+    def format_table(self) -> str:
+        """格式化为文本表格"""
+        rows = self.summary()
+        if not rows:
+            return "[性能] 无阶段耗时记录"
+        # 表头用 ASCII，避免全角字符破坏列对齐
+        lines = [f"{'stage':<20}{'n':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)"]
+        for name, st in rows.items():
+            lines.append(
+                f"{name:<20}{int(st['count']):>8}{st['mean_ms']:>10.2f}{st['p50_ms']:>10.2f}"
+                f"{st['p95_ms']:>10.2f}{st['p99_ms']:>10.2f}{st['max_ms']:>10.2f}"
+            )
+        return "\n".join(lines)
+
+    def dump(self, path: str | Path | None = None) -> Path | None:
+        """写出 JSON 快照（先写临时文件再替换）；未配置路径返回 None"""
+        target = Path(path) if path else self.json_path
+        if target is None:
+            return None
+        payload = {
+            "uptime_sec": time.perf_counter() - self._t_start,
+            "written_at": time.time(),
+            "stages": self.summary(),
+        }
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        try:
+            tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+            tmp.replace(target)
+        except OSError as e:
+            print(f"[警告] 写出性能统计失败: {e}")
+            return None
+        return target
+
+    def maybe_dump(self) -> None:
+        """距上次写出超过间隔时写出 JSON（未配置路径时为空操作）"""
+        if self.json_path is None:
+            return
+        now = time.perf_counter()
+        if now - self._last_dump < self.interval_sec:
+            return
+        self._last_dump = now
+        self.dump()
+
+
+__all__ = ["STAGES", "LatencyHistogram", "PerfRecorder"]
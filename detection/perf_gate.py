@@ -0,0 +1,279 @@
+"""性能回归门禁：python main.py perfgate [参数] 或 python -m detection.perf_gate [参数]
+
+用固定的小工作量检查热路径（detection/core.py 的 YOLODetector、app/kids_core.py 的 ChildDetector）是否变慢：
+- 模型：由 yolo11n.yaml 结构构建、固定随机种子初始化的本地模型（无需下载权重，输出可复现）
+- 输入：确定性合成帧（与 detection.bench 相同）
+- 计时：各阶段取多轮中位数的最小值；另以 tracemalloc 统计每帧 Python 分配量与峰值
+- 机器速度校准：运行固定的 CPU 基准（torch 矩阵乘 + 纯 Python 循环），按 当前/基线 校准耗时之比缩放基线
+
+与已提交的基线 JSON 对比：某阶段 当前耗时 > 缩放后基线 ×(1+容差) 且超出量大于噪声下限即判为回归，
+打印逐阶段对比并以退出码 1 结束；无基线时退出码 2。--update-baseline 重新生成基线（需随代码一并提交）
+测试入口：tests/test_perf_gate.py（python -m pytest），缺少依赖时跳过
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+DEFAULT_BASELINE = "detection/perf_baseline.json"
+DEFAULT_MODEL_CFG = "yolo11n.yaml"
+DEFAULT_FRAMES = 20
+DEFAULT_ROUNDS = 3
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_ALLOC_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA_MS = 0.5
+GATE_SIZE = "320x240"
+GATE_IMG_SIZE = [320, 320]
+GATE_CONF = 0.05  # 随机权重置信度普遍较低，取低阈值以覆盖 NMS/绘制路径
+GATE_SEED = 0
+_CALIB_ROUNDS = 7
+_CALIB_MATMUL = 256
+_CALIB_LOOP = 200_000
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+EXIT_NO_BASELINE = 2
+
+
+def calibrate() -> float:
+    """机器速度校准：固定 CPU 工作量的中位耗时（毫秒），数值越大表示机器越慢"""
+    import torch
+
+    torch.manual_seed(GATE_SEED)
+    a = torch.rand(_CALIB_MATMUL, _CALIB_MATMUL)
+    b = torch.rand(_CALIB_MATMUL, _CALIB_MATMUL)
+    samples = []
+    for _ in range(_CALIB_ROUNDS):
+        t0 = time.perf_counter()
+        for _ in range(20):
+            a = (a @ b).clamp_(0.0, 1.0)
+        acc = 0
+        for i in range(_CALIB_LOOP):
+            acc += i & 7
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(samples)
+
+
+_SAMPLES: dict[str, list[float]] = {}
+
+
+@contextlib.contextmanager
+def _stage(name: str) -> Iterator[None]:
+    """阶段计时（写入模块级样本表）"""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _SAMPLES.setdefault(name, []).append((time.perf_counter() - t0) * 1000.0)
+
+
+def _build_workloads(model_cfg: str) -> dict[str, Callable[[Any], None]]:
+    """构建各被测对象的逐帧函数：{名称: fn(frame)}；各函数内部按阶段计时"""
+    import torch
+
+    from app.kids_core import ChildConfig, ChildDetector
+    from detection.core import YOLOConfig, YOLODetector
+    from detection.stream import from_result
+
+    torch.manual_seed(GATE_SEED)
+    cfg = YOLOConfig()
+    cfg.model_path = model_cfg
+    cfg.device = "cpu"
+    cfg.conf = GATE_CONF
+    cfg.img_size = list(GATE_IMG_SIZE)
+    cfg.tts_backend = "null"
+    yolo = YOLODetector(cfg)
+    torch.manual_seed(GATE_SEED)
+    child = ChildDetector(
+        ChildConfig(model_path=model_cfg, conf=GATE_CONF, img_size=list(GATE_IMG_SIZE), device="cpu", cache_size=0)
+    )
+
+    def run_yolo(frame: Any) -> None:
+        with _stage("yolo.infer"):
+            result = yolo._infer(frame)
+        with _stage("yolo.result"):
+            res = from_result(0, 0.0, 0.0, frame, result)
+            res.counts()
+        with _stage("yolo.plot"):
+            annotated = res.annotated
+        with _stage("yolo.fps_overlay"):
+            yolo._update_and_draw_fps(annotated)
+
+    def run_child(frame: Any) -> None:
+        with _stage("child.detect"):
+            dets, plotted = child.detect_frame(frame)
+        with _stage("child.center"):
+            idx = child.pick_center_object(dets, plotted.shape)
+            child.annotate_with_center(plotted, dets, idx)
+
+    return {"yolo": run_yolo, "child": run_child}
+
+
+def measure(*, frames: int = DEFAULT_FRAMES, rounds: int = DEFAULT_ROUNDS, model_cfg: str = DEFAULT_MODEL_CFG) -> dict[str, Any]:
+    """运行固定工作量，返回 {calibration_ms, stages: {阶段: ms}, alloc: {对象: {...}}}"""
+    from detection.bench import load_frames
+
+    calib = calibrate()
+    workloads = _build_workloads(model_cfg)
+    data = load_frames("", GATE_SIZE, max(1, frames))
+    for fn in workloads.values():  # 预热（首帧包含模型融合、内存分配等一次性开销）
+        fn(data[0])
+    best: dict[str, float] = {}
+    for _ in range(max(1, rounds)):
+        _SAMPLES.clear()
+        for fn in workloads.values():
+            for frame in data:
+                fn(frame)
+        for name, samples in _SAMPLES.items():
+            med = statistics.median(samples)
+            best[name] = min(best.get(name, med), med)
+    # 分配量单独测一轮：tracemalloc 自身会拖慢计时
+    alloc: dict[str, dict[str, float]] = {}
+    for name, fn in workloads.items():
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        for frame in data:
+            fn(frame)
+        cur, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        alloc[name] = {"retained_kb": (cur - base) / 1024.0, "peak_kb": (peak - base) / 1024.0}
+    _SAMPLES.clear()
+    return {"calibration_ms": calib, "stages": best, "alloc": alloc}
+
+
+def calibration_scale(baseline: dict[str, Any], current: dict[str, Any]) -> float:
+    """当前机器相对基线机器的耗时倍数"""
+    base = baseline.get("calibration_ms")
+    return current["calibration_ms"] / base if base else 1.0
+
+
+def compare(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    *,
+    tolerance: float = DEFAULT_TOLERANCE,
+    alloc_tolerance: float = DEFAULT_ALLOC_TOLERANCE,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+) -> list[dict[str, Any]]:
+    """逐项对比，返回行列表（metric/baseline/expected/current/delta_pct/regressed）"""
+    scale = calibration_scale(baseline, current)
+    rows: list[dict[str, Any]] = []
+    for name, base_ms in baseline.get("stages", {}).items():
+        cur = current["stages"].get(name)
+        expected = base_ms * scale
+        if cur is None:
+            rows.append(
+                {"metric": name, "baseline": base_ms, "expected": expected, "current": None, "delta_pct": None, "regressed": True}
+            )
+            continue
+        regressed = cur > expected * (1.0 + tolerance) and cur - expected > min_delta_ms
+        rows.append(
+            {
+                "metric": name,
+                "baseline": base_ms,
+                "expected": expected,
+                "current": cur,
+                "delta_pct": (cur / expected - 1.0) * 100.0 if expected > 0 else 0.0,
+                "regressed": regressed,
+            }
+        )
+    # 分配量与机器速度无关，不缩放
+    for target, base in baseline.get("alloc", {}).items():
+        cur_alloc = current["alloc"].get(target, {})
+        for key in ("peak_kb", "retained_kb"):
+            b, c = base.get(key), cur_alloc.get(key)
+            if b is None or c is None:
+                continue
+            limit = max(b, 0.0) * (1.0 + alloc_tolerance) + 64.0  # 64KB 噪声下限
+            rows.append(
+                {
+                    "metric": f"{target}.{key}",
+                    "baseline": b,
+                    "expected": b,
+                    "current": c,
+                    "delta_pct": (c / b - 1.0) * 100.0 if b > 0 else 0.0,
+                    "regressed": c > limit,
+                }
+            )
+    return rows
+
+
+def format_rows(rows: list[dict[str, Any]], scale: float) -> str:
+    """格式化对比表"""
+    lines = [f"calibration scale: {scale:.3f}", f"{'metric':<24}{'baseline':>11}{'expected':>11}{'current':>11}{'delta':>9}  status"]
+    for r in rows:
+        cur = "-" if r["current"] is None else f"{r['current']:.2f}"
+        delta = "-" if r["delta_pct"] is None else f"{r['delta_pct']:+.1f}%"
+        status = "REGRESSED" if r["regressed"] else "ok"
+        lines.append(f"{r['metric']:<24}{r['baseline']:>11.2f}{r['expected']:>11.2f}{cur:>11}{delta:>9}  {status}")
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建参数解析器"""
+    p = argparse.ArgumentParser(prog="main.py perfgate", description="热路径性能回归门禁")
+    p.add_argument("--baseline", default=DEFAULT_BASELINE, help=f"基线 JSON（默认 {DEFAULT_BASELINE}）")
+    p.add_argument("--update-baseline", dest="update", action="store_true", help="重新测量并写入基线")
+    p.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help="每轮帧数")
+    p.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="测量轮数（取各轮中位数的最小值）")
+    p.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="耗时容差（相对，默认 0.25）")
+    p.add_argument("--alloc-tolerance", dest="alloc_tolerance", type=float, default=DEFAULT_ALLOC_TOLERANCE, help="分配量容差")
+    p.add_argument("--min-delta-ms", dest="min_delta_ms", type=float, default=DEFAULT_MIN_DELTA_MS, help="耗时噪声下限（毫秒）")
+    p.add_argument("--model-cfg", dest="model_cfg", default=DEFAULT_MODEL_CFG, help="模型结构 yaml（随机初始化）")
+    return p
+
+
+def main(argv: list[str] | None = None) -> int:
+    """门禁入口；返回退出码（0 通过 / 1 回归 / 2 无基线）"""
+    args = build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+    path = Path(args.baseline)
+    if not args.update and not path.exists():
+        print(f"[错误] 未找到基线 {path}，请先运行 --update-baseline 生成并提交")
+        return EXIT_NO_BASELINE
+    current = measure(frames=args.frames, rounds=args.rounds, model_cfg=args.model_cfg)
+    if args.update:
+        import torch
+
+        current["meta"] = {
+            "created": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "platform": platform.platform(),
+            "frames": args.frames,
+            "rounds": args.rounds,
+            "model_cfg": args.model_cfg,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[信息] 基线已写入: {path}")
+        return EXIT_OK
+    baseline = json.loads(path.read_text(encoding="utf-8"))
+    rows = compare(
+        baseline,
+        current,
+        tolerance=args.tolerance,
+        alloc_tolerance=args.alloc_tolerance,
+        min_delta_ms=args.min_delta_ms,
+    )
+    print(format_rows(rows, calibration_scale(baseline, current)))
+    bad = [r["metric"] for r in rows if r["regressed"]]
+    if bad:
+        print(f"[错误] 性能回归: {', '.join(bad)}")
+        return EXIT_REGRESSION
+    print("[信息] 性能门禁通过")
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
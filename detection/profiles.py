@@ -0,0 +1,102 @@
+"""TOML 配置文件与命名配置（profile）
+
+文件结构（键名与 YOLOConfig 字段同名）：
+
+    [defaults]                 # 可选：文件内所有运行的公共值
+    save_dir = "results"
+
+    [profiles.realtime]        # 用 --profile realtime 或 COR_PROFILE=realtime 选择
+    img_size = [480, 480]
+    torch_threads = 4
+
+    [profiles.low-power]
+    extends = "realtime"       # 可选：先继承另一个配置再覆盖
+    img_size = [320, 320]
+
+合成顺序：默认值 < 文件 [defaults] < 命名配置 < 调优配置 < 环境变量 < 命令行（见 detection.core.resolve_config）
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib  # pyright: ignore[reportMissingImports]
+    except ImportError:
+        tomllib = None
+
+DEFAULT_CONFIG_FILE = "cor.toml"
+DEFAULTS_SECTION = "defaults"
+PROFILES_SECTION = "profiles"
+EXTENDS_KEY = "extends"
+
+
+def load_file(path: str | Path) -> dict[str, Any]:
+    """读取 TOML 配置文件"""
+    if tomllib is None:
+        msg = "读取 TOML 需要 Python 3.11+ 或安装 tomli"
+        raise RuntimeError(msg)
+    with Path(path).open("rb") as f:
+        try:
+            return tomllib.load(f)
+        except tomllib.TOMLDecodeError as e:
+            msg = f"配置文件格式错误 {path}: {e}"
+            raise ValueError(msg) from None
+
+
+def profile_names(data: dict[str, Any]) -> list[str]:
+    """文件中定义的命名配置"""
+    return sorted(data.get(PROFILES_SECTION, {}))
+
+
+def resolve_profile(data: dict[str, Any], name: str) -> dict[str, Any]:
+    """展开命名配置（含 extends 继承链），返回字段值；不含 [defaults]"""
+    profiles = data.get(PROFILES_SECTION, {})
+    chain: list[str] = []
+    cur: str | None = name
+    while cur is not None:
+        if cur not in profiles:
+            avail = ", ".join(profile_names(data)) or "无"
+            msg = f"未知的配置: {cur}（可选: {avail}）"
+            raise ValueError(msg)
+        if cur in chain:
+            msg = f"配置继承出现循环: {' -> '.join([*chain, cur])}"
+            raise ValueError(msg)
+        chain.append(cur)
+        cur = profiles[cur].get(EXTENDS_KEY)
+    values: dict[str, Any] = {}
+    for prof in reversed(chain):
+        values.update({k: v for k, v in profiles[prof].items() if k != EXTENDS_KEY})
+    return values
+
+
+def _toml_value(val: Any) -> str:
+    """Python 值转 TOML 字面量（字符串用 JSON 转义，与 TOML 基本字符串兼容）"""
+    if isinstance(val, bool):
+        return "true" if val else "false"
+    if isinstance(val, (int, float)):
+        return repr(val)
+    if isinstance(val, (list, tuple)):
+        return "[" + ", ".join(_toml_value(v) for v in val) + "]"
+    return json.dumps(str(val), ensure_ascii=False)
+
+
+def format_config(values: dict[str, Any], origins: dict[str, str]) -> str:
+    """将生效配置格式化为 TOML（可直接粘贴为命名配置），行尾注释标明来源"""
+    width = max(len(k) for k in values)
+    lines = []
+    for key, val in values.items():
+        origin = origins.get(key, "default")
+        if val is None:
+            lines.append(f"# {key:<{width}} = （未设置）  # {origin}")
+        else:
+            lines.append(f"{key:<{width}} = {_toml_value(val)}  # {origin}")
+    return "\n".join(lines)
+
+
+__all__ = ["DEFAULT_CONFIG_FILE", "format_config", "load_file", "profile_names", "resolve_profile"]
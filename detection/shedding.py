@@ -0,0 +1,137 @@
+"""持续过载时的分级降级（load shedding）
+
+LoadShedder 每帧观察 端到端延迟 与 队列积压，按固定顺序逐级降级、负载缓解后逐级恢复：
+
+    0 正常
+    1 drop_annotation       不绘制检测框（显示/保存原始帧）
+    2 skip_unchanged_saves  类别计数与上次保存相同的帧不再保存
+    3 lower_resolution      推理尺寸降到 DEGRADED_IMG_SIZE
+    4 increase_stride       每 DEGRADED_STRIDE 帧推理一帧，其余帧直接显示
+    5 pause_speech          暂停数量播报
+
+迟滞：延迟滑动平均超过预算（或积压超过上限）连续 up_frames 帧才升一级；
+低于预算 × low_ratio 且无积压连续 down_frames 帧才降一级，每次切换后重新计数，避免来回抖动。
+每次切换都会打印日志并计数（transitions / recoveries / 各步骤启用次数 entered）
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Any
+
+SHED_STEPS = (
+    "drop_annotation",
+    "skip_unchanged_saves",
+    "lower_resolution",
+    "increase_stride",
+    "pause_speech",
+)
+DEGRADED_IMG_SIZE = 320
+DEGRADED_STRIDE = 2
+# 队列积压取播报队列长度（SpeechWorker 默认最多保留 2 条）：超过 1 条即队列已满、开始丢弃旧文本
+DEFAULT_MAX_QUEUE = 1
+DEFAULT_UP_FRAMES = 15
+DEFAULT_DOWN_FRAMES = 90
+DEFAULT_LOW_RATIO = 0.7
+_EMA_ALPHA = 0.2
+_HISTORY = 64
+
+
+class LoadShedder:
+    """按延迟预算与队列积压分级降级/恢复"""
+
+    def __init__(
+        self,
+        budget_ms: float,
+        *,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        up_frames: int = DEFAULT_UP_FRAMES,
+        down_frames: int = DEFAULT_DOWN_FRAMES,
+        low_ratio: float = DEFAULT_LOW_RATIO,
+    ) -> None:
+        self.budget_ms = float(budget_ms)
+        self.max_queue = int(max_queue)
+        self.up_frames = max(1, int(up_frames))
+        self.down_frames = max(1, int(down_frames))
+        self.low_ratio = float(low_ratio)
+        self.level = 0
+        self.latency_ema = 0.0
+        self._over = 0
+        self._under = 0
+        self.transitions = 0
+        self.recoveries = 0
+        # 各降级步骤被启用的次数（下标 0 不用）
+        self.entered = [0] * (len(SHED_STEPS) + 1)
+        self.history: deque[dict[str, Any]] = deque(maxlen=_HISTORY)
+
+    # -------- 当前级别对应的降级动作 --------
+    def active(self, step: str) -> bool:
+        """某降级步骤是否生效"""
+        return self.level > SHED_STEPS.index(step)
+
+    @property
+    def annotate(self) -> bool:
+        return not self.active("drop_annotation")
+
+    @property
+    def skip_unchanged_saves(self) -> bool:
+        return self.active("skip_unchanged_saves")
+
+    @property
+    def stride(self) -> int:
+        return DEGRADED_STRIDE if self.active("increase_stride") else 1
+
+    @property
+    def speech_paused(self) -> bool:
+        return self.active("pause_speech")
+
+    def img_size(self, configured: list[int] | None) -> list[int] | None:
+        """降级时的推理尺寸（不会放大已配置的更小尺寸）"""
+        if not self.active("lower_resolution"):
+            return configured
+        if configured is not None and max(configured) <= DEGRADED_IMG_SIZE:
+            return configured
+        return [DEGRADED_IMG_SIZE, DEGRADED_IMG_SIZE]
+
+    # -------- 观测与切换 --------
+    def observe(self, latency_ms: float, queue_depth: int = 0) -> int:
+        """记录一帧的端到端延迟与队列积压，必要时切换级别；返回当前级别"""
+        ema = self.latency_ema
+        self.latency_ema = latency_ms if ema <= 0 else ema + _EMA_ALPHA * (latency_ms - ema)
+        overloaded = self.latency_ema > self.budget_ms or queue_depth > self.max_queue
+        relaxed = self.latency_ema < self.budget_ms * self.low_ratio and queue_depth == 0
+        self._over = self._over + 1 if overloaded else 0
+        self._under = self._under + 1 if relaxed else 0
+        if self._over >= self.up_frames and self.level < len(SHED_STEPS):
+            self._switch(self.level + 1, queue_depth)
+        elif self._under >= self.down_frames and self.level > 0:
+            self._switch(self.level - 1, queue_depth)
+        return self.level
+
+    def _switch(self, new_level: int, queue_depth: int) -> None:
+        old = self.level
+        self.level = new_level
+        self._over = self._under = 0
+        self.transitions += 1
+        if new_level > old:
+            self.entered[new_level] += 1
+            what = f"降级到第 {new_level} 级（{SHED_STEPS[new_level - 1]}）"
+        else:
+            self.recoveries += 1
+            what = f"恢复到第 {new_level} 级（取消 {SHED_STEPS[old - 1]}）"
+        self.history.append(
+            {"t": time.time(), "from": old, "to": new_level, "latency_ms": self.latency_ema, "queue": queue_depth}
+        )
+        print(
+            f"[负载] {what}：延迟均值 {self.latency_ema:.1f} ms / 预算 {self.budget_ms:.1f} ms，队列 {queue_depth}"
+        )
+
+    def summary(self) -> str:
+        """退出时的一行统计"""
+        counts = "，".join(f"{SHED_STEPS[i - 1]} {n} 次" for i, n in enumerate(self.entered) if i and n)
+        head = f"[负载] 共切换 {self.transitions} 次（恢复 {self.recoveries} 次），最终第 {self.level} 级"
+        return head + (f"；启用: {counts}" if counts else "")
+
+
+__all__ = ["DEFAULT_MAX_QUEUE", "DEGRADED_IMG_SIZE", "DEGRADED_STRIDE", "SHED_STEPS", "LoadShedder"]
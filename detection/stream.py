@@ -0,0 +1,182 @@
+"""流式检测结果与预读
+
+- StreamFrame：YOLODetector.stream() 逐帧产出的轻量结果（帧号、时间戳、原始帧、boxes/classes/confs 数组）；
+  annotated 在首次访问时才绘制（计入 plot 阶段），不需要可视化的调用方不付出绘制开销；
+  ultralytics 结果仅为绘制暂存，绘制后即释放，不随帧长期持有
+- FramePrefetcher：后台读帧线程 + 有界队列，实现背压：
+  - block：队列满时读帧线程等待（文件/录制回放，不丢帧）
+  - drop_oldest：队列满时丢弃最旧的帧（摄像头，始终处理最新画面），并计数
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from detection.tracing import TraceCtx
+
+_EMPTY_BOXES = np.zeros((0, 4), dtype=np.float32)
+_EMPTY_CLASSES = np.zeros((0,), dtype=np.int64)
+_EMPTY_CONFS = np.zeros((0,), dtype=np.float32)
+for _arr in (_EMPTY_BOXES, _EMPTY_CLASSES, _EMPTY_CONFS):
+    _arr.setflags(write=False)  # 各帧共享的空数组，禁止原地修改
+_PUT_TIMEOUT_SEC = 0.1
+
+
+@dataclass(slots=True, eq=False)
+class StreamFrame:
+    frame_id: int
+    timestamp: float  # 采集时刻（time.time()，便于与外部系统对齐）
+    t_capture: float  # 采集时刻（time.perf_counter()，用于计算延迟）
+    frame: np.ndarray  # 原始帧（BGR）
+    boxes: np.ndarray = field(default_factory=lambda: _EMPTY_BOXES)  # (N, 4) xyxy 像素坐标
+    classes: np.ndarray = field(default_factory=lambda: _EMPTY_CLASSES)  # (N,)
+    confs: np.ndarray = field(default_factory=lambda: _EMPTY_CONFS)  # (N,)
+    names: dict[int, str] = field(default_factory=dict)
+    source_fps: float = 0.0
+    skipped: bool = False  # 降级（加大步长）时本帧未推理
+    trace: TraceCtx | None = None
+    _perf: Any = None
+    _result: Any = None  # 仅供 annotated 绘制的 ultralytics 结果，绘制后释放
+    _annotated: np.ndarray | None = None
+
+    @property
+    def annotated(self) -> np.ndarray:
+        """绘制了检测框的图像（首次访问时绘制并缓存；未推理的帧返回原始帧）"""
+        if self._annotated is None:
+            if self._result is None:
+                self._annotated = self.frame
+            elif self._perf is not None:
+                with self._perf.stage("plot"):
+                    self._annotated = self._result.plot()
+            else:
+                self._annotated = self._result.plot()
+            self._result = None
+        return self._annotated
+
+    @property
+    def annotated_ready(self) -> bool:
+        """是否已绘制（未绘制时显示/保存可直接使用原始帧）"""
+        return self._annotated is not None
+
+    def counts(self) -> tuple[tuple[int, int], ...]:
+        """各类别数量，按类别排序"""
+        if self.classes.size == 0:
+            return ()
+        ids, n = np.unique(self.classes, return_counts=True)
+        return tuple(zip(ids.tolist(), n.tolist(), strict=True))
+
+    def yolo_lines(self) -> list[str]:
+        """YOLO txt 行文本列表（类别 + 归一化中心点与宽高）"""
+        h, w = self.frame.shape[:2]
+        lines: list[str] = []
+        for cls_id, (x1, y1, x2, y2) in zip(self.classes.tolist(), self.boxes.tolist(), strict=True):
+            x_c = (x1 + x2) / 2 / w
+            y_c = (y1 + y2) / 2 / h
+            bw = (x2 - x1) / w
+            bh = (y2 - y1) / h
+            lines.append(f"{cls_id} {x_c:.6f} {y_c:.6f} {bw:.6f} {bh:.6f}\n")
+        return lines
+
+
+def from_result(
+    frame_id: int,
+    timestamp: float,
+    t_capture: float,
+    frame: np.ndarray,
+    result: Any,
+    **kw: Any,
+) -> StreamFrame:
+    """由 ultralytics 结果构建 StreamFrame（数组一次性拷到 CPU；结果本身只保留到绘制为止）"""
+    boxes = getattr(result, "boxes", None)
+    names = getattr(result, "names", None) or {}
+    if boxes is None or len(boxes) == 0:
+        return StreamFrame(frame_id, timestamp, t_capture, frame, names=names, _result=result, **kw)
+    return StreamFrame(
+        frame_id,
+        timestamp,
+        t_capture,
+        frame,
+        boxes=boxes.xyxy.cpu().numpy(),
+        classes=boxes.cls.cpu().numpy().astype(np.int64),
+        confs=boxes.conf.cpu().numpy(),
+        names=names,
+        _result=result,
+        **kw,
+    )
+
+
+def size_groups(frames: list[Any], img_size: list[int] | None) -> dict[tuple[int, ...], list[int]]:
+    """批量推理的分组：{推理尺寸: 帧下标}；设置了 img_size 时全部一组，否则按帧尺寸分组（原始尺寸推理）"""
+    groups: dict[tuple[int, ...], list[int]] = {}
+    for i, frame in enumerate(frames):
+        key = tuple(img_size) if img_size is not None else tuple(frame.shape[:2])
+        groups.setdefault(key, []).append(i)
+    return groups
+
+
+class FramePrefetcher:
+    """后台读帧：read() 返回 (ok, frame, t_read, t_capture, wall_ts)，与 cap.read() 的失败语义一致"""
+
+    def __init__(self, cap: Any, *, depth: int, drop_oldest: bool, stop_on_fail: bool) -> None:
+        self._cap = cap
+        self._q: queue.Queue[tuple[bool, Any, float, float, float]] = queue.Queue(maxsize=max(1, depth))
+        self._drop_oldest = drop_oldest
+        self._stop_on_fail = stop_on_fail
+        self._stop = threading.Event()
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="COR-Prefetch", daemon=True)
+        self._thread.start()
+
+    def _put(self, item: tuple[bool, Any, float, float, float]) -> None:
+        if self._drop_oldest:
+            while True:
+                try:
+                    self._q.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        self._q.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+        while not self._stop.is_set():
+            try:
+                self._q.put(item, timeout=_PUT_TIMEOUT_SEC)
+                return
+            except queue.Full:
+                continue
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            t_read = time.perf_counter()
+            try:
+                ok, frame = self._cap.read()
+            except Exception as e:  # 读帧异常按失败处理，避免消费方永久阻塞
+                print(f"[警告] 读取帧失败: {e}")
+                ok, frame = False, None
+            self._put((bool(ok) and frame is not None, frame, t_read, time.perf_counter(), time.time()))
+            if not ok and self._stop_on_fail:
+                return
+
+    def read(self) -> tuple[bool, Any, float, float, float]:
+        """取下一帧（阻塞）"""
+        return self._q.get()
+
+    def close(self) -> None:
+        """停止读帧线程（调用方随后释放 cap）"""
+        self._stop.set()
+        try:
+            while True:
+                self._q.get_nowait()
+        except queue.Empty:
+            pass
+        self._thread.join(timeout=2)
+
+
+__all__ = ["FramePrefetcher", "StreamFrame", "from_result", "size_groups"]
@@ -0,0 +1,144 @@
+"""逐帧追踪与 Chrome trace 导出
+
+- 每读取一帧调用 Tracer.begin() 得到 TraceCtx（trace_id + 采集时刻）
+- 在处理该帧的线程中用 activate(ctx) / set_current(ctx) 设为“当前追踪”：PerfRecorder.stage() 的计时段、
+  播报队列（TTSManager / SpeechWorker）入队时都会自动带上它，无需修改调用签名
+- latency() 把“采集 -> 显示/播报”的端到端延迟记入 PerfRecorder 直方图（始终开启）
+- 启用导出时额外记录 span，dump() 写出 Chrome trace-event JSON（chrome://tracing / Perfetto 可直接打开）
+"""
+
+from __future__ import annotations
+
+import contextlib
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from detection.perf import PerfRecorder
+
+DEFAULT_MAX_EVENTS = 200_000
+_US = 1_000_000.0
+
+
+@dataclass(frozen=True, slots=True)
+class TraceCtx:
+    trace_id: int
+    t_capture: float  # time.perf_counter() 时刻
+    tracer: Tracer
+
+
+_CURRENT: ContextVar[TraceCtx | None] = ContextVar("cor_trace", default=None)
+
+
+def current_trace() -> TraceCtx | None:
+    """当前线程（上下文）正在处理的帧追踪"""
+    return _CURRENT.get()
+
+
+def set_current(ctx: TraceCtx | None) -> None:
+    """将 ctx 设为当前追踪（逐帧循环中每帧覆盖一次，结束时传入 None）"""
+    _CURRENT.set(ctx)
+
+
+@contextlib.contextmanager
+def activate(ctx: TraceCtx | None) -> Iterator[TraceCtx | None]:
+    """在 with 块内将 ctx 设为当前追踪"""
+    token = _CURRENT.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _CURRENT.reset(token)
+
+
+class Tracer:
+    """帧追踪器：分配 trace_id、记录端到端延迟，可选记录 span 并导出"""
+
+    def __init__(
+        self,
+        perf: PerfRecorder | None = None,
+        *,
+        export: bool = False,
+        max_events: int = DEFAULT_MAX_EVENTS,
+    ) -> None:
+        self.perf = perf
+        self.export = export
+        self._ids = itertools.count(1)
+        self._events: deque[dict[str, Any]] = deque(maxlen=max(1, int(max_events)))
+        self._threads: dict[int, str] = {}
+        self._t0 = time.perf_counter()
+
+    def begin(self, t_capture: float | None = None) -> TraceCtx:
+        """为新读取的一帧分配追踪上下文"""
+        return TraceCtx(next(self._ids), time.perf_counter() if t_capture is None else t_capture, self)
+
+    def span(self, ctx: TraceCtx | None, name: str, t0: float, t1: float, **args: Any) -> None:
+        """记录一个时间段（仅在启用导出时保存）"""
+        if not self.export:
+            return
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        if ctx is not None:
+            args["trace_id"] = ctx.trace_id
+        # deque.append 为原子操作，多线程写入无需加锁
+        self._events.append(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (t0 - self._t0) * _US,
+                "dur": max(0.0, t1 - t0) * _US,
+                "pid": 1,
+                "tid": tid,
+                "args": args,
+            }
+        )
+
+    @contextlib.contextmanager
+    def stage(self, ctx: TraceCtx | None, name: str, **args: Any) -> Iterator[None]:
+        """上下文计时并记录 span"""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.span(ctx, name, t0, time.perf_counter(), **args)
+
+    def latency(self, ctx: TraceCtx | None, name: str, t_end: float | None = None) -> None:
+        """记录从采集到 t_end 的端到端延迟（毫秒，写入 PerfRecorder），并记录对应 span"""
+        if ctx is None:
+            return
+        t1 = time.perf_counter() if t_end is None else t_end
+        if self.perf is not None:
+            self.perf.record(name, (t1 - ctx.t_capture) * 1000.0)
+        self.span(ctx, name, ctx.t_capture, t1)
+
+    def dump(self, path: str | Path) -> Path | None:
+        """写出 Chrome trace-event JSON；未启用导出时返回 None"""
+        if not self.export:
+            return None
+        events = list(self._events)
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+            for tid, name in list(self._threads.items())
+        ]
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            target.write_text(
+                json.dumps({"traceEvents": meta + events, "displayTimeUnit": "ms"}, ensure_ascii=False),
+                encoding="utf-8",
+            )
+        except OSError as e:
+            print(f"[警告] 写出追踪文件失败: {e}")
+            return None
+        return target
+
+
+__all__ = ["TraceCtx", "Tracer", "activate", "current_trace", "set_current"]
@@ -4,36 +4,58 @@
     - python main.py                  启动 儿童识物 GUI
     - python main.py gui             启动 儿童识物 GUI
     - python main.py detect [args]   运行检测 CLI
+    - python main.py bench [args]    运行基准测试（无摄像头/无显示）
+    - python main.py perfgate [args] 运行性能回归门禁（对比已提交的基线）
 
 推荐的模块入口（更规范）：
     - python -m app.kids_gui         启动 GUI
     - python -m detection.cli        运行检测 CLI
+    - python -m detection.bench      运行基准测试
+    - python -m detection.perf_gate  运行性能回归门禁
 """
 from __future__ import annotations
 
 import sys
 
-from app.kids_gui import main as kids_main
-from detection.cli import main as detect_main
-
 
+# 子命令按需导入：bench 在无 GUI 依赖的机器上也能运行
 def _run_gui() -> None:
     """启动 儿童识物 GUI（默认）"""
+    from app.kids_gui import main as kids_main
+
     kids_main()
 
 
 def _run_detect(argv: list[str]) -> None:
     """运行检测 CLI"""
+    from detection.cli import main as detect_main
+
     detect_main(argv)
 
 
+def _run_bench(argv: list[str]) -> None:
+    """运行基准测试"""
+    from detection.bench import main as bench_main
+
+    bench_main(argv)
+
+
+def _run_perf_gate(argv: list[str]) -> None:
+    """运行性能回归门禁（退出码 0 通过 / 1 回归 / 2 无基线）"""
+    from detection.perf_gate import main as gate_main
+
+    sys.exit(gate_main(argv))
+
+
 def _print_usage() -> None:
     """打印用法说明"""
     print(
         "用法:\n"
         "  python main.py                 # 启动 儿童识物 GUI（默认）\n"
         "  python main.py gui             # 启动 儿童识物 GUI\n"
-        "  python main.py detect [参数]   # 运行检测 CLI\n",
+        "  python main.py detect [参数]   # 运行检测 CLI\n"
+        "  python main.py bench [参数]    # 运行基准测试（无摄像头/无显示）\n"
+        "  python main.py perfgate [参数] # 性能回归门禁（对比已提交的基线）\n",
         end="",
     )
 
@@ -53,6 +75,12 @@ def main() -> None:
     if cmd in {"detect", "det", "yolo"}:
         _run_detect(rest)
         return
+    if cmd == "bench":
+        _run_bench(rest)
+        return
+    if cmd == "perfgate":
+        _run_perf_gate(rest)
+        return
 
     _print_usage()
     sys.exit(2)
@@ -0,0 +1,67 @@
+"""AsyncDetector 测试：空闲时单个请求立即下发，忙碌时到达的请求合并成批；max_pending 须 >= 1"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from detection.aio import AsyncDetector
+
+
+class _FakeDetector:
+    """ChildDetector 形态的检测器：detect_frames 记录每批大小，可按需阻塞"""
+
+    def __init__(self) -> None:
+        self.cfg = SimpleNamespace(cpu_affinity=None)
+        self.batch_sizes: list[int] = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def detect_frames(self, frames: list[np.ndarray]) -> list[tuple[list[object], np.ndarray]]:
+        self.gate.wait(5.0)
+        self.batch_sizes.append(len(frames))
+        return [([], f) for f in frames]
+
+
+def _frame() -> np.ndarray:
+    return np.zeros((4, 4, 3), dtype=np.uint8)
+
+
+def test_lone_request_is_dispatched_immediately() -> None:
+    async def run() -> float:
+        async with AsyncDetector(_FakeDetector()) as adet:
+            await adet.detect(_frame())  # 预热：推理线程启动
+            t0 = time.perf_counter()
+            await adet.detect(_frame())
+            return time.perf_counter() - t0
+
+    assert asyncio.run(run()) < 0.05
+
+
+def test_requests_arriving_while_busy_are_batched() -> None:
+    det = _FakeDetector()
+
+    async def run() -> None:
+        async with AsyncDetector(det, max_batch=8) as adet:
+            det.gate.clear()
+            first = asyncio.ensure_future(adet.detect(_frame()))
+            while not adet.batches:  # 第一批已下发，推理线程阻塞
+                await asyncio.sleep(0.001)
+            rest = [asyncio.ensure_future(adet.detect(_frame())) for _ in range(5)]
+            await asyncio.sleep(0.01)
+            det.gate.set()
+            await asyncio.gather(first, *rest)
+
+    asyncio.run(run())
+    assert det.batch_sizes == [1, 5]
+
+
+@pytest.mark.parametrize("max_pending", [0, -1])
+def test_max_pending_must_be_positive(max_pending: int) -> None:
+    with pytest.raises(ValueError, match="max_pending"):
+        AsyncDetector(_FakeDetector(), max_pending=max_pending)
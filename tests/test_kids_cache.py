@@ -0,0 +1,45 @@
+"""DetectionCache 测试：调用方在返回的标注图上绘制不会污染缓存（内存层与磁盘层）"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("PySide6", reason="app 包导入时加载 GUI（PySide6）")
+pytest.importorskip("ultralytics", reason="app.kids_core 依赖 ultralytics")
+
+from app.kids_cache import DetectionCache  # noqa: E402
+from app.kids_core import Detection  # noqa: E402
+
+
+def _entry() -> tuple[list[Detection], np.ndarray]:
+    dets = [Detection(0, "人", 0.5, (1, 2, 30, 40))]
+    return dets, np.full((8, 8, 3), 7, dtype=np.uint8)
+
+
+def test_drawing_on_result_does_not_corrupt_memory_entry() -> None:
+    cache = DetectionCache(4)
+    dets, img = _entry()
+    cache.put("k", dets, img)
+    img[:] = 0  # 调用方继续在自己的图上绘制
+    hit = cache.get("k")
+    assert hit is not None
+    hit[1][:] = 255  # 在命中的图上绘制
+    again = cache.get("k")
+    assert again is not None
+    assert (again[1] == 7).all()
+    assert again[0] == dets
+
+
+def test_drawing_on_result_does_not_corrupt_disk_entry(tmp_path: Path) -> None:
+    DetectionCache(4, tmp_path).put("k", *_entry())
+    cache = DetectionCache(4, tmp_path)  # 新实例：从磁盘层回填
+    hit = cache.get("k")
+    assert hit is not None
+    hit[1][:] = 255
+    again = cache.get("k")
+    assert again is not None
+    assert (again[1] == 7).all()
+    assert again[0] == _entry()[0]
@@ -0,0 +1,69 @@
+"""性能回归门禁：热路径与已提交基线（detection/perf_baseline.json）对比，回归时失败
+
+缺少 torch/ultralytics/PySide6 或无法构建门禁模型时跳过（不判失败）；
+有意接受性能变化后运行 python main.py perfgate --update-baseline 并提交新基线
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from detection import perf_gate
+
+BASELINE = Path(__file__).resolve().parents[1] / perf_gate.DEFAULT_BASELINE
+
+
+def _baseline() -> dict:
+    return {
+        "calibration_ms": 10.0,
+        "stages": {"yolo.infer": 20.0, "yolo.plot": 0.2},
+        "alloc": {"yolo": {"peak_kb": 256.0, "retained_kb": 16.0}},
+    }
+
+
+def test_compare_scales_by_calibration() -> None:
+    # 机器慢一倍时耗时翻倍不算回归
+    current = {
+        "calibration_ms": 20.0,
+        "stages": {"yolo.infer": 40.0, "yolo.plot": 0.4},
+        "alloc": {"yolo": {"peak_kb": 256.0, "retained_kb": 16.0}},
+    }
+    rows = perf_gate.compare(_baseline(), current)
+    assert not [r for r in rows if r["regressed"]]
+
+
+def test_compare_flags_regressions() -> None:
+    current = {
+        "calibration_ms": 10.0,
+        "stages": {"yolo.infer": 30.0, "yolo.plot": 0.6},
+        "alloc": {"yolo": {"peak_kb": 1024.0, "retained_kb": 16.0}},
+    }
+    bad = {r["metric"] for r in perf_gate.compare(_baseline(), current) if r["regressed"]}
+    # yolo.plot 超出比例但低于噪声下限（min_delta_ms）
+    assert bad == {"yolo.infer", "yolo.peak_kb"}
+
+
+def test_compare_flags_missing_stage() -> None:
+    current = {"calibration_ms": 10.0, "stages": {"yolo.infer": 20.0}, "alloc": {}}
+    bad = {r["metric"] for r in perf_gate.compare(_baseline(), current) if r["regressed"]}
+    assert bad == {"yolo.plot"}
+
+
+def test_hot_paths_within_baseline() -> None:
+    pytest.importorskip("torch", reason="门禁需要 torch")
+    pytest.importorskip("ultralytics", reason="门禁需要 ultralytics")
+    pytest.importorskip("PySide6", reason="app.kids_core 随 app 包导入 PySide6")
+    if not BASELINE.exists():
+        pytest.skip(f"未找到基线 {BASELINE}，请运行 python main.py perfgate --update-baseline")
+    baseline = json.loads(BASELINE.read_text(encoding="utf-8"))
+    try:
+        current = perf_gate.measure()
+    except (ImportError, OSError, RuntimeError) as e:
+        pytest.skip(f"无法构建门禁模型或运行基准: {e}")
+    rows = perf_gate.compare(baseline, current)
+    table = perf_gate.format_rows(rows, perf_gate.calibration_scale(baseline, current))
+    bad = [r["metric"] for r in rows if r["regressed"]]
+    assert not bad, f"性能回归: {', '.join(bad)}\n{table}"
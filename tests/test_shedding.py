@@ -0,0 +1,36 @@
+"""LoadShedder 测试：仅凭队列积压（延迟始终在预算内）也能逐级降级，积压消失后恢复"""
+
+from __future__ import annotations
+
+from detection.shedding import DEFAULT_MAX_QUEUE, SHED_STEPS, LoadShedder
+from voice.announce import DEFAULT_MAX_PENDING
+
+
+def test_default_max_queue_below_speech_capacity() -> None:
+    # 积压取播报队列长度，上限须小于队列容量，否则永远不会触发
+    assert 0 <= DEFAULT_MAX_QUEUE < DEFAULT_MAX_PENDING
+
+
+def test_queue_depth_alone_degrades_and_recovers() -> None:
+    shed = LoadShedder(100.0, up_frames=3, down_frames=5)
+    full = DEFAULT_MAX_PENDING  # 播报队列已满
+    for _ in range(3):
+        shed.observe(10.0, full)
+    assert shed.level == 1
+    assert not shed.annotate
+    for _ in range(3 * (len(SHED_STEPS) - 1)):
+        shed.observe(10.0, full)
+    assert shed.level == len(SHED_STEPS)
+    assert shed.speech_paused
+
+    for _ in range(5 * len(SHED_STEPS)):
+        shed.observe(10.0, 0)
+    assert shed.level == 0
+    assert shed.recoveries == len(SHED_STEPS)
+
+
+def test_queue_within_limit_does_not_degrade() -> None:
+    shed = LoadShedder(100.0, up_frames=3)
+    for _ in range(30):
+        shed.observe(10.0, DEFAULT_MAX_QUEUE)
+    assert shed.level == 0
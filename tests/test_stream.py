@@ -0,0 +1,55 @@
+"""StreamFrame 测试：只保留数组与原始帧，ultralytics 结果绘制后即释放；txt 行由数组生成"""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from detection.stream import from_result
+
+
+class _Arr:
+    """模拟 torch 张量的 .cpu().numpy()"""
+
+    def __init__(self, values: list[float] | list[list[float]]) -> None:
+        self._a = np.asarray(values, dtype=np.float32)
+
+    def cpu(self) -> _Arr:
+        return self
+
+    def numpy(self) -> np.ndarray:
+        return self._a
+
+
+class _Boxes:
+    def __init__(self) -> None:
+        self.xyxy = _Arr([[10, 20, 110, 220], [300, 100, 400, 300]])
+        self.cls = _Arr([0, 2])
+        self.conf = _Arr([0.9, 0.5])
+
+    def __len__(self) -> int:
+        return 2
+
+
+def _result(frame: np.ndarray) -> SimpleNamespace:
+    return SimpleNamespace(boxes=_Boxes(), names={0: "a", 2: "c"}, plot=lambda: frame + 1)
+
+
+def test_result_is_released_after_drawing() -> None:
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    sf = from_result(1, 0.0, 0.0, frame, _result(frame))
+    assert sf.counts() == ((0, 1), (2, 1))
+    annotated = sf.annotated
+    assert (annotated == 1).all()
+    assert sf._result is None
+    assert sf.annotated is annotated
+
+
+def test_yolo_lines_from_arrays() -> None:
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    sf = from_result(1, 0.0, 0.0, frame, _result(frame))
+    assert sf.yolo_lines() == [
+        "0 0.093750 0.250000 0.156250 0.416667\n",
+        "2 0.546875 0.416667 0.156250 0.416667\n",
+    ]
@@ -0,0 +1,183 @@
+"""PendingStore 并发测试：多个生产者线程写入/取消/抑制/快照，同时一个消费者线程 pop
+
+校验：优先级顺序、已取消的 key/tag 项不会被取出、没有项丢失或重复；
+另校验预渲染词表与 TTSManager 实际播报的分片一致（缓存键能命中）
+"""
+
+from __future__ import annotations
+
+import itertools
+import random
+import threading
+import time
+
+from voice.tts_queue import (
+    PRIORITY_CHATTER,
+    PRIORITY_INTRO,
+    PRIORITY_URGENT,
+    PendingItem,
+    PendingStore,
+    TTSManager,
+)
+
+PRODUCERS = 6
+GROUPS_PER_PRODUCER = 300
+PRIORITIES = (PRIORITY_URGENT, PRIORITY_INTRO, PRIORITY_CHATTER)
+
+
+def _group(seq: itertools.count, pid: int, i: int, rng: random.Random) -> list[PendingItem]:
+    """生成一组项（1~3 个分片，共享 key 与 tags）"""
+    prio = rng.choice(PRIORITIES)
+    key = f"p{pid}-{i}"
+    tags = {f"producer:{pid}"}
+    if i % 7 == 0:
+        tags.add("doomed")
+    if i % 11 == 0:
+        tags.add("muted")
+    now = time.time()
+    return [
+        PendingItem(prio, next(seq), f"{key}/{part}", now, key, frozenset(tags), part=part)
+        for part in range(rng.randint(1, 3))
+    ]
+
+
+def _consume(store: PendingStore, out: list[PendingItem]) -> None:
+    while (item := store.pop()) is not None:
+        out.append(item)
+
+
+def test_priority_order_after_concurrent_pushes() -> None:
+    store = PendingStore(max_items=PRODUCERS * GROUPS_PER_PRODUCER * 3)
+    seq = itertools.count()
+    start = threading.Barrier(PRODUCERS)
+
+    def produce(pid: int) -> None:
+        rng = random.Random(pid)
+        start.wait()
+        for i in range(GROUPS_PER_PRODUCER):
+            store.push_group(_group(seq, pid, i, rng))
+
+    threads = [threading.Thread(target=produce, args=(pid,)) for pid in range(PRODUCERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    snap = store.snapshot()
+    popped: list[PendingItem] = []
+    consumer = threading.Thread(target=_consume, args=(store, popped))
+    consumer.start()
+    while len(store):
+        time.sleep(0.01)
+    store.close()
+    consumer.join(timeout=5)
+    assert not consumer.is_alive()
+    keys = [(it.priority, it.seq) for it in popped]
+    assert keys == sorted(keys)
+    assert [it.seq for it in popped] == [it.seq for it in snap]
+
+
+def test_concurrent_producers_cancel_and_consumer() -> None:
+    store = PendingStore(max_items=PRODUCERS * GROUPS_PER_PRODUCER * 3)
+    seq = itertools.count()
+    store.suppress_tag("muted", 60.0)
+    added: dict[int, PendingItem] = {}
+    replaced: list[PendingItem] = []
+    cancelled: list[PendingItem] = []
+    popped: list[PendingItem] = []
+    rejected: list[PendingItem] = []
+    lock = threading.Lock()
+    producing = threading.Event()
+    producing.set()
+    snapshot_errors: list[str] = []
+
+    def produce(pid: int) -> None:
+        rng = random.Random(pid)
+        for i in range(GROUPS_PER_PRODUCER):
+            items = _group(seq, pid, i, rng)
+            n, old = store.push_group(items)
+            with lock:
+                replaced.extend(old)
+                if n:
+                    added.update((it.seq, it) for it in items[:n])
+                else:
+                    rejected.extend(items)
+            # 同 key 再推一次：替换尚未取出的旧组
+            if i % 5 == 0:
+                again = _group(seq, pid, i, rng)
+                n, old = store.push_group(again)
+                with lock:
+                    replaced.extend(old)
+                    added.update((it.seq, it) for it in again[:n])
+            if i % 13 == 0:
+                got = store.cancel_key(f"p{pid}-{i}")
+                with lock:
+                    cancelled.extend(got)
+
+    def cancel_doomed() -> None:
+        while producing.is_set():
+            got = store.cancel_tag("doomed")
+            with lock:
+                cancelled.extend(got)
+            time.sleep(0.001)
+
+    def take_snapshots() -> None:
+        while producing.is_set():
+            snap = store.snapshot()
+            keys = [(it.priority, it.seq) for it in snap]
+            if keys != sorted(keys) or len(set(keys)) != len(keys):
+                snapshot_errors.append("snapshot 未按出队顺序或包含重复项")
+            if any("muted" in it.tags for it in snap):
+                snapshot_errors.append("snapshot 包含被抑制的项")
+            time.sleep(0.001)
+
+    consumer = threading.Thread(target=_consume, args=(store, popped))
+    helpers = [threading.Thread(target=cancel_doomed), threading.Thread(target=take_snapshots)]
+    producers = [threading.Thread(target=produce, args=(pid,)) for pid in range(PRODUCERS)]
+    consumer.start()
+    for t in helpers + producers:
+        t.start()
+    for t in producers:
+        t.join()
+    producing.clear()
+    for t in helpers:
+        t.join()
+    while len(store):
+        time.sleep(0.01)
+    store.close()
+    consumer.join(timeout=5)
+    assert not consumer.is_alive()
+
+    assert not snapshot_errors
+    assert popped and cancelled and replaced and rejected
+    popped_ids = [it.seq for it in popped]
+    cancelled_ids = {it.seq for it in cancelled}
+    replaced_ids = {it.seq for it in replaced}
+    # 不重复取出；已取消/已替换的项不会被取出
+    assert len(popped_ids) == len(set(popped_ids))
+    assert not cancelled_ids & set(popped_ids)
+    assert not replaced_ids & set(popped_ids)
+    # 被抑制的 tag 从未入队
+    assert all("muted" in it.tags for it in rejected)
+    assert not any("muted" in it.tags for it in popped)
+    # 没有丢失：每个入队项恰好被取出、取消或替换之一
+    assert store.dropped == 0
+    assert set(popped_ids) | cancelled_ids | replaced_ids == set(added)
+    assert len(popped_ids) + len(cancelled_ids) + len(replaced_ids) == len(added)
+
+
+class _SilentTTS:
+    def speak(self, text: str) -> None:
+        return None
+
+
+def test_warm_up_phrases_match_spoken_intro_chunks() -> None:
+    from detection.coco_intros_cn import coco_intros_cn
+    from voice import tts
+
+    phrases = set(tts.default_phrases())
+    for intro in coco_intros_cn.values():
+        mgr = TTSManager(tts_module=_SilentTTS(), max_age_sec=None)
+        mgr.speak(intro, priority=PRIORITY_INTRO)
+        spoken = [it.text for it in mgr.pending()]
+        assert spoken
+        assert set(spoken) <= phrases, intro
@@ -2,7 +2,18 @@
 
 from __future__ import annotations
 
-from .announce import Announcer, set_speaker
-from .tts_queue import TTSManager
+from .announce import Announcer, SpeechWorker, get_speech_stats, set_speaker
+from .tts_queue import PRIORITY_CHATTER, PRIORITY_INTRO, PRIORITY_URGENT, TTSManager, speech_chunks, split_sentences
 
-__all__ = ["Announcer", "TTSManager", "set_speaker"]
+__all__ = [
+    "PRIORITY_CHATTER",
+    "PRIORITY_INTRO",
+    "PRIORITY_URGENT",
+    "Announcer",
+    "SpeechWorker",
+    "TTSManager",
+    "get_speech_stats",
+    "set_speaker",
+    "speech_chunks",
+    "split_sentences",
+]
@@ -4,16 +4,29 @@
 - 通用文本播报
 - 数量播报
 
+默认播报路径经由一个共享的有界播报线程（SpeechWorker）：
+检测循环只做入队（常数开销），待播报文本最多保留 max_pending 条，旧的直接丢弃
+
+数量播报先经过 CountSmoother：同一数量签名连续稳定若干帧才播报，短语按签名缓存
 """
 
 from __future__ import annotations
 
+import logging
+import threading
 import time
+from collections import deque
+from collections.abc import Callable
+from functools import lru_cache
+
+from detection.tracing import TraceCtx, current_trace
 
 try:
-    from .tts import speak_async as _speak_async
+    from . import tts as _tts
 except (ImportError, OSError, RuntimeError):  # 可选依赖缺失
-    _speak_async = None
+    _tts = None
+
+_speak_blocking = _tts.speak if _tts is not None and _tts.AVAILABLE else None
 
 try:
     # 包内提供中文标签映射
@@ -26,7 +39,106 @@ def _noop(_: str) -> None:
     return None
 
 
-_speak_func = _speak_async or _noop
+DEFAULT_MAX_PENDING = 2
+DEFAULT_MAX_AGE_SEC = 3.0
+_log = logging.getLogger("COR.Announce")
+
+
+class SpeechWorker:
+    """共享的有界播报线程
+
+    - submit() 只入队并立即返回；队列满时丢弃最旧的一条
+    - 排队超过 max_age_sec 的文本在播报前丢弃（检测画面已变化）
+    - 同一时刻只有一句交给 TTS，播报线程只有一个
+    """
+
+    def __init__(
+        self,
+        speak: Callable[[str], None],
+        *,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        max_age_sec: float | None = DEFAULT_MAX_AGE_SEC,
+    ) -> None:
+        self._speak = speak
+        self._max_age = None if max_age_sec is None else float(max_age_sec)
+        self._pending: deque[tuple[float, str, TraceCtx | None]] = deque(maxlen=max(1, int(max_pending)))
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        # 计数只在 _cond 下修改；其他线程通过 get_stats() 读取
+        self.stats: dict[str, int] = {"submitted": 0, "spoken": 0, "dropped": 0, "stale": 0, "failed": 0}
+
+    def submit(self, text: str) -> None:
+        """提交一句播报（不阻塞）；调用线程存在当前帧追踪时随文本一并记录"""
+        if not text:
+            return
+        with self._cond:
+            self._start_locked()
+            if len(self._pending) == self._pending.maxlen:
+                self.stats["dropped"] += 1
+            self._pending.append((time.perf_counter(), text, current_trace()))
+            self.stats["submitted"] += 1
+            self._cond.notify()
+
+    def start(self) -> None:
+        """提前启动播报线程（submit 也会按需启动）；线程继承启动者的 CPU 亲和性"""
+        with self._cond:
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="COR-Announce", daemon=True)
+            self._thread.start()
+
+    def pending(self) -> int:
+        """排队中的文本数"""
+        with self._cond:
+            return len(self._pending)
+
+    def get_stats(self) -> dict[str, int]:
+        """计数快照（提交/播报/丢弃/过期/失败/排队），与播报线程的更新在同一把锁下读取"""
+        with self._cond:
+            out = dict(self.stats)
+            out["pending"] = len(self._pending)
+            return out
+
+    def _count(self, key: str) -> None:
+        with self._cond:
+            self.stats[key] += 1
+
+    def _run(self) -> None:
+        """播报线程主循环"""
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                ts, text, trace = self._pending.popleft()
+            t_start = time.perf_counter()
+            if self._max_age is not None and t_start - ts > self._max_age:
+                self._count("stale")
+                continue
+            if trace is not None:
+                trace.tracer.span(trace, "tts.queue", ts, t_start)
+                trace.tracer.latency(trace, "capture_to_speech", t_start)
+            try:
+                self._speak(text)
+            except Exception:
+                self._count("failed")
+                _log.exception("播报失败: %r", text)
+                continue
+            if trace is not None:
+                trace.tracer.span(trace, "tts.speak", t_start, time.perf_counter(), text=text)
+            self._count("spoken")
+
+
+_WORKER = SpeechWorker(_speak_blocking) if _speak_blocking is not None else None
+_speak_func = _WORKER.submit if _WORKER is not None else _noop
+
+
+def get_speech_stats() -> dict[str, int]:
+    """默认播报线程的计数（提交/播报/丢弃/过期/失败/排队）；TTS 不可用时为空"""
+    if _WORKER is None:
+        return {}
+    return _WORKER.get_stats()
 
 
 def set_speaker(func) -> None:
@@ -100,6 +212,56 @@ def compose_non_tl_phrase(counts: dict[int, int]) -> str | None:
     return "，".join(parts)
 
 
+CountsSig = tuple[tuple[int, int], ...]
+_PHRASE_CACHE_SIZE = 512
+
+
+def counts_signature(counts: dict[int, int]) -> CountsSig:
+    """将类别数量字典规范化为可哈希的签名（按类别排序，去掉非正数）"""
+    return tuple(sorted((int(k), int(v)) for k, v in counts.items() if v > 0))
+
+
+@lru_cache(maxsize=_PHRASE_CACHE_SIZE)
+def phrase_for_signature(sig: CountsSig) -> str | None:
+    """按数量签名生成播报短语（带缓存，相同签名只拼接一次）"""
+    return compose_non_tl_phrase(dict(sig))
+
+
+class CountSmoother:
+    """数量平滑（滞回）：同一签名连续出现 stable_frames 帧才替换当前稳定签名
+
+    单帧的漏检/误检不会改变稳定签名，因此不会引起播报内容来回跳变
+    """
+
+    def __init__(self, stable_frames: int = 3) -> None:
+        self._need = max(1, int(stable_frames))
+        self._candidate: CountsSig | None = None
+        self._streak = 0
+        self._stable: CountsSig = ()
+
+    @property
+    def stable(self) -> CountsSig:
+        """当前稳定签名"""
+        return self._stable
+
+    def update(self, sig: CountsSig) -> CountsSig:
+        """输入本帧签名，返回更新后的稳定签名"""
+        if sig == self._candidate:
+            self._streak += 1
+        else:
+            self._candidate = sig
+            self._streak = 1
+        if self._streak >= self._need:
+            self._stable = sig
+        return self._stable
+
+    def reset(self) -> None:
+        """清空状态"""
+        self._candidate = None
+        self._streak = 0
+        self._stable = ()
+
+
 def speak_non_tl(counts: dict[int, int], prefix: str | None = "检测到") -> None:
     """基于非交通类目标数量进行一次性播报"""
     phrase = compose_non_tl_phrase(counts)
@@ -110,28 +272,48 @@ def speak_non_tl(counts: dict[int, int], prefix: str | None = "检测到") -> No
 
 
 class Announcer:
-    """带去重与最小间隔的播报器"""
+    """带去重、最小间隔与数量平滑的播报器"""
 
     def __init__(
         self,
         min_interval_sec: float = 1.5,
+        stable_frames: int = 1,
+        speaker: Callable[[str], None] | None = None,
     ) -> None:
+        # speaker 为空时使用模块级播报函数（默认共享播报线程，可由 set_speaker 替换）
+        self._speaker = speaker
         self._last_text: str | None = None
         self._last_t: float = 0.0
         self._min_interval = float(min_interval_sec)
+        self._smoother = CountSmoother(stable_frames)
+        self._announced: CountsSig = ()
 
-    def say(self, text: str) -> None:
-        """执行播报，若与上次相同且间隔过短则忽略"""
+    def say(self, text: str) -> bool:
+        """执行播报，若与上次相同且间隔过短则忽略；返回是否已播报"""
         now = time.time()
         if now - self._last_t < self._min_interval:
-            return
+            return False
         self._last_text = text
         self._last_t = now
-        _speak_func(text)
+        (self._speaker or _speak_func)(text)
+        return True
 
     def say_non_tl(self, counts: dict[int, int]) -> None:
         """基于非交通类目标数量进行一次性播报"""
-        phrase = compose_non_tl_phrase(counts)
+        phrase = phrase_for_signature(counts_signature(counts))
         if not phrase:
             return
         self.say(f"检测到：{phrase}")
+
+    def observe_counts(self, sig: CountsSig) -> None:
+        """逐帧输入数量签名；仅在稳定签名与上次播报不同时播报（受最小间隔限制的稍后重试）"""
+        stable = self._smoother.update(sig)
+        if stable == self._announced:
+            return
+        if not stable:
+            # 画面已稳定为空：之后同样的物体再次出现时重新播报
+            self._announced = ()
+            return
+        phrase = phrase_for_signature(stable)
+        if not phrase or self.say(f"检测到：{phrase}"):
+            self._announced = stable
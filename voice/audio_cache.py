@@ -0,0 +1,149 @@
+"""预合成音频缓存
+
+- 以 (文本, 语音, 语速, 音量) 为键，将 TTS 引擎 save_to_file 渲染的音频保存到磁盘
+- 总大小超限时按最近使用时间（mtime）淘汰最旧的文件
+- 命中时直接播放音频文件：Windows 使用 winsound，其他平台尝试 afplay/paplay/aplay
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+AUDIO_SUFFIX = ".wav"
+_POLL_SEC = 0.02
+_PLAYERS = ("afplay", "paplay", "aplay")
+ZW_CHARS = {"\u200b", "\u200c", "\u200d", "\u200e", "\u200f"}
+
+try:
+    import winsound as _winsound
+except ImportError:  # 非 Windows
+    _winsound = None
+
+
+def normalize_text(text: str) -> str:
+    """去除零宽字符并修剪（播报队列会追加零宽字符区分重复文本）"""
+    return "".join(ch for ch in text if ch not in ZW_CHARS).strip()
+
+
+class AudioCache:
+    """磁盘音频缓存（大小受限，LRU 淘汰）"""
+
+    def __init__(self, cache_dir: str | Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(text: str, voice: str | None, rate: int | None, volume: float | None) -> str:
+        """生成缓存键"""
+        vol = "" if volume is None else f"{float(volume):.3f}"
+        raw = f"{normalize_text(text)}\x1f{voice or ''}\x1f{rate if rate is not None else ''}\x1f{vol}"
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        """缓存键对应的音频文件路径"""
+        return self.dir / f"{key}{AUDIO_SUFFIX}"
+
+    def lookup(self, key: str) -> Path | None:
+        """查询缓存；命中时刷新 mtime 作为最近使用时间"""
+        path = self.path_for(key)
+        try:
+            if path.stat().st_size <= 0:
+                self.misses += 1
+                return None
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def admit(self, key: str) -> None:
+        """新文件渲染完成后调用，必要时执行淘汰"""
+        if self.path_for(key).exists():
+            self.evict()
+
+    def evict(self) -> None:
+        """总大小超过上限时删除最久未使用的文件"""
+        with self._lock:
+            entries: list[tuple[float, int, Path]] = []
+            total = 0
+            for p in self.dir.glob(f"*{AUDIO_SUFFIX}"):
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+            if total <= self.max_bytes:
+                return
+            entries.sort()
+            for _, size, p in entries:
+                if total <= self.max_bytes:
+                    break
+                with contextlib.suppress(OSError):
+                    p.unlink()
+                    total -= size
+                    self.evictions += 1
+
+
+def _wav_duration(path: Path) -> float | None:
+    """读取 WAV 时长（秒），非 WAV 或解析失败返回 None"""
+    try:
+        with wave.open(str(path), "rb") as w:
+            rate = w.getframerate()
+            return w.getnframes() / float(rate) if rate else None
+    except (wave.Error, EOFError, OSError):
+        return None
+
+
+def play_audio_file(path: Path, stop_event: threading.Event | None = None) -> bool:
+    """播放音频文件直至结束或 stop_event 被设置；无可用播放方式时返回 False"""
+    if _winsound is not None:
+        duration = _wav_duration(path)
+        if duration is None:
+            _winsound.PlaySound(str(path), _winsound.SND_FILENAME | _winsound.SND_NODEFAULT)
+            return True
+        _winsound.PlaySound(str(path), _winsound.SND_FILENAME | _winsound.SND_ASYNC | _winsound.SND_NODEFAULT)
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            if stop_event is not None and stop_event.is_set():
+                _winsound.PlaySound(None, 0)
+                break
+            time.sleep(_POLL_SEC)
+        return True
+    player = next((p for p in _PLAYERS if shutil.which(p)), None) if sys.platform != "win32" else None
+    if player is None:
+        return False
+    try:
+        # 播放器来自固定白名单
+        proc = subprocess.Popen(
+            [player, str(path)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return False
+    while proc.poll() is None:
+        if stop_event is not None and stop_event.is_set():
+            proc.terminate()
+            return True
+        time.sleep(_POLL_SEC)
+    return proc.returncode == 0
+
+
+__all__ = ["AudioCache", "normalize_text", "play_audio_file"]
@@ -0,0 +1,173 @@
+"""可插拔的 TTS 后端
+
+- pyttsx3：本地离线 TTS（voice.tts 常驻引擎线程），直接朗读
+- null：不发声，只计数；适合无头服务器或关闭播报
+- wav：将每句渲染为 WAV 文件写入目录（仍使用 pyttsx3 渲染），便于由其他进程/设备播放
+
+每个后端都记录播报次数、失败次数、单句耗时（平均/最大）与吞吐（句/秒），见 get_stats()
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+from abc import ABC, abstractmethod
+import threading
+import time
+from pathlib import Path
+
+BACKEND_PYTTSX3 = "pyttsx3"
+BACKEND_NULL = "null"
+BACKEND_WAV = "wav"
+BACKENDS = (BACKEND_PYTTSX3, BACKEND_NULL, BACKEND_WAV)
+DEFAULT_WAV_DIR = "results/tts_wav"
+_WAV_NAME_MAX = 24
+
+_log = logging.getLogger("COR.TTSBackend")
+
+
+class SpeechBackend(ABC):
+    """后端基类：speak() 负责计时与计数，子类实现 _speak()（未实现时无法实例化）"""
+
+    name = "base"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._t_first: float | None = None
+        self._total_ms = 0.0
+        self.utterances = 0
+        self.failures = 0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+
+    def speak(self, text: str) -> None:
+        """播报一句（阻塞直至后端处理完毕）；异常计入失败后继续抛出"""
+        if not text:
+            return
+        t0 = time.perf_counter()
+        try:
+            self._speak(text)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+        ms = (time.perf_counter() - t0) * 1000.0
+        with self._lock:
+            if self._t_first is None:
+                self._t_first = t0
+            self.utterances += 1
+            self._total_ms += ms
+            self.last_ms = ms
+            self.max_ms = max(self.max_ms, ms)
+
+    @abstractmethod
+    def _speak(self, text: str) -> None:
+        """实际播报一句（阻塞）"""
+
+    def stop(self) -> None:
+        """打断当前句（不支持时忽略）"""
+        return None
+
+    def get_stats(self) -> dict[str, float]:
+        """返回计数与耗时统计"""
+        with self._lock:
+            n = self.utterances
+            span = time.perf_counter() - self._t_first if self._t_first is not None else 0.0
+            return {
+                "utterances": n,
+                "failures": self.failures,
+                "avg_ms": self._total_ms / n if n else 0.0,
+                "last_ms": self.last_ms,
+                "max_ms": self.max_ms,
+                "per_sec": n / span if span > 0 else 0.0,
+            }
+
+
+class NullBackend(SpeechBackend):
+    """不发声的后端"""
+
+    name = BACKEND_NULL
+
+    def _speak(self, text: str) -> None:
+        return None
+
+
+class Pyttsx3Backend(SpeechBackend):
+    """本地 pyttsx3 后端（经由 voice.tts 常驻引擎线程）"""
+
+    name = BACKEND_PYTTSX3
+
+    def __init__(self) -> None:
+        from . import tts
+
+        if not tts.AVAILABLE:
+            msg = "未安装 pyttsx3"
+            raise RuntimeError(msg)
+        super().__init__()
+        self._tts = tts
+
+    def _speak(self, text: str) -> None:
+        self._tts.speak(text)
+
+    def stop(self) -> None:
+        self._tts.stop()
+
+    def prepare(self, texts: list[str]) -> int:
+        """透传给 voice.tts.prepare（预渲染后续分句）"""
+        return self._tts.prepare(texts)
+
+
+class WavDirBackend(SpeechBackend):
+    """将每句渲染为目录中的 WAV 文件：{序号}_{文本前缀}.wav"""
+
+    name = BACKEND_WAV
+
+    def __init__(self, out_dir: str | Path = DEFAULT_WAV_DIR) -> None:
+        from . import tts
+
+        if not tts.AVAILABLE:
+            msg = "未安装 pyttsx3，无法渲染 WAV"
+            raise RuntimeError(msg)
+        super().__init__()
+        self._tts = tts
+        self.dir = Path(out_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._seq = itertools.count(1)
+
+    def _speak(self, text: str) -> None:
+        stem = "".join(ch for ch in text if ch.isalnum())[:_WAV_NAME_MAX] or "speech"
+        path = self.dir / f"{next(self._seq):06d}_{stem}.wav"
+        job = self._tts.render_to_file(text, path)
+        job.join()
+        if job.error is not None:
+            raise job.error
+
+
+def make_backend(name: str, *, wav_dir: str | Path | None = None) -> SpeechBackend:
+    """按名称创建后端；依赖缺失时记录警告并退回 null 后端"""
+    key = (name or BACKEND_PYTTSX3).strip().lower()
+    if key not in BACKENDS:
+        msg = f"未知的 TTS 后端: {name}（可选: {', '.join(BACKENDS)}）"
+        raise ValueError(msg)
+    if key == BACKEND_NULL:
+        return NullBackend()
+    try:
+        if key == BACKEND_WAV:
+            return WavDirBackend(wav_dir or DEFAULT_WAV_DIR)
+        return Pyttsx3Backend()
+    except (RuntimeError, OSError) as e:
+        _log.warning("TTS 后端 %s 不可用，改用 null: %s", key, e)
+        return NullBackend()
+
+
+__all__ = [
+    "BACKENDS",
+    "BACKEND_NULL",
+    "BACKEND_PYTTSX3",
+    "BACKEND_WAV",
+    "NullBackend",
+    "Pyttsx3Backend",
+    "SpeechBackend",
+    "WavDirBackend",
+    "make_backend",
+]
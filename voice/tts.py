@@ -1,10 +1,20 @@
 """本地离线 TTS 工具（Windows 首选 SAPI5），基于 pyttsx3
 
 特性：
-- 自动尝试中文语音（按名称/语言/ID 关键词匹配）
+- 常驻引擎线程：pyttsx3 引擎只初始化一次并在同一线程中复用，出错时才重建
+- 自动尝试中文语音（按名称/语言/ID 关键词匹配），选中的语音 ID 缓存复用
 - 文本去零宽字符与短时间重复语句“音速轻微抖动”防重复感
-- 同步 speak（阻塞）与 speak_async（后台线程）两种调用方式
-- 可通过环境变量 COR_TTS_ISOLATED 控制是否“隔离实例”（每次 speak 使用新 engine）
+- 同步 speak（阻塞）与 speak_async（提交到引擎线程）两种调用方式
+- 记录每句的首音延迟（time-to-first-audio），见 get_stats()
+- stop() 可打断正在播报的句子（供播报队列实现抢占）
+- 可选预合成音频缓存：固定短语（如“这是X”、物体介绍）渲染为音频文件后直接播放，
+  见 enable_audio_cache / register_phrases / warm_up；也可设置 COR_TTS_CACHE_DIR 自动启用
+- prepare() 供播报队列在空闲时渲染长文本的分句（供下次播报命中缓存，不登记为固定短语）
+- 渲染只在实时播报空闲 _RENDER_IDLE_SEC 后进行；新的播报请求到来时立即唤醒引擎线程，
+  正在进行的渲染被抢占（丢弃半成品，稍后重新渲染）
+- 可通过环境变量 COR_TTS_ISOLATED=1 恢复“隔离实例”（每句播报后重建 engine）
+- pyttsx3 为可选依赖：未安装时模块仍可导入（AVAILABLE 为 False），播报时才报错；
+  无头环境可改用 voice.backends 中的 null/wav 后端
 """
 
 from __future__ import annotations
@@ -14,17 +24,30 @@ import logging
 import os
 import threading
 import time as _time
+from collections import deque
 from collections.abc import Iterable
+from pathlib import Path
 from typing import Any, cast
 
-import pyttsx3
+try:
+    import pyttsx3
+except ImportError:  # 可选依赖：无头服务器可不安装
+    pyttsx3 = None
+
+from .audio_cache import DEFAULT_MAX_BYTES, AudioCache, normalize_text, play_audio_file
 
 _log = logging.getLogger("COR.TTS")
 _lock = threading.RLock()
 _DUP_WINDOW = 2.5
 ZW_CHARS = {"\u200b", "\u200c", "\u200d", "\u200e", "\u200f"}
 _iso_env = os.getenv("COR_TTS_ISOLATED")
-_ISOLATED = True if _iso_env is None else _iso_env.strip().lower() in {"1", "true", "on", "yes"}
+_ISOLATED = False if _iso_env is None else _iso_env.strip().lower() in {"1", "true", "on", "yes"}
+_DEFAULT_RATE = 175
+_MIN_RATE = 50
+_TTFA_EMA_ALPHA = 0.2
+# 实时播报结束后至少空闲这么久才开始后台渲染（分句播报的下一句通常紧随其后提交）
+_RENDER_IDLE_SEC = 0.3
+AVAILABLE = pyttsx3 is not None
 
 
 class _DedupState:
@@ -39,7 +62,6 @@ class _DedupState:
 
 _DEDUP = _DedupState()
 _TL = threading.local()
-_ASYNC_TH: threading.Thread | None = None
 
 
 def _normalize_text_for_dedup(text: str) -> str:
@@ -54,8 +76,30 @@ def _normalize_text_for_dedup(text: str) -> str:
     return "".join(out).strip()
 
 
-def _apply_rate_jitter(engine: pyttsx3.Engine, text: str, explicit_rate: int | None) -> None:
-    """基于文本重复情况调整语速以防止听感重复"""
+def _read_rate(engine: pyttsx3.Engine) -> int:
+    """读取引擎当前语速，失败时返回默认值"""
+    try:
+        base_rate_obj = engine.getProperty("rate")
+        if isinstance(base_rate_obj, int):
+            return base_rate_obj
+        try:
+            return int(cast("Any", base_rate_obj))
+        except (TypeError, ValueError):
+            return _DEFAULT_RATE
+    except AttributeError:
+        return _DEFAULT_RATE
+
+
+def _apply_rate_jitter(
+    engine: pyttsx3.Engine,
+    text: str,
+    explicit_rate: int | None,
+    base_rate: int | None = None,
+) -> None:
+    """基于文本重复情况调整语速以防止听感重复
+
+    base_rate 为引擎初始语速；常驻引擎会保留上一句的语速设置，因此每句先恢复到该值
+    """
     if explicit_rate is not None:
         engine.setProperty("rate", int(explicit_rate))
         return
@@ -63,30 +107,31 @@ def _apply_rate_jitter(engine: pyttsx3.Engine, text: str, explicit_rate: int | N
     norm = _normalize_text_for_dedup(text)
     last = _DEDUP.last_time
     last_norm = _DEDUP.last_text_norm
-    try:
-        base_rate_obj = engine.getProperty("rate")
-        if isinstance(base_rate_obj, int):
-            base_rate = base_rate_obj
-        else:
-            try:
-                base_rate = int(cast("Any", base_rate_obj))
-            except (TypeError, ValueError):
-                base_rate = 175
-    except AttributeError:
-        base_rate = 175
+    if base_rate is None:
+        base_rate = _read_rate(engine)
+    else:
+        engine.setProperty("rate", base_rate)
     if last_norm == norm and (now - last) < _DUP_WINDOW:
         delta = 1 if _DEDUP.rate_toggle == 0 else -1
-        engine.setProperty("rate", max(50, base_rate + delta))
+        engine.setProperty("rate", max(_MIN_RATE, base_rate + delta))
         _DEDUP.rate_toggle ^= 1
     _DEDUP.last_text_norm = norm
     _DEDUP.last_time = now
 
 
+def _init_engine() -> pyttsx3.Engine:
+    """创建 pyttsx3 引擎；未安装 pyttsx3 时抛出 RuntimeError"""
+    if pyttsx3 is None:
+        msg = "未安装 pyttsx3，无法使用本地 TTS（可选择 null/wav 后端）"
+        raise RuntimeError(msg)
+    return pyttsx3.init()
+
+
 def _get_engine() -> pyttsx3.Engine:
     """获取当前线程的 TTS 引擎实例（若隔离则每次新建）"""
     eng = getattr(_TL, "engine", None)
     if eng is None:
-        eng = pyttsx3.init()
+        eng = _init_engine()
         _TL.engine = eng
     _log.debug("已在线程 %s 创建线程本地 TTS 引擎", threading.current_thread().name)
     return eng
@@ -105,9 +150,9 @@ def _reset_engine_for_current_thread() -> None:
         logging.exception("重置当前线程的 TTS 引擎失败")
 
 
-def list_voices() -> list[dict[str, Any]]:
+def list_voices(engine: pyttsx3.Engine | None = None) -> list[dict[str, Any]]:
     """列出系统可用的语音包信息（id/name/languages/gender/age）"""
-    eng = _get_engine()
+    eng = engine if engine is not None else _get_engine()
     items: list[dict[str, Any]] = []
     voices_obj: object = eng.getProperty("voices")
     iter_voices: Iterable[Any] = cast("Iterable[Any]", voices_obj) if isinstance(voices_obj, Iterable) else ()
@@ -139,9 +184,9 @@ def list_voices() -> list[dict[str, Any]]:
     return items
 
 
-def _pick_zh_voice_id() -> str | None:
+def _pick_zh_voice_id(engine: pyttsx3.Engine | None = None) -> str | None:
     """尽力选择中文语音的 ID（按常见关键字匹配）"""
-    candidates = list_voices()
+    candidates = list_voices(engine)
     keywords = ("zh", "chinese", "chs", "cn")
     for key in keywords:
         key_lower = key.lower()
@@ -159,34 +204,398 @@ def _pick_zh_voice_id() -> str | None:
     return None
 
 
-def _speak_once(
-    text: str,
-    *,
-    rate: int | None,
-    volume: float | None,
-    voice: str | None,
-) -> None:
-    """在当前线程中执行一次性 TTS 输出"""
-    if not text:
-        return
-    with _lock:
-        eng = pyttsx3.init()
+class SpeechJob:
+    """一次播报请求；join() 等待播报完成，ttfa 为首音延迟（秒，未知为 None）"""
+
+    __slots__ = (
+        "cached",
+        "done",
+        "error",
+        "out_path",
+        "rate",
+        "render",
+        "t_started",
+        "t_submit",
+        "text",
+        "ttfa",
+        "voice",
+        "volume",
+    )
+
+    def __init__(
+        self,
+        text: str,
+        *,
+        rate: int | None,
+        volume: float | None,
+        voice: str | None,
+        render: bool = False,
+        out_path: Path | None = None,
+    ) -> None:
+        self.text = text
+        self.rate = rate
+        self.volume = volume
+        self.voice = voice
+        # True 表示这是一次后台渲染任务（写入音频缓存而非朗读）
+        self.render = render
+        # 渲染到指定文件（而非音频缓存），供 wav 后端使用
+        self.out_path = out_path
+        self.cached = False
+        self.done = threading.Event()
+        self.error: BaseException | None = None
+        self.t_submit = _time.perf_counter()
+        self.t_started: float | None = None
+        self.ttfa: float | None = None
+
+    def join(self, timeout: float | None = None) -> bool:
+        """等待播报结束；超时返回 False"""
+        return self.done.wait(timeout)
+
+
+class _EngineWorker:
+    """常驻 TTS 引擎线程：引擎只在本线程中创建与使用（SAPI/COM 对线程敏感）"""
+
+    def __init__(self) -> None:
+        # 实时播报与后台渲染分队列：播报总是先出队，渲染仅在空闲时出队
+        self._cv = threading.Condition()
+        self._speech: deque[SpeechJob] = deque()
+        self._renders: deque[SpeechJob] = deque()
+        self._thread: threading.Thread | None = None
+        self._engine: pyttsx3.Engine | None = None
+        self._current: SpeechJob | None = None
+        # 当前渲染被实时播报抢占（半成品丢弃，任务放回渲染队列）
+        self._preempted = False
+        # 打断当前句的信号（缓存音频播放轮询该事件；合成语音通过 engine.stop() 打断）
+        self._interrupt = threading.Event()
+        self._base_rate: int | None = None
+        self._base_volume: float | None = None
+        # 中文语音 ID 只解析一次；None 表示尚未解析，"" 表示无匹配
+        self._zh_voice_id: str | None = None
+        self._last_speech_end = 0.0
+        self.stats: dict[str, float] = {
+            "utterances": 0,
+            "failures": 0,
+            "engine_inits": 0,
+            "last_ttfa_ms": 0.0,
+            "avg_ttfa_ms": 0.0,
+            "cache_plays": 0,
+            "renders": 0,
+            "preempted_renders": 0,
+        }
+
+    def submit(self, job: SpeechJob) -> SpeechJob:
+        """提交播报请求（按需启动引擎线程）"""
+        with _lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="COR-TTS", daemon=True)
+                self._thread.start()
+        with self._cv:
+            if job.render:
+                self._renders.append(job)
+            else:
+                self._speech.append(job)
+                self._preempt_render_locked()
+            self._cv.notify()
+        return job
+
+    def pending(self) -> int:
+        """排队中的请求数"""
+        with self._cv:
+            return len(self._speech) + len(self._renders)
+
+    def _preempt_render_locked(self) -> None:
+        """实时播报到来时中止正在进行的渲染（调用方持锁）"""
+        job = self._current
+        if job is None or not job.render or self._preempted:
+            return
+        self._preempted = True
+        eng = self._engine
+        if eng is not None:
+            with contextlib.suppress(Exception):
+                eng.stop()
+
+    def _next_job(self) -> SpeechJob:
+        """取下一项：播报优先；渲染需等到距上次播报结束满 _RENDER_IDLE_SEC，期间有播报提交时立即返回播报"""
+        with self._cv:
+            while True:
+                if self._speech:
+                    job = self._speech.popleft()
+                elif self._renders:
+                    idle = _time.perf_counter() - self._last_speech_end
+                    if idle < _RENDER_IDLE_SEC:
+                        self._cv.wait(_RENDER_IDLE_SEC - idle)
+                        continue
+                    job = self._renders.popleft()
+                else:
+                    self._cv.wait()
+                    continue
+                # 在锁内设置当前项，submit() 才能可靠地抢占刚开始的渲染
+                self._current = job
+                self._preempted = False
+                self._interrupt.clear()
+                return job
+
+    def _on_started(self, name: str | None = None) -> None:
+        """pyttsx3 started-utterance 回调：记录首音延迟"""
+        job = self._current
+        if job is None or job.t_started is not None:
+            return
+        job.t_started = _time.perf_counter()
+        job.ttfa = job.t_started - job.t_submit
+
+    def _ensure_engine(self) -> pyttsx3.Engine:
+        """获取常驻引擎，不存在时创建并解析中文语音"""
+        eng = self._engine
+        if eng is not None:
+            return eng
+        eng = _init_engine()
         with contextlib.suppress(Exception):
-            eng.stop()
-        if voice is None:
-            zh_id = _pick_zh_voice_id()
-            if zh_id:
-                eng.setProperty("voice", zh_id)
-        else:
+            eng.connect("started-utterance", self._on_started)
+        self._base_rate = _read_rate(eng)
+        try:
+            self._base_volume = float(cast("Any", eng.getProperty("volume")))
+        except (AttributeError, TypeError, ValueError):
+            self._base_volume = None
+        if self._zh_voice_id is None:
+            self._zh_voice_id = _pick_zh_voice_id(eng) or ""
+        self._engine = eng
+        self.stats["engine_inits"] += 1
+        _log.debug("已在线程 %s 创建常驻 TTS 引擎", threading.current_thread().name)
+        return eng
+
+    def interrupt(self) -> None:
+        """打断当前正在播报的句子（渲染任务不受影响）"""
+        job = self._current
+        if job is None or job.render:
+            return
+        self._interrupt.set()
+        eng = self._engine
+        if eng is not None:
+            with contextlib.suppress(Exception):
+                eng.stop()
+
+    def _reset_engine(self) -> None:
+        """丢弃当前引擎（下次播报时重建）"""
+        eng, self._engine = self._engine, None
+        if eng is not None:
+            with contextlib.suppress(Exception):
+                eng.stop()
+
+    def _cache_key(self, job: SpeechJob, voice: str | None) -> str | None:
+        """计算该请求的音频缓存键；未启用缓存时返回 None"""
+        if _CACHE is None:
+            return None
+        rate = job.rate if job.rate is not None else self._base_rate
+        volume = job.volume if job.volume is not None else self._base_volume
+        return AudioCache.make_key(job.text, voice, rate, volume)
+
+    def _render(self, eng: pyttsx3.Engine, job: SpeechJob, key: str) -> None:
+        """将文本渲染为音频文件写入缓存"""
+        if _CACHE is None:
+            return
+        path = _CACHE.path_for(key)
+        if path.exists():
+            return
+        if self._render_file(eng, job.text, path):
+            _CACHE.admit(key)
+
+    def _render_file(self, eng: pyttsx3.Engine, text: str, path: Path) -> bool:
+        """渲染到 path（先写临时文件再改名）；成功返回 True"""
+        tmp = path.with_suffix(".part.wav")
+        eng.save_to_file(normalize_text(text), str(tmp))
+        eng.runAndWait()
+        if self._preempted:
+            # 被抢占的渲染只写了一部分，不能进入缓存
+            with contextlib.suppress(OSError):
+                tmp.unlink()
+            return False
+        if tmp.exists() and tmp.stat().st_size > 0:
+            tmp.replace(path)
+            self.stats["renders"] += 1
+            return True
+        with contextlib.suppress(OSError):
+            tmp.unlink()
+        return False
+
+    def _speak(self, job: SpeechJob) -> None:
+        """在引擎线程中朗读一句（缓存命中时直接播放音频文件）"""
+        eng = self._ensure_engine()
+        voice = job.voice if job.voice is not None else (self._zh_voice_id or None)
+        key = self._cache_key(job, voice)
+        if not job.render and key is not None and _CACHE is not None:
+            path = _CACHE.lookup(key)
+            if path is not None:
+                job.t_started = _time.perf_counter()
+                job.ttfa = job.t_started - job.t_submit
+                if play_audio_file(path, self._interrupt):
+                    job.cached = True
+                    self.stats["cache_plays"] += 1
+                    return
+                job.t_started = job.ttfa = None
+        if voice:
             eng.setProperty("voice", voice)
-        _apply_rate_jitter(eng, text, rate)
+        if job.render:
+            # 渲染使用基础语速，不做防重复抖动
+            _apply_rate_jitter(eng, job.text, job.rate if job.rate is not None else self._base_rate)
+        else:
+            _apply_rate_jitter(eng, job.text, job.rate, self._base_rate)
+        volume = job.volume if job.volume is not None else self._base_volume
         if volume is not None:
-            v = max(0.0, min(1.0, float(volume)))
-            eng.setProperty("volume", v)
-        eng.say(text)
+            eng.setProperty("volume", max(0.0, min(1.0, float(volume))))
+        if job.render:
+            if job.out_path is not None:
+                self._render_file(eng, job.text, job.out_path)
+            elif key is not None:
+                self._render(eng, job, key)
+            return
+        eng.say(job.text)
         eng.runAndWait()
-        with contextlib.suppress(Exception):
-            eng.stop()
+        # 固定短语首次现场合成后，排队在空闲时渲染到缓存
+        if key is not None and _CACHE is not None and normalize_text(job.text) in _PHRASES:
+            self.submit(SpeechJob(job.text, rate=job.rate, volume=job.volume, voice=job.voice, render=True))
+
+    def _record_ttfa(self, job: SpeechJob) -> None:
+        """汇总首音延迟统计"""
+        if job.render:
+            return
+        self.stats["utterances"] += 1
+        if job.ttfa is None:
+            return
+        ms = job.ttfa * 1000.0
+        avg = self.stats["avg_ttfa_ms"]
+        self.stats["last_ttfa_ms"] = ms
+        self.stats["avg_ttfa_ms"] = ms if avg <= 0 else (1 - _TTFA_EMA_ALPHA) * avg + _TTFA_EMA_ALPHA * ms
+        _log.debug("首音延迟 %.0f ms: %r", ms, job.text)
+
+    def _run(self) -> None:
+        """引擎线程主循环：失败时重建引擎并重试一次"""
+        while True:
+            job = self._next_job()
+            try:
+                try:
+                    self._speak(job)
+                except Exception:
+                    if self._preempted:
+                        raise
+                    _log.exception("TTS 播报失败，重建引擎后重试")
+                    self.stats["failures"] += 1
+                    self._reset_engine()
+                    self._speak(job)
+                self._record_ttfa(job)
+            except Exception as e:
+                self._reset_engine()
+                if not self._preempted:
+                    job.error = e
+                    logging.exception("TTS 播报失败")
+            finally:
+                if _ISOLATED:
+                    self._reset_engine()
+                requeue = job.render and self._preempted
+                with self._cv:
+                    self._current = None
+                    if requeue:
+                        self._renders.appendleft(job)
+                    if not job.render:
+                        self._last_speech_end = _time.perf_counter()
+                if requeue:
+                    self.stats["preempted_renders"] += 1
+                else:
+                    job.done.set()
+
+
+_WORKER = _EngineWorker()
+_CACHE: AudioCache | None = None
+_PHRASES: set[str] = set()
+
+
+def enable_audio_cache(cache_dir: str | Path, *, max_bytes: int = DEFAULT_MAX_BYTES) -> AudioCache:
+    """启用磁盘音频缓存（大小上限 max_bytes，超限按最近使用淘汰）"""
+    global _CACHE
+    _CACHE = AudioCache(cache_dir, max_bytes=max_bytes)
+    _CACHE.evict()
+    return _CACHE
+
+
+def register_phrases(texts: Iterable[str]) -> None:
+    """登记固定短语：首次现场合成后会在空闲时渲染到缓存"""
+    _PHRASES.update(normalize_text(t) for t in texts if t)
+
+
+def default_phrases() -> list[str]:
+    """儿童识物的固定播报词表：“这是{标签}” + 物体介绍
+
+    长介绍由 TTSManager 按句分片播报，词表中放的是同样的分片，缓存键才能与实际播报的文本一致
+    """
+    try:
+        from detection.coco_intros_cn import coco_intros_cn
+        from detection.coco_labels_cn import coco_labels_cn
+    except (ImportError, OSError):
+        return []
+    from .tts_queue import speech_chunks
+
+    out = [f"这是{name}" for name in coco_labels_cn.values()]
+    for intro in coco_intros_cn.values():
+        out.extend(speech_chunks(intro))
+    return out
+
+
+def _submit_renders(texts: Iterable[str]) -> int:
+    """提交后台渲染任务（空闲时执行，可被实时播报抢占）；返回提交数"""
+    n = 0
+    for text in texts:
+        if not text:
+            continue
+        # 缓存键（语音/语速/音量）在引擎线程中按实际引擎参数确定
+        _WORKER.submit(SpeechJob(text, rate=None, volume=None, voice=None, render=True))
+        n += 1
+    return n
+
+
+def warm_up(texts: Iterable[str] | None = None) -> int:
+    """登记并在后台预渲染短语（不阻塞调用方，不影响实时播报）；返回提交的渲染数"""
+    if _CACHE is None:
+        return 0
+    items = list(default_phrases() if texts is None else texts)
+    register_phrases(items)
+    return _submit_renders(items)
+
+
+def render_to_file(text: str, path: str | Path, *, voice: str | None = None) -> SpeechJob:
+    """异步将文本渲染为音频文件（不朗读）；返回请求对象，join() 等待写入完成"""
+    job = SpeechJob(text, rate=None, volume=None, voice=voice, render=True, out_path=Path(path))
+    if not text:
+        job.done.set()
+        return job
+    return _WORKER.submit(job)
+
+
+def prepare(texts: Iterable[str]) -> int:
+    """在空闲时渲染即将播报的分句，供之后再次播报时命中缓存；不登记为固定短语（避免短语表无限增长）；
+    未启用缓存时返回 0"""
+    if _CACHE is None:
+        return 0
+    return _submit_renders(texts)
+
+
+_cache_env = os.getenv("COR_TTS_CACHE_DIR")
+if _cache_env:
+    enable_audio_cache(_cache_env)
+
+
+def get_stats() -> dict[str, float]:
+    """返回常驻引擎的统计信息（播报数/失败数/引擎创建次数/首音延迟 ms）"""
+    out = dict(_WORKER.stats)
+    out["pending"] = _WORKER.pending()
+    if _CACHE is not None:
+        out["cache_hits"] = _CACHE.hits
+        out["cache_misses"] = _CACHE.misses
+        out["cache_evictions"] = _CACHE.evictions
+    return out
+
+
+def stop() -> None:
+    """打断当前正在播报的句子"""
+    _WORKER.interrupt()
 
 
 def speak(
@@ -197,8 +606,8 @@ def speak(
     voice: str | None = None,
 ) -> None:
     """同步朗读：阻塞等待直至播放完成"""
-    t = speak_async(text, rate=rate, volume=volume, voice=voice)
-    t.join()
+    job = speak_async(text, rate=rate, volume=volume, voice=voice)
+    job.join()
 
 
 def speak_async(
@@ -207,14 +616,10 @@ def speak_async(
     rate: int | None = None,
     volume: float | None = None,
     voice: str | None = None,
-) -> threading.Thread:
-    """异步朗读：创建后台线程执行播放并立即返回线程对象"""
-    def _runner() -> None:
-        try:
-            _speak_once(text, rate=rate, volume=volume, voice=voice)
-        except Exception:
-            logging.exception("异步播报失败")
-
-    t = threading.Thread(target=_runner, daemon=True)
-    t.start()
-    return t
+) -> SpeechJob:
+    """异步朗读：提交到常驻引擎线程并立即返回请求对象"""
+    job = SpeechJob(text, rate=rate, volume=volume, voice=voice)
+    if not text:
+        job.done.set()
+        return job
+    return _WORKER.submit(job)
@@ -1,13 +1,65 @@
-"""TTS 队列管理器 串行消费文本并调用 TTS 引擎播报"""
+"""TTS 队列管理器 串行消费文本并调用 TTS 引擎播报
+
+- 优先级：PRIORITY_URGENT（如“这是X”）> PRIORITY_INTRO（物体介绍）> PRIORITY_CHATTER（其他提示）
+- 合并：同一 key 的待播报项只保留最新一条
+- 标签：每项可携带若干 tag，按 tag 取消/抑制为常数时间（与队列长度无关）
+- 抢占：更高优先级（或同 key 的新内容）到来时打断正在播报的句子（需 TTS 模块提供 stop()）
+- 分句：较长文本（如物体介绍）按句切分为一组分片依次播报，分片之间可立即取消整组；
+  TTS 模块提供 prepare() 时，后续分片交给它在空闲时渲染，供之后再次播报时命中缓存
+  （本地引擎同一时刻只能朗读或渲染一项，不会在朗读当前分片时预渲染下一分片，首次播报不会因此提速）
+"""
 
 from __future__ import annotations
 
 import contextlib
+import heapq
+import itertools
 import logging
-import queue
+import re
 import threading
 import time
-from typing import Protocol, cast
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Protocol
+
+from detection.tracing import TraceCtx, current_trace
+
+PRIORITY_URGENT = 0
+PRIORITY_INTRO = 1
+PRIORITY_CHATTER = 2
+_COMPACT_FACTOR = 4  # 堆中失效项过多时重建
+DEFAULT_CHUNK_CHARS = 24
+GROUP_TAG_PREFIX = "#group:"
+_SENTENCE_RE = re.compile(r"[^。！？；!?;\n]+[。！？；!?;\n]*")
+_CLAUSE_RE = re.compile(r"[^，,：:]+[，,：:]*")
+
+
+def split_sentences(text: str, max_chars: int = DEFAULT_CHUNK_CHARS) -> list[str]:
+    """按句切分文本；超过 max_chars 的句子再按逗号/冒号等拼成不超过 max_chars 的分片"""
+    out: list[str] = []
+    for sent in _SENTENCE_RE.findall(text):
+        sent = sent.strip()
+        if not sent:
+            continue
+        if len(sent) <= max_chars:
+            out.append(sent)
+            continue
+        buf = ""
+        for clause in _CLAUSE_RE.findall(sent):
+            if buf and len(buf) + len(clause) > max_chars:
+                out.append(buf.strip())
+                buf = ""
+            buf += clause
+        if buf.strip():
+            out.append(buf.strip())
+    return out or ([text] if text.strip() else [])
+
+
+def speech_chunks(text: str, max_chars: int | None = DEFAULT_CHUNK_CHARS) -> list[str]:
+    """TTSManager 实际播报的分片：不超过 max_chars（或 max_chars 为 None）时整句播报，否则按句切分"""
+    if max_chars is None or len(text) <= max_chars:
+        return [text]
+    return split_sentences(text, max_chars)
 
 
 class TTSLike(Protocol):
@@ -16,8 +68,211 @@ class TTSLike(Protocol):
         ...
 
 
+@dataclass(order=True)
+class PendingItem:
+    priority: int
+    seq: int
+    text: str = field(compare=False)
+    ts: float = field(compare=False)
+    key: str | None = field(compare=False, default=None)
+    tags: frozenset[str] = field(compare=False, default=frozenset())
+    group: int | None = field(compare=False, default=None)
+    part: int = field(compare=False, default=0)
+    # 触发该播报的帧追踪（入队时的当前追踪），用于统计采集到出声的延迟
+    trace: TraceCtx | None = field(compare=False, default=None)
+    t_enqueue: float = field(compare=False, default=0.0)
+
+
+class PendingStore:
+    """加锁的待播报存储
+
+    - 按 seq 索引条目，按 tag / key 建立反向索引（分句播报的一组分片共享同一 key）
+    - 取消：从索引删除即可（堆中残留项出堆时跳过），单项 O(1)
+    - 抑制：{tag: 到期时间}，检查只遍历条目自身的 tag
+    - snapshot() 在锁内返回一致的待播报视图
+    """
+
+    def __init__(self, max_items: int = 32) -> None:
+        self._cond = threading.Condition()
+        self._max = max(1, int(max_items))
+        self._items: dict[int, PendingItem] = {}
+        self._heap: list[PendingItem] = []
+        self._by_tag: dict[str, set[int]] = {}
+        self._by_key: dict[str, set[int]] = {}
+        self._suppress: dict[str, float] = {}
+        self._closed = False
+        self.dropped = 0
+        self.cancelled = 0
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    # ---- 写入 ----
+    def push(self, item: PendingItem) -> tuple[bool, list[PendingItem]]:
+        """加入一项；返回 (是否加入, 被同 key 替换的旧项)"""
+        added, replaced = self.push_group([item])
+        return added > 0, replaced
+
+    def push_group(self, items: list[PendingItem]) -> tuple[int, list[PendingItem]]:
+        """原子加入一组项（同一 key 只替换一次旧项）；返回 (加入数, 被替换的旧项)"""
+        if not items:
+            return 0, []
+        with self._cond:
+            head = items[0]
+            if self._suppressed_locked(head.tags, head.ts):
+                return 0, []
+            replaced: list[PendingItem] = []
+            if head.key is not None:
+                for seq in list(self._by_key.get(head.key, ())):
+                    old = self._remove_locked(seq)
+                    if old is not None:
+                        replaced.append(old)
+            added = 0
+            for item in items:
+                if len(self._items) >= self._max and not self._drop_lowest_locked(item):
+                    self.dropped += 1
+                    continue
+                self._add_locked(item)
+                added += 1
+            if added:
+                self._cond.notify()
+            return added, replaced
+
+    def _add_locked(self, item: PendingItem) -> None:
+        """写入索引与堆（调用方持锁）"""
+        if len(self._heap) > _COMPACT_FACTOR * self._max:
+            self._heap = [it for it in self._heap if self._items.get(it.seq) is it]
+            heapq.heapify(self._heap)
+        self._items[item.seq] = item
+        heapq.heappush(self._heap, item)
+        for tag in item.tags:
+            self._by_tag.setdefault(tag, set()).add(item.seq)
+        if item.key is not None:
+            self._by_key.setdefault(item.key, set()).add(item.seq)
+
+    def _remove_locked(self, seq: int) -> PendingItem | None:
+        """从索引中移除一项（调用方持锁）"""
+        item = self._items.pop(seq, None)
+        if item is None:
+            return None
+        for tag in item.tags:
+            ids = self._by_tag.get(tag)
+            if ids is not None:
+                ids.discard(seq)
+                if not ids:
+                    del self._by_tag[tag]
+        if item.key is not None:
+            ids = self._by_key.get(item.key)
+            if ids is not None:
+                ids.discard(seq)
+                if not ids:
+                    del self._by_key[item.key]
+        return item
+
+    def _drop_lowest_locked(self, new: PendingItem) -> bool:
+        """已满时丢弃优先级最低且最旧的一项；新项优先级不高于它们时返回 False"""
+        worst = max(self._items.values(), key=lambda it: (it.priority, -it.seq), default=None)
+        if worst is None:
+            return True
+        if new.priority > worst.priority:
+            return False
+        self._remove_locked(worst.seq)
+        self.dropped += 1
+        return True
+
+    # ---- 取消与抑制 ----
+    def cancel_tag(self, tag: str) -> list[PendingItem]:
+        """取消携带该 tag 的全部待播报项"""
+        with self._cond:
+            ids = self._by_tag.pop(tag, None)
+            if not ids:
+                return []
+            out = [it for seq in list(ids) if (it := self._remove_locked(seq)) is not None]
+            self.cancelled += len(out)
+            return out
+
+    def cancel_key(self, key: str) -> list[PendingItem]:
+        """取消指定 key 的待播报项（分句播报时为整组分片）"""
+        with self._cond:
+            ids = self._by_key.pop(key, None)
+            if not ids:
+                return []
+            out = [it for seq in list(ids) if (it := self._remove_locked(seq)) is not None]
+            self.cancelled += len(out)
+            return out
+
+    def cancel_where(self, pred: Callable[[PendingItem], bool]) -> list[PendingItem]:
+        """按谓词取消（线性扫描，供兼容旧的子串接口使用）"""
+        with self._cond:
+            hits = [it.seq for it in self._items.values() if pred(it)]
+            out = [it for seq in hits if (it := self._remove_locked(seq)) is not None]
+            self.cancelled += len(out)
+            return out
+
+    def suppress_tag(self, tag: str, duration_sec: float, *, cancel_pending: bool = True) -> None:
+        """在时间窗口内拒绝携带该 tag 的新项，并（默认）取消已排队的同 tag 项"""
+        with self._cond:
+            self._suppress[tag] = time.time() + max(0.0, float(duration_sec))
+        if cancel_pending:
+            self.cancel_tag(tag)
+
+    def is_suppressed(self, tags: Iterable[str], now: float | None = None) -> bool:
+        """检查 tag 集合是否处于抑制窗口内"""
+        with self._cond:
+            return self._suppressed_locked(tags, time.time() if now is None else now)
+
+    def _suppressed_locked(self, tags: Iterable[str], now: float) -> bool:
+        """抑制检查（调用方持锁）；顺带清理已过期的规则"""
+        if not self._suppress:
+            return False
+        for tag in tags:
+            exp = self._suppress.get(tag)
+            if exp is None:
+                continue
+            if now <= exp:
+                return True
+            del self._suppress[tag]
+        return False
+
+    # ---- 读取 ----
+    def pop(self) -> PendingItem | None:
+        """阻塞取出最高优先级的一项；close() 后返回 None"""
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                while self._heap:
+                    item = heapq.heappop(self._heap)
+                    if self._items.get(item.seq) is item:
+                        self._remove_locked(item.seq)
+                        return item
+                self._cond.wait()
+
+    def snapshot(self) -> list[PendingItem]:
+        """按出队顺序返回当前待播报项的一致视图"""
+        with self._cond:
+            return sorted(self._items.values())
+
+    def has_tag(self, tag: str) -> bool:
+        """是否存在携带该 tag 的待播报项"""
+        with self._cond:
+            return bool(self._by_tag.get(tag))
+
+    def close(self) -> None:
+        """唤醒并终止等待中的 pop()"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reopen(self) -> None:
+        """重新允许 pop()"""
+        with self._cond:
+            self._closed = False
+
+
 class TTSManager:
-    """管理 TTS 队列与后台线程 支持去重窗口与过期丢弃"""
+    """管理 TTS 队列与后台线程 支持优先级/合并/标签取消/抢占、去重窗口与过期丢弃"""
     def __init__(
         self,
         *,
@@ -26,13 +281,17 @@ class TTSManager:
         dup_window: float = 1.2,
         max_queue: int = 32,
         max_age_sec: float | None = 2.0,
+        chunk_chars: int | None = DEFAULT_CHUNK_CHARS,
     ) -> None:
         self._tts: TTSLike | None = tts_module
         self._log = logger or logging.getLogger("TTSManager")
         self._dup_window = float(dup_window)
         self._max_age = None if max_age_sec is None else float(max_age_sec)
+        # 超过该长度的文本按句分片播报；None 表示不分片
+        self._chunk_chars = None if chunk_chars is None else max(1, int(chunk_chars))
 
-        self._queue: queue.Queue[tuple[str, float] | None] = queue.Queue(maxsize=max_queue)
+        self._store = PendingStore(max_queue)
+        self._seq = itertools.count()
         self._thread: threading.Thread | None = None
         self._last_text: str | None = None
         self._last_time: float = 0.0
@@ -41,28 +300,42 @@ class TTSManager:
         # 当前播报状态（用于外部判断是否应抑制某些提示语）
         self._is_speaking: bool = False
         self._current_text: str | None = None
-        # 基于子串的临时抑制规则：{substr: expire_ts}
-        self._suppress_until = cast("dict[str, float]", {})
+        self._current: PendingItem | None = None
 
     def start(self) -> None:
         """启动后台播报线程"""
         if self._thread and self._thread.is_alive():
             return
+        self._store.reopen()
         self._thread = threading.Thread(target=self._worker, daemon=True)
         self._thread.start()
 
     def stop(self) -> None:
         """停止后台播报线程"""
-        with contextlib.suppress(Exception):
-            self._queue.put_nowait(None)
+        self._store.close()
         t = self._thread
         if t and t.is_alive():
             with contextlib.suppress(Exception):
                 t.join(timeout=3)
         self._thread = None
 
-    def speak(self, text: str) -> None:
-        """将文本加入播报队列"""
+    def speak(
+        self,
+        text: str,
+        *,
+        priority: int = PRIORITY_CHATTER,
+        key: str | None = None,
+        tags: Iterable[str] = (),
+        interrupt: bool | None = None,
+    ) -> None:
+        """将文本加入播报队列
+
+        - priority: 数值越小越优先
+        - key: 同 key 的待播报项被新文本替换
+        - tags: 用于 cancel_tag / suppress_tag 的标签
+        - 长文本按句分片为一组（共享 key/tags），cancel_key/cancel_tag 会取消整组
+        - interrupt: 是否打断当前播报；None 表示自动（更高优先级或同 key 时打断）
+        """
         if not text:
             return
         if self._tts is None:
@@ -70,10 +343,6 @@ class TTSManager:
             return
         now = time.time()
         eff = text
-        # 若文本命中抑制规则，则直接丢弃
-        if self._is_suppressed(eff, now):
-            self._log.debug("根据抑制规则丢弃播报: %r", eff)
-            return
         if self._last_text == text and (now - self._last_time) < self._dup_window:
             zw = self._zw_variants[self._zw_idx % len(self._zw_variants)]
             self._zw_idx += 1
@@ -81,13 +350,96 @@ class TTSManager:
             self._log.debug("在 %.1fs 内重复文本 -> 追加零宽字符 %r 区分", self._dup_window, zw)
         self._last_text = text
         self._last_time = now
-        try:
-            self._queue.put_nowait((eff, now))
-        except queue.Full:
-            with contextlib.suppress(Exception):
-                _ = self._queue.get_nowait()
-            with contextlib.suppress(Exception):
-                self._queue.put_nowait((eff, now))
+        items = self._make_items(eff, int(priority), now, key, frozenset(tags))
+        trace, t_enqueue = current_trace(), time.perf_counter()
+        for it in items:
+            it.trace, it.t_enqueue = trace, t_enqueue
+        added, replaced = self._store.push_group(items)
+        if replaced:
+            self._log.debug("合并同 key 待播报项: %d 项 -> %r", len(replaced), eff)
+        if not added:
+            self._log.debug("根据标签抑制或队列容量丢弃播报: %r", eff)
+            return
+        cur = self._current
+        if cur is not None and self._should_interrupt(cur, items[0], interrupt):
+            self._interrupt_current(cur)
+        if len(items) > 1:
+            self._prepare([it.text for it in items[1:]])
+
+    def _make_items(
+        self,
+        text: str,
+        priority: int,
+        now: float,
+        key: str | None,
+        tags: frozenset[str],
+    ) -> list[PendingItem]:
+        """生成待播报项；长文本切分为一组分片（附加分组 tag，便于整组取消）"""
+        chunks = speech_chunks(text, self._chunk_chars)
+        if len(chunks) <= 1:
+            return [PendingItem(priority, next(self._seq), text, now, key, tags)]
+        seqs = [next(self._seq) for _ in chunks]
+        group = seqs[0]
+        gtags = tags | {f"{GROUP_TAG_PREFIX}{group}"}
+        return [
+            PendingItem(priority, seq, chunk, now, key, gtags, group, part)
+            for part, (seq, chunk) in enumerate(zip(seqs, chunks, strict=True))
+        ]
+
+    def _prepare(self, texts: list[str]) -> None:
+        """请 TTS 模块预先准备后续分片（模块不提供 prepare() 时忽略）"""
+        prepare = getattr(self._tts, "prepare", None)
+        if not callable(prepare):
+            return
+        with contextlib.suppress(Exception):
+            prepare(texts)
+
+    def cancel_key(self, key: str) -> bool:
+        """取消指定 key 的待播报项（含分句剩余分片）；若当前正在播报该 key 则打断"""
+        old = self._store.cancel_key(key)
+        cur = self._current
+        if cur is not None and cur.key == key:
+            self._interrupt_current(cur)
+            return True
+        return bool(old)
+
+    def cancel_tag(self, tag: str) -> int:
+        """取消携带该 tag 的待播报项；当前播报项携带该 tag 时一并打断；返回取消数"""
+        n = len(self._store.cancel_tag(tag))
+        cur = self._current
+        if cur is not None and tag in cur.tags:
+            self._interrupt_current(cur)
+            n += 1
+        return n
+
+    def suppress_tag(self, tag: str, duration_sec: float = 2.0) -> None:
+        """在给定时间窗口内抑制携带该 tag 的播报（已排队的同 tag 项一并取消）"""
+        self._store.suppress_tag(tag, duration_sec)
+        self._log.debug("添加标签抑制: %r %.1fs", tag, duration_sec)
+
+    def pending(self) -> list[PendingItem]:
+        """待播报项的一致快照（按出队顺序）"""
+        return self._store.snapshot()
+
+    def pending_count(self) -> int:
+        """当前待播报项数量"""
+        return len(self._store)
+
+    @staticmethod
+    def _should_interrupt(cur: PendingItem, new: PendingItem, interrupt: bool | None) -> bool:
+        """判断新项是否应打断当前播报"""
+        if interrupt is not None:
+            return interrupt
+        return new.priority < cur.priority or (new.key is not None and new.key == cur.key)
+
+    def _interrupt_current(self, cur: PendingItem) -> None:
+        """调用 TTS 模块的 stop() 打断当前句（模块不支持时忽略）"""
+        stop = getattr(self._tts, "stop", None)
+        if not callable(stop):
+            return
+        self._log.debug("打断当前播报: %r", cur.text)
+        with contextlib.suppress(Exception):
+            stop()
 
     # 供外部查询的只读接口
     def is_busy(self) -> bool:
@@ -98,83 +450,63 @@ class TTSManager:
         """返回当前正在播报的原始文本（可能包含零宽字符）"""
         return self._current_text
 
-    # 抑制与清理接口
-    def suppress_substring(self, substr: str, duration_sec: float = 2.0) -> None:
-        """在给定时间窗口内抑制包含某子串的播报"""
-        if not substr:
-            return
-        expire = time.time() + max(0.0, float(duration_sec))
-        self._suppress_until[substr] = expire
-        self._log.debug("添加抑制规则: %r 至 %.3f", substr, expire)
-
+    # 按子串清理（线性匹配，一次性操作；抑制请使用 suppress_tag）
     def clear_pending_substring(self, substr: str) -> None:
-        """移除队列中所有包含子串的待播报项"""
+        """移除队列中所有包含子串的待播报项（在存储锁内原子完成）"""
         if not substr:
             return
-        # 将队列全部取出，过滤后再塞回
-        buf: list[tuple[str, float] | None] = []
-        while True:
-            try:
-                item = self._queue.get_nowait()
-            except queue.Empty:
-                break
-            if item is None:
-                # 保留停止标记在队尾
-                buf.append(item)
-                continue
-            text, ts = item
-            if substr in text:
-                self._log.debug("清除待播报项: %r", text)
-                continue
-            buf.append((text, ts))
-        for it in buf:
-            with contextlib.suppress(Exception):
-                self._queue.put_nowait(it)
-
-    def _is_suppressed(self, text: str, now: float | None = None) -> bool:
-        """检查文本是否命中抑制规则"""
-        if not self._suppress_until:
-            return False
-        t = time.time() if now is None else now
-        expired: list[str] = []
-        for k, exp in self._suppress_until.items():
-            if t > exp:
-                expired.append(k)
-            elif k and k in text:
-                return True
-        for k in expired:
-            self._suppress_until.pop(k, None)
-        return False
+        for it in self._store.cancel_where(lambda it: substr in it.text):
+            self._log.debug("清除待播报项: %r", it.text)
 
     def _worker(self) -> None:
         """后台播报线程工作循环"""
         while True:
-            try:
-                item = self._queue.get()
-            except (RuntimeError, ValueError):
-                self._log.exception("TTS 队列读取异常")
-                continue
+            item = self._store.pop()
             if item is None:
                 self._log.debug("收到停止信号，TTS 线程将退出")
                 break
-            if self._tts is None:
-                self._log.debug("跳过播报：TTS 模块不可用")
-                continue
-            text, ts = item
-            if self._max_age is not None and (time.time() - ts) > self._max_age and not self._queue.empty():
-                self._log.debug("丢弃过期播报: %r", text)
-                continue
-            # 再次检查抑制规则（防止排队期间变为受抑制）
-            if self._is_suppressed(text):
-                self._log.debug("根据抑制规则跳过播报: %r", text)
-                continue
-            with contextlib.suppress(Exception):
-                self._is_speaking = True
-                self._current_text = text
-                self._log.debug("开始播报: %r", text)
-                try:
-                    self._tts.speak(text)
-                finally:
-                    self._log.debug("播报完成: %r", text)
-                    self._is_speaking = False
-                    self._current_text = None
+            self._current = item
+            try:
+                self._speak_item(item)
+            finally:
+                self._current = None
+
+    def _speak_item(self, item: PendingItem) -> None:
+        """播报单项（过期/抑制检查后调用 TTS 模块）"""
+        if self._tts is None:
+            self._log.debug("跳过播报：TTS 模块不可用")
+            return
+        text, ts = item.text, item.ts
+        # 过期检查只针对首个分片：后续分片的等待来自前面分片的播报，不应视为过期
+        if (
+            item.part == 0
+            and self._max_age is not None
+            and (time.time() - ts) > self._max_age
+            and self.pending_count() > 0
+        ):
+            self._log.debug("丢弃过期播报: %r", text)
+            if item.group is not None:
+                self._store.cancel_tag(f"{GROUP_TAG_PREFIX}{item.group}")
+            return
+        # 再次检查抑制规则（防止排队期间变为受抑制）
+        if self._store.is_suppressed(item.tags):
+            self._log.debug("根据抑制规则跳过播报: %r", text)
+            return
+        trace = item.trace
+        t_start = time.perf_counter()
+        if trace is not None:
+            trace.tracer.span(trace, "tts.queue", item.t_enqueue, t_start)
+            if item.part == 0:
+                trace.tracer.latency(trace, "capture_to_speech", t_start)
+        with contextlib.suppress(Exception):
+            self._is_speaking = True
+            self._current_text = text
+            self._log.debug("开始播报: %r", text)
+            try:
+                self._tts.speak(text)
+            finally:
+                if trace is not None:
+                    trace.tracer.span(trace, "tts.speak", t_start, time.perf_counter(), text=text)
+                self._log.debug("播报完成: %r", text)
+                self._is_speaking = False
+                self._current_text = None